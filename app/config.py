@@ -18,9 +18,22 @@ class Config:
     
     # API Settings
     API_KEY: str = os.getenv('API_KEY', '')
+    # Chave de assinatura dos cursores de paginação (usa API_KEY se vazio)
+    CURSOR_SECRET: str = os.getenv('CURSOR_SECRET', '')
     
     # Request Settings
+    # Prazo padrão de uma requisição de extração (0 = sem prazo); cada requisição pode
+    # informar o seu próprio `timeout`, até REQUEST_TIMEOUT_MAX_SECONDS
+    REQUEST_TIMEOUT_SECONDS: float = float(os.getenv('REQUEST_TIMEOUT_SECONDS', '120'))
+    REQUEST_TIMEOUT_MAX_SECONDS: float = float(os.getenv('REQUEST_TIMEOUT_MAX_SECONDS', '600'))
     MAX_CONCURRENT_REQUESTS: int = int(os.getenv('MAX_CONCURRENT_REQUESTS', '3'))
+    # Threads de extração (0 = automático: min(MAX_CONCURRENT_REQUESTS, contas utilizáveis))
+    EXTRACTION_WORKERS: int = int(os.getenv('EXTRACTION_WORKERS', '0'))
+    # Fila de espera quando MAX_CONCURRENT_REQUESTS está ocupado (excedentes recebem 429)
+    ADMISSION_QUEUE_SIZE: int = int(os.getenv('ADMISSION_QUEUE_SIZE', '10'))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv('ADMISSION_QUEUE_TIMEOUT_SECONDS', '30'))
+    # Estimativa inicial da duração de uma extração (usada no Retry-After até haver medições)
+    ADMISSION_INITIAL_DURATION_SECONDS: float = float(os.getenv('ADMISSION_INITIAL_DURATION_SECONDS', '10'))
     
     # Paths
     BASE_DIR: Path = Path(__file__).parent.parent
@@ -34,10 +47,82 @@ class Config:
     # Instagram API Settings
     INSTAGRAM_DELAY_MIN: int = int(os.getenv('INSTAGRAM_DELAY_MIN', '1'))
     INSTAGRAM_DELAY_MAX: int = int(os.getenv('INSTAGRAM_DELAY_MAX', '3'))
+    # Timeout de cada chamada HTTP ao Instagram (também limitado ao prazo da requisição)
+    INSTAGRAM_HTTP_TIMEOUT_SECONDS: float = float(os.getenv('INSTAGRAM_HTTP_TIMEOUT_SECONDS', '30'))
+    # Backend do instagrapi: cost (menor latência/erro medidos), v1, gql ou instagrapi (escolha interna)
+    INSTAGRAM_BACKEND_ROUTING: str = os.getenv('INSTAGRAM_BACKEND_ROUTING', 'cost').lower()
+    # Segundos somados ao custo de um backend por falha (ponderados pela taxa de erro recente)
+    BACKEND_ERROR_PENALTY_SECONDS: float = float(os.getenv('BACKEND_ERROR_PENALTY_SECONDS', '10'))
+    # Sem uso por esse tempo, o backend mais caro é testado de novo
+    BACKEND_PROBE_INTERVAL_SECONDS: float = float(os.getenv('BACKEND_PROBE_INTERVAL_SECONDS', '60'))
     
     # Account Management
     ACCOUNT_FREEZE_DURATION_MINUTES: int = int(os.getenv('ACCOUNT_FREEZE_DURATION_MINUTES', '60'))
     MAX_RETRIES_PER_REQUEST: int = int(os.getenv('MAX_RETRIES_PER_REQUEST', '3'))
+    # Backoff exponencial entre tentativas: base * 2^(n-1), limitado ao máximo, com jitter (0-1)
+    RETRY_BASE_DELAY_SECONDS: float = float(os.getenv('RETRY_BASE_DELAY_SECONDS', '0.5'))
+    RETRY_MAX_DELAY_SECONDS: float = float(os.getenv('RETRY_MAX_DELAY_SECONDS', '8'))
+    RETRY_JITTER: float = float(os.getenv('RETRY_JITTER', '1'))
+    # Ajustes por operação, ex.: "stories:max_attempts=2;page:base_delay=0.2,max_delay=2"
+    RETRY_OPERATION_OVERRIDES: str = os.getenv('RETRY_OPERATION_OVERRIDES', '')
+    # Intervalo mínimo entre dois usos da mesma conta (0 = sem limite)
+    ACCOUNT_MIN_INTERVAL_SECONDS: float = float(os.getenv('ACCOUNT_MIN_INTERVAL_SECONDS', '0'))
+    
+    # Hedging: extrações de posts/stories mais lentas que o percentil HEDGE_PERCENTILE das
+    # últimas extrações ganham uma duplicata em outra conta (vale a que terminar primeiro)
+    HEDGE_ENABLED: bool = os.getenv('HEDGE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    HEDGE_PERCENTILE: float = float(os.getenv('HEDGE_PERCENTILE', '95'))
+    HEDGE_MIN_SAMPLES: int = int(os.getenv('HEDGE_MIN_SAMPLES', '20'))
+    # Duplicatas simultâneas no máximo (limita a carga extra nas contas)
+    HEDGE_MAX_INFLIGHT: int = int(os.getenv('HEDGE_MAX_INFLIGHT', '1'))
+    
+    # Batch
+    BATCH_MAX_ITEMS: int = int(os.getenv('BATCH_MAX_ITEMS', '200'))
+    # Itens processados em paralelo por batch (0 = automático: min(MAX_CONCURRENT_REQUESTS, contas disponíveis))
+    BATCH_CONCURRENCY: int = int(os.getenv('BATCH_CONCURRENCY', '0'))
+    
+    # Client Pool
+    CLIENT_POOL_MAX_SIZE: int = int(os.getenv('CLIENT_POOL_MAX_SIZE', '50'))
+    
+    # Cache de username -> user_id
+    USER_ID_CACHE_PATH: str = os.getenv('USER_ID_CACHE_PATH', 'data/cache/user_ids.sqlite3')
+    USER_ID_CACHE_MAX_ENTRIES: int = int(os.getenv('USER_ID_CACHE_MAX_ENTRIES', '10000'))
+    USER_ID_NEGATIVE_TTL_MINUTES: int = int(os.getenv('USER_ID_NEGATIVE_TTL_MINUTES', '60'))
+    # Perfis privados sem conta com acesso respondem 403 direto do cache por esse tempo (0 = não cachear)
+    PRIVATE_PROFILE_TTL_MINUTES: int = int(os.getenv('PRIVATE_PROFILE_TTL_MINUTES', '30'))
+    
+    # Cache de posts (0 = desabilitado); entradas vencidas são servidas por mais
+    # POSTS_CACHE_STALE_SECONDS enquanto são atualizadas em background
+    POSTS_CACHE_TTL_SECONDS: float = float(os.getenv('POSTS_CACHE_TTL_SECONDS', '300'))
+    POSTS_CACHE_STALE_SECONDS: float = float(os.getenv('POSTS_CACHE_STALE_SECONDS', '600'))
+    POSTS_CACHE_MAX_ENTRIES: int = int(os.getenv('POSTS_CACHE_MAX_ENTRIES', '1000'))
+    # Extrações de posts são arredondadas para múltiplos do tamanho de página do Instagram
+    POSTS_PAGE_SIZE: int = int(os.getenv('POSTS_PAGE_SIZE', '12'))
+    # Até essa quantidade (e sem user_id em cache), posts vêm de web_profile_info: perfil +
+    # primeira página do feed em uma chamada (0 = desabilitado; a página tem 12 posts)
+    WEB_PROFILE_MAX_QUANTITY: int = int(os.getenv('WEB_PROFILE_MAX_QUANTITY', '12'))
+    # Converte o JSON bruto do Instagram direto em Post/Story, sem os modelos Media/Story do instagrapi
+    # (mais barato e sem ValidationError por campos que não usamos; requer roteamento != instagrapi)
+    RAW_MEDIA_PARSER: bool = os.getenv('RAW_MEDIA_PARSER', 'false').lower() in ('1', 'true', 'yes')
+    # Quantidade máxima de posts em /posts/stream
+    POSTS_STREAM_MAX_QUANTITY: int = int(os.getenv('POSTS_STREAM_MAX_QUANTITY', '500'))
+    # Atualizações do cache de posts buscam só os posts novos (até o último post conhecido)
+    POSTS_INCREMENTAL_REFRESH: bool = os.getenv('POSTS_INCREMENTAL_REFRESH', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Cache de stories: janela em que a lista de um perfil é reutilizada (0 = desabilitado)
+    # Cada story sai do cache no seu expiring_at, mesmo dentro da janela
+    STORIES_CACHE_FRESH_SECONDS: float = float(os.getenv('STORIES_CACHE_FRESH_SECONDS', '60'))
+    
+    # Sessões
+    SESSION_VERIFY_TTL_MINUTES: int = int(os.getenv('SESSION_VERIFY_TTL_MINUTES', '30'))
+    SESSION_FLUSH_INTERVAL_SECONDS: float = float(os.getenv('SESSION_FLUSH_INTERVAL_SECONDS', '2'))
+    
+    # Pré-aquecimento de sessões no startup
+    PREWARM_SESSIONS: bool = os.getenv('PREWARM_SESSIONS', 'false').lower() in ('1', 'true', 'yes')
+    PREWARM_MAX_WORKERS: int = int(os.getenv('PREWARM_MAX_WORKERS', '4'))
+    PREWARM_STAGGER_SECONDS: float = float(os.getenv('PREWARM_STAGGER_SECONDS', '2'))
+    PREWARM_MIN_READY: int = int(os.getenv('PREWARM_MIN_READY', '1'))
+    PREWARM_TIMEOUT_SECONDS: float = float(os.getenv('PREWARM_TIMEOUT_SECONDS', '120'))
     
     @classmethod
     def get_absolute_path(cls, relative_path: str) -> Path:
@@ -66,10 +151,27 @@ class Config:
         if not cls.API_KEY:
             errors.append("API_KEY não está definida no arquivo .env")
         
+        # Validar prazo das requisições
+        if cls.REQUEST_TIMEOUT_SECONDS < 0 or cls.REQUEST_TIMEOUT_MAX_SECONDS <= 0:
+            errors.append("REQUEST_TIMEOUT_SECONDS deve ser >= 0 e REQUEST_TIMEOUT_MAX_SECONDS maior que 0")
+        
+        if cls.REQUEST_TIMEOUT_SECONDS > cls.REQUEST_TIMEOUT_MAX_SECONDS:
+            errors.append("REQUEST_TIMEOUT_SECONDS não pode ser maior que REQUEST_TIMEOUT_MAX_SECONDS")
+        
         # Validar MAX_CONCURRENT_REQUESTS
         if cls.MAX_CONCURRENT_REQUESTS < 1:
             errors.append("MAX_CONCURRENT_REQUESTS deve ser maior que 0")
         
+        if cls.EXTRACTION_WORKERS < 0:
+            errors.append("EXTRACTION_WORKERS deve ser >= 0")
+        
+        # Validar fila de admissão
+        if cls.ADMISSION_QUEUE_SIZE < 0 or cls.ADMISSION_QUEUE_TIMEOUT_SECONDS < 0:
+            errors.append("ADMISSION_QUEUE_SIZE e ADMISSION_QUEUE_TIMEOUT_SECONDS devem ser >= 0")
+        
+        if cls.ADMISSION_INITIAL_DURATION_SECONDS <= 0:
+            errors.append("ADMISSION_INITIAL_DURATION_SECONDS deve ser maior que 0")
+        
         # Validar ACCOUNTS_CSV_PATH existe
         accounts_path = cls.get_absolute_path(cls.ACCOUNTS_CSV_PATH)
         if not accounts_path.exists():
@@ -95,6 +197,16 @@ class Config:
         if cls.INSTAGRAM_DELAY_MIN > cls.INSTAGRAM_DELAY_MAX:
             errors.append("INSTAGRAM_DELAY_MIN não pode ser maior que INSTAGRAM_DELAY_MAX")
         
+        if cls.INSTAGRAM_HTTP_TIMEOUT_SECONDS <= 0:
+            errors.append("INSTAGRAM_HTTP_TIMEOUT_SECONDS deve ser maior que 0")
+        
+        # Validar roteamento entre backends
+        if cls.INSTAGRAM_BACKEND_ROUTING not in ('cost', 'v1', 'gql', 'instagrapi'):
+            errors.append("INSTAGRAM_BACKEND_ROUTING deve ser cost, v1, gql ou instagrapi")
+        
+        if cls.BACKEND_ERROR_PENALTY_SECONDS < 0 or cls.BACKEND_PROBE_INTERVAL_SECONDS < 0:
+            errors.append("BACKEND_ERROR_PENALTY_SECONDS e BACKEND_PROBE_INTERVAL_SECONDS devem ser >= 0")
+        
         # Validar freeze duration
         if cls.ACCOUNT_FREEZE_DURATION_MINUTES < 1:
             errors.append("ACCOUNT_FREEZE_DURATION_MINUTES deve ser maior que 0")
@@ -103,6 +215,80 @@ class Config:
         if cls.MAX_RETRIES_PER_REQUEST < 1:
             errors.append("MAX_RETRIES_PER_REQUEST deve ser maior que 0")
         
+        # Validar backoff
+        if cls.RETRY_BASE_DELAY_SECONDS < 0 or cls.RETRY_MAX_DELAY_SECONDS < 0:
+            errors.append("RETRY_BASE_DELAY_SECONDS e RETRY_MAX_DELAY_SECONDS devem ser >= 0")
+        
+        if not 0 <= cls.RETRY_JITTER <= 1:
+            errors.append("RETRY_JITTER deve estar entre 0 e 1")
+        
+        if cls.ACCOUNT_MIN_INTERVAL_SECONDS < 0:
+            errors.append("ACCOUNT_MIN_INTERVAL_SECONDS deve ser >= 0")
+        
+        # Validar hedging
+        if not 0 < cls.HEDGE_PERCENTILE <= 100:
+            errors.append("HEDGE_PERCENTILE deve estar entre 0 e 100")
+        
+        if cls.HEDGE_MIN_SAMPLES < 1 or cls.HEDGE_MAX_INFLIGHT < 1:
+            errors.append("HEDGE_MIN_SAMPLES e HEDGE_MAX_INFLIGHT devem ser maiores que 0")
+        
+        # Validar batch
+        if cls.BATCH_MAX_ITEMS < 1:
+            errors.append("BATCH_MAX_ITEMS deve ser maior que 0")
+        
+        if cls.BATCH_CONCURRENCY < 0:
+            errors.append("BATCH_CONCURRENCY deve ser >= 0")
+        
+        # Validar tamanho do pool de clientes
+        if cls.CLIENT_POOL_MAX_SIZE < 1:
+            errors.append("CLIENT_POOL_MAX_SIZE deve ser maior que 0")
+        
+        # Validar cache de user_id
+        if cls.USER_ID_CACHE_MAX_ENTRIES < 1:
+            errors.append("USER_ID_CACHE_MAX_ENTRIES deve ser maior que 0")
+        
+        if cls.USER_ID_NEGATIVE_TTL_MINUTES < 0:
+            errors.append("USER_ID_NEGATIVE_TTL_MINUTES deve ser >= 0")
+        
+        if cls.PRIVATE_PROFILE_TTL_MINUTES < 0:
+            errors.append("PRIVATE_PROFILE_TTL_MINUTES deve ser >= 0")
+        
+        # Validar cache de posts
+        if cls.POSTS_CACHE_TTL_SECONDS < 0 or cls.POSTS_CACHE_STALE_SECONDS < 0:
+            errors.append("POSTS_CACHE_TTL_SECONDS e POSTS_CACHE_STALE_SECONDS devem ser >= 0")
+        
+        if cls.POSTS_CACHE_MAX_ENTRIES < 1:
+            errors.append("POSTS_CACHE_MAX_ENTRIES deve ser maior que 0")
+        
+        if cls.POSTS_PAGE_SIZE < 1:
+            errors.append("POSTS_PAGE_SIZE deve ser maior que 0")
+        
+        if not 0 <= cls.WEB_PROFILE_MAX_QUANTITY <= 12:
+            errors.append("WEB_PROFILE_MAX_QUANTITY deve estar entre 0 e 12")
+        
+        if cls.RAW_MEDIA_PARSER and cls.INSTAGRAM_BACKEND_ROUTING == 'instagrapi':
+            errors.append("RAW_MEDIA_PARSER requer INSTAGRAM_BACKEND_ROUTING diferente de instagrapi")
+        
+        if cls.POSTS_STREAM_MAX_QUANTITY < 1:
+            errors.append("POSTS_STREAM_MAX_QUANTITY deve ser maior que 0")
+        
+        if cls.STORIES_CACHE_FRESH_SECONDS < 0:
+            errors.append("STORIES_CACHE_FRESH_SECONDS deve ser >= 0")
+        
+        # Validar TTL de verificação de sessão
+        if cls.SESSION_VERIFY_TTL_MINUTES < 0:
+            errors.append("SESSION_VERIFY_TTL_MINUTES deve ser >= 0")
+        
+        if cls.SESSION_FLUSH_INTERVAL_SECONDS < 0:
+            errors.append("SESSION_FLUSH_INTERVAL_SECONDS deve ser >= 0")
+        
+        # Validar pré-aquecimento
+        if cls.PREWARM_MAX_WORKERS < 1:
+            errors.append("PREWARM_MAX_WORKERS deve ser maior que 0")
+        
+        if cls.PREWARM_STAGGER_SECONDS < 0 or cls.PREWARM_MIN_READY < 0 or cls.PREWARM_TIMEOUT_SECONDS < 0:
+            errors.append("PREWARM_STAGGER_SECONDS, PREWARM_MIN_READY e PREWARM_TIMEOUT_SECONDS devem ser >= 0")
+        
         # Se houver erros, lançar exceção
         if errors:
             error_message = "Erros de configuração encontrados:\n" + "\n".join(f"  - {e}" for e in errors)
@@ -118,14 +304,40 @@ class Config:
         """
         return {
             'api_key_configured': bool(cls.API_KEY),
+            'request_timeout': f"{cls.REQUEST_TIMEOUT_SECONDS}s (max {cls.REQUEST_TIMEOUT_MAX_SECONDS}s)",
             'max_concurrent_requests': cls.MAX_CONCURRENT_REQUESTS,
+            'extraction_workers': cls.EXTRACTION_WORKERS or 'auto',
+            'admission_queue': f"size={cls.ADMISSION_QUEUE_SIZE}, timeout={cls.ADMISSION_QUEUE_TIMEOUT_SECONDS}s",
             'accounts_csv_path': str(cls.get_absolute_path(cls.ACCOUNTS_CSV_PATH)),
             'sessions_dir_path': str(cls.get_absolute_path(cls.SESSIONS_DIR_PATH)),
             'log_level': cls.LOG_LEVEL,
             'log_file': cls.LOG_FILE,
             'instagram_delay_range': f"{cls.INSTAGRAM_DELAY_MIN}-{cls.INSTAGRAM_DELAY_MAX}s",
+            'instagram_http_timeout': f"{cls.INSTAGRAM_HTTP_TIMEOUT_SECONDS}s",
+            'instagram_backend_routing': cls.INSTAGRAM_BACKEND_ROUTING,
             'account_freeze_duration': f"{cls.ACCOUNT_FREEZE_DURATION_MINUTES} minutes",
-            'max_retries': cls.MAX_RETRIES_PER_REQUEST
+            'max_retries': cls.MAX_RETRIES_PER_REQUEST,
+            'retry_backoff': f"{cls.RETRY_BASE_DELAY_SECONDS}s-{cls.RETRY_MAX_DELAY_SECONDS}s (jitter {cls.RETRY_JITTER})",
+            'account_min_interval': f"{cls.ACCOUNT_MIN_INTERVAL_SECONDS}s",
+            'hedging': f"p{cls.HEDGE_PERCENTILE:g} (max {cls.HEDGE_MAX_INFLIGHT})" if cls.HEDGE_ENABLED else "disabled",
+            'batch': f"max_items={cls.BATCH_MAX_ITEMS}, concurrency={cls.BATCH_CONCURRENCY or 'auto'}",
+            'client_pool_max_size': cls.CLIENT_POOL_MAX_SIZE,
+            'user_id_cache_path': str(cls.get_absolute_path(cls.USER_ID_CACHE_PATH)),
+            'user_id_negative_ttl': f"{cls.USER_ID_NEGATIVE_TTL_MINUTES} minutes",
+            'private_profile_ttl': f"{cls.PRIVATE_PROFILE_TTL_MINUTES} minutes",
+            'posts_cache': f"ttl={cls.POSTS_CACHE_TTL_SECONDS}s, stale={cls.POSTS_CACHE_STALE_SECONDS}s, "
+                           f"max_entries={cls.POSTS_CACHE_MAX_ENTRIES}",
+            'posts_page_size': cls.POSTS_PAGE_SIZE,
+            'web_profile_max_quantity': cls.WEB_PROFILE_MAX_QUANTITY,
+            'raw_media_parser': cls.RAW_MEDIA_PARSER,
+            'posts_stream_max_quantity': cls.POSTS_STREAM_MAX_QUANTITY,
+            'posts_incremental_refresh': cls.POSTS_INCREMENTAL_REFRESH,
+            'stories_cache_fresh': f"{cls.STORIES_CACHE_FRESH_SECONDS}s",
+            'session_verify_ttl': f"{cls.SESSION_VERIFY_TTL_MINUTES} minutes",
+            'session_flush_interval': f"{cls.SESSION_FLUSH_INTERVAL_SECONDS}s",
+            'prewarm_sessions': cls.PREWARM_SESSIONS,
+            'prewarm': f"workers={cls.PREWARM_MAX_WORKERS}, stagger={cls.PREWARM_STAGGER_SECONDS}s, "
+                       f"min_ready={cls.PREWARM_MIN_READY}, timeout={cls.PREWARM_TIMEOUT_SECONDS}s"
         }
 
 
@@ -2,36 +2,58 @@
 FastAPI application - API de extração do Instagram
 """
 from fastapi import FastAPI, Depends, Request, status, Body
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from typing import List, Optional
+from pydantic import BaseModel
+import asyncio
+import json
 
 from app.models.requests import (
+    CacheMode,
     PostsRequest,
     PostsResponse,
+    PostsPageResponse,
+    SnapshotResponse,
+    BatchItem,
+    BatchResponse,
     StoriesRequest,
     StoriesResponse,
     ErrorResponse
 )
 from app.services.account_manager import AccountManager
 from app.services.extractor import InstagramExtractor
+from app.services.extraction_service import ExtractionService
+from app.services.client_pool import ClientPool
+from app.services.user_id_cache import UserIdCache
+from app.services.session_warmer import SessionWarmer
+from app.services.session_store import get_session_store
 from app.middleware.auth import verify_api_key
 from app.config import Config
 from app.utils.logger import get_logger
+from app.utils.deadline import deadline_scope, request_deadline
 from app.utils.exceptions import (
     InstagramAPIException,
+    DeadlineExceeded,
     ProfileNotFound,
     PrivateProfileError,
     AccountPoolExhausted,
     RateLimitExceeded,
-    AuthenticationError
+    AuthenticationError,
+    InvalidRequestError,
+    TooManyRequests
 )
 
 logger = get_logger("main")
 
 # Variáveis globais para managers
 account_manager: AccountManager = None
+client_pool: ClientPool = None
+user_id_cache: UserIdCache = None
+session_warmer: SessionWarmer = None
 extractor: InstagramExtractor = None
+extraction_service: ExtractionService = None
 
 
 @asynccontextmanager
@@ -42,7 +64,7 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Iniciando aplicação...")
     
-    global account_manager, extractor
+    global account_manager, client_pool, user_id_cache, session_warmer, extractor, extraction_service
     
     try:
         # Inicializar AccountManager
@@ -54,10 +76,42 @@ async def lifespan(app: FastAPI):
         for account in account_manager.accounts:
             account.proxy_used = ""
         
+        # Carregar sessões salvas para memória
+        get_session_store().load_all()
+        
+        # Inicializar pool de clientes logados
+        client_pool = ClientPool()
+        logger.info(f"✓ ClientPool inicializado: até {client_pool.max_size} clientes ociosos")
+        
+        # Inicializar cache de username -> user_id
+        user_id_cache = UserIdCache()
+        
         # Inicializar Extractor
-        extractor = InstagramExtractor(account_manager)
+        extractor = InstagramExtractor(account_manager, client_pool, user_id_cache)
         logger.info("✓ InstagramExtractor inicializado")
         
+        # Inicializar pool de extração (fora do event loop)
+        extraction_service = ExtractionService(extractor, account_manager)
+        logger.info(f"✓ ExtractionService inicializado: {extraction_service.max_workers} workers")
+        
+        # Pré-aquecer sessões (opcional)
+        session_warmer = SessionWarmer(account_manager, client_pool)
+        if Config.PREWARM_SESSIONS:
+            session_warmer.start()
+            ready = await asyncio.to_thread(
+                session_warmer.wait_until_ready,
+                Config.PREWARM_MIN_READY,
+                Config.PREWARM_TIMEOUT_SECONDS
+            )
+            progress = session_warmer.get_progress()
+            if ready:
+                logger.info(f"✓ Sessões aquecidas: {progress['warm']}/{progress['total']} (aquecimento continua em background)")
+            else:
+                logger.warning(
+                    f"⚠️  Mínimo de {Config.PREWARM_MIN_READY} contas aquecidas não atingido "
+                    f"({progress['warm']}/{progress['total']}), iniciando mesmo assim"
+                )
+        
         # Log de configurações
         config_summary = Config.get_config_summary()
         logger.info("📊 Configurações:")
@@ -74,6 +128,21 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🛑 Encerrando aplicação...")
+    
+    if extraction_service:
+        extraction_service.shutdown()
+    
+    if session_warmer:
+        session_warmer.stop()
+    
+    if client_pool:
+        client_pool.close()
+    
+    # Gravar sessões pendentes em disco
+    get_session_store().close()
+    
+    if user_id_cache:
+        user_id_cache.close()
 
 
 # Criar aplicação FastAPI
@@ -102,9 +171,15 @@ async def instagram_api_exception_handler(request: Request, exc: InstagramAPIExc
     logger.error(f"InstagramAPIException: {exc.message}")
     
     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    headers = None
     
     # Mapear exceções para status codes apropriados
-    if isinstance(exc, AuthenticationError):
+    if isinstance(exc, TooManyRequests):
+        status_code = status.HTTP_429_TOO_MANY_REQUESTS
+        headers = {"Retry-After": str(exc.retry_after)}
+    elif isinstance(exc, InvalidRequestError):
+        status_code = status.HTTP_400_BAD_REQUEST
+    elif isinstance(exc, AuthenticationError):
         status_code = status.HTTP_401_UNAUTHORIZED
     elif isinstance(exc, ProfileNotFound):
         status_code = status.HTTP_404_NOT_FOUND
@@ -112,6 +187,8 @@ async def instagram_api_exception_handler(request: Request, exc: InstagramAPIExc
         status_code = status.HTTP_503_SERVICE_UNAVAILABLE
     elif isinstance(exc, PrivateProfileError):
         status_code = status.HTTP_403_FORBIDDEN
+    elif isinstance(exc, DeadlineExceeded):
+        status_code = status.HTTP_504_GATEWAY_TIMEOUT
     
     return JSONResponse(
         status_code=status_code,
@@ -119,7 +196,8 @@ async def instagram_api_exception_handler(request: Request, exc: InstagramAPIExc
             error=exc.__class__.__name__,
             message=exc.message,
             details=exc.details
-        ).model_dump()
+        ).dict(),
+        headers=headers
     )
 
 
@@ -134,12 +212,30 @@ async def general_exception_handler(request: Request, exc: Exception):
             error="InternalServerError",
             message="Erro interno do servidor",
             details={"error": str(exc)}
-        ).model_dump()
+        ).dict()
     )
 
 
 # ==================== ROTAS ====================
 
+def _trusted_response(model: BaseModel) -> Response:
+    """
+    Serializa uma resposta montada pela própria API em uma única passada
+    
+    Posts e stories já saem tipados do extractor (construct, sem validação) e a
+    resposta é montada com construct; devolver um Response pronto evita que o
+    FastAPI revalide e reconverta tudo pelo response_model, que continua
+    declarado nas rotas só para a documentação
+    
+    Args:
+        model: Resposta montada com construct
+        
+    Returns:
+        Response JSON
+    """
+    return Response(content=model.json(), media_type="application/json")
+
+
 @app.get("/", tags=["Sistema"])
 async def root():
     """
@@ -151,6 +247,10 @@ async def root():
         "status": "online",
         "endpoints": {
             "posts": "/posts",
+            "posts_stream": "/posts/stream",
+            "posts_page": "/posts/page",
+            "snapshot": "/snapshot",
+            "batch": "/batch",
             "stories": "/stories",
             "health": "/health",
             "status": "/status"
@@ -171,6 +271,10 @@ async def health_check():
             "total": pool_status['total_accounts'],
             "available": pool_status['available'],
             "frozen": pool_status['frozen']
+        },
+        "warmup": {
+            key: value for key, value in session_warmer.get_progress().items()
+            if key in ('status', 'total', 'warm', 'failed', 'pending')
         }
     }
 
@@ -185,17 +289,32 @@ async def get_status():
     return {
         "success": True,
         "pool_status": pool_status,
+        "client_pool": client_pool.get_status(),
+        "warmup": session_warmer.get_progress(),
+        "extraction": extraction_service.get_status(),
+        "hedging": extractor.get_hedge_status(),
+        "backends": extractor.backends.get_status(),
+        "user_id_cache": user_id_cache.get_status(),
         "config": Config.get_config_summary()
     }
 
 
 @app.post("/posts", response_model=PostsResponse, tags=["Extração"], dependencies=[Depends(verify_api_key)])
-async def extract_posts(username: str = Body(...), quantity: int = Body(..., ge=1, le=50)):
+async def extract_posts(
+    username: str = Body(...),
+    quantity: int = Body(..., ge=1, le=50),
+    user_id: Optional[int] = Body(None),
+    cache_mode: CacheMode = Body("default"),
+    timeout: Optional[float] = Body(None, gt=0, le=Config.REQUEST_TIMEOUT_MAX_SECONDS)
+):
     """
     Extrai posts de um perfil do Instagram
     
     - **username**: Username do perfil (sem @)
     - **quantity**: Quantidade de posts (1-50)
+    - **user_id**: pk do perfil, se já conhecido (opcional, evita a busca por username)
+    - **cache_mode**: default (usa o cache), bypass (ignora o cache) ou refresh (força nova extração)
+    - **timeout**: Prazo da requisição em segundos (opcional, padrão REQUEST_TIMEOUT_SECONDS)
     
     Requer header: `Authorization: <API_KEY>`
     """
@@ -203,10 +322,11 @@ async def extract_posts(username: str = Body(...), quantity: int = Body(..., ge=
     
     try:
         # Extrair posts
-        posts = extractor.extract_posts(username, quantity)
+        with deadline_scope(request_deadline(timeout)):
+            posts = await extraction_service.extract_posts(username, quantity, user_id, cache_mode)
         
         # Montar response
-        response = PostsResponse(
+        response = PostsResponse.construct(
             success=True,
             username=username,
             total_posts=len(posts),
@@ -216,7 +336,7 @@ async def extract_posts(username: str = Body(...), quantity: int = Body(..., ge=
         
         logger.info(f"✓ Extração concluída: {len(posts)} posts de @{username}")
         
-        return response
+        return _trusted_response(response)
         
     except InstagramAPIException:
         # Re-lançar para ser tratado pelo exception handler
@@ -226,12 +346,110 @@ async def extract_posts(username: str = Body(...), quantity: int = Body(..., ge=
         raise
 
 
+@app.post("/posts/stream", tags=["Extração"], dependencies=[Depends(verify_api_key)])
+async def stream_posts(
+    username: str = Body(...),
+    quantity: int = Body(..., ge=1, le=Config.POSTS_STREAM_MAX_QUANTITY),
+    user_id: Optional[int] = Body(None),
+    cache_mode: CacheMode = Body("default"),
+    timeout: Optional[float] = Body(None, gt=0, le=Config.REQUEST_TIMEOUT_MAX_SECONDS)
+):
+    """
+    Extrai posts de um perfil em streaming (NDJSON): cada post é enviado como uma
+    linha JSON assim que a página correspondente chega do Instagram
+    
+    - **username**: Username do perfil (sem @)
+    - **quantity**: Quantidade de posts (1-POSTS_STREAM_MAX_QUANTITY)
+    - **user_id**: pk do perfil, se já conhecido (opcional, evita a busca por username)
+    - **cache_mode**: default (usa o cache), bypass (ignora o cache) ou refresh (força nova extração)
+    - **timeout**: Prazo da requisição em segundos (opcional, padrão REQUEST_TIMEOUT_SECONDS)
+    
+    Erros antes do primeiro post retornam o status HTTP normal; erros no meio do
+    streaming são enviados como uma última linha `{"error": ..., "message": ...}`
+    
+    Requer header: `Authorization: <API_KEY>`
+    """
+    logger.info(f"📥 POST /posts/stream - username: {username}, quantity: {quantity}")
+    
+    posts = extraction_service.stream_posts(username, quantity, user_id, cache_mode)
+    
+    # Aguardar o primeiro post antes de responder, para que erros iniciais
+    # (perfil inexistente, 429...) sejam tratados pelos exception handlers
+    # A extração começa no primeiro item e herda o prazo definido aqui
+    try:
+        with deadline_scope(request_deadline(timeout)):
+            first_post = await posts.__anext__()
+    except StopAsyncIteration:
+        first_post = None
+    
+    async def ndjson():
+        sent = 0
+        try:
+            if first_post is None:
+                return
+            yield first_post.json() + "\n"
+            sent += 1
+            async for post in posts:
+                yield post.json() + "\n"
+                sent += 1
+            logger.info(f"✓ Streaming concluído: {sent} posts de @{username}")
+        except InstagramAPIException as e:
+            logger.error(f"Erro no streaming de @{username} após {sent} posts: {e.message}")
+            yield json.dumps({"error": e.__class__.__name__, "message": e.message, "details": e.details}) + "\n"
+        finally:
+            await posts.aclose()
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@app.post("/posts/page", response_model=PostsPageResponse, tags=["Extração"], dependencies=[Depends(verify_api_key)])
+async def extract_posts_page(
+    username: str = Body(...),
+    page_size: int = Body(Config.POSTS_PAGE_SIZE, ge=1, le=50),
+    cursor: Optional[str] = Body(None),
+    timeout: Optional[float] = Body(None, gt=0, le=Config.REQUEST_TIMEOUT_MAX_SECONDS)
+):
+    """
+    Extrai posts página a página, sem limite de histórico
+    
+    - **username**: Username do perfil (sem @)
+    - **page_size**: Posts por página (1-50)
+    - **cursor**: `next_cursor` da página anterior (omitir na primeira página)
+    - **timeout**: Prazo da requisição em segundos (opcional, padrão REQUEST_TIMEOUT_SECONDS)
+    
+    Requer header: `Authorization: <API_KEY>`
+    """
+    logger.info(f"📥 POST /posts/page - username: {username}, page_size: {page_size}, cursor: {bool(cursor)}")
+    
+    with deadline_scope(request_deadline(timeout)):
+        posts, next_cursor = await extraction_service.extract_posts_page(username, page_size, cursor)
+    
+    logger.info(f"✓ Página extraída: {len(posts)} posts de @{username} (has_more={bool(next_cursor)})")
+    
+    return _trusted_response(PostsPageResponse.construct(
+        success=True,
+        username=username,
+        total_posts=len(posts),
+        posts=posts,
+        next_cursor=next_cursor,
+        has_more=next_cursor is not None
+    ))
+
+
 @app.post("/stories", response_model=StoriesResponse, tags=["Extração"], dependencies=[Depends(verify_api_key)])
-async def extract_stories(username: str = Body(...)):
+async def extract_stories(
+    username: str = Body(...),
+    user_id: Optional[int] = Body(None),
+    cache_mode: CacheMode = Body("default"),
+    timeout: Optional[float] = Body(None, gt=0, le=Config.REQUEST_TIMEOUT_MAX_SECONDS)
+):
     """
     Extrai stories de um perfil do Instagram
     
     - **username**: Username do perfil (sem @)
+    - **user_id**: pk do perfil, se já conhecido (opcional, evita a busca por username)
+    - **cache_mode**: default (usa o cache), bypass (ignora o cache) ou refresh (força nova extração)
+    - **timeout**: Prazo da requisição em segundos (opcional, padrão REQUEST_TIMEOUT_SECONDS)
     
     Requer header: `Authorization: <API_KEY>`
     """
@@ -239,10 +457,11 @@ async def extract_stories(username: str = Body(...)):
     
     try:
         # Extrair stories
-        stories = extractor.extract_stories(username)
+        with deadline_scope(request_deadline(timeout)):
+            stories = await extraction_service.extract_stories(username, user_id, cache_mode)
         
         # Montar response
-        response = StoriesResponse(
+        response = StoriesResponse.construct(
             success=True,
             username=username,
             total_stories=len(stories),
@@ -252,7 +471,7 @@ async def extract_stories(username: str = Body(...)):
         
         logger.info(f"✓ Extração concluída: {len(stories)} stories de @{username}")
         
-        return response
+        return _trusted_response(response)
         
     except InstagramAPIException:
         # Re-lançar para ser tratado pelo exception handler
@@ -262,6 +481,88 @@ async def extract_stories(username: str = Body(...)):
         raise
 
 
+@app.post("/snapshot", response_model=SnapshotResponse, tags=["Extração"], dependencies=[Depends(verify_api_key)])
+async def extract_snapshot(
+    username: str = Body(...),
+    quantity: int = Body(..., ge=1, le=50),
+    user_id: Optional[int] = Body(None),
+    cache_mode: CacheMode = Body("default"),
+    timeout: Optional[float] = Body(None, gt=0, le=Config.REQUEST_TIMEOUT_MAX_SECONDS)
+):
+    """
+    Extrai posts e stories de um perfil em uma única requisição
+    (uma conta, um login e uma busca de user_id; posts e stories em paralelo se a conta
+    tiver um segundo cliente ocioso no pool)
+    
+    - **username**: Username do perfil (sem @)
+    - **quantity**: Quantidade de posts (1-50)
+    - **user_id**: pk do perfil, se já conhecido (opcional, evita a busca por username)
+    - **cache_mode**: default (usa o cache), bypass (ignora o cache) ou refresh (força nova extração)
+    - **timeout**: Prazo da requisição em segundos (opcional, padrão REQUEST_TIMEOUT_SECONDS)
+    
+    Requer header: `Authorization: <API_KEY>`
+    """
+    logger.info(f"📥 POST /snapshot - username: {username}, quantity: {quantity}")
+    
+    with deadline_scope(request_deadline(timeout)):
+        posts, stories = await extraction_service.extract_snapshot(username, quantity, user_id, cache_mode)
+    
+    logger.info(f"✓ Snapshot concluído: {len(posts)} posts e {len(stories)} stories de @{username}")
+    
+    return _trusted_response(SnapshotResponse.construct(
+        success=True,
+        username=username,
+        total_posts=len(posts),
+        posts=posts,
+        total_stories=len(stories),
+        stories=stories,
+        message=f"Snapshot extraído com sucesso de @{username}"
+    ))
+
+
+
+@app.post("/batch", response_model=BatchResponse, tags=["Extração"], dependencies=[Depends(verify_api_key)])
+async def extract_batch(
+    items: List[BatchItem] = Body(..., embed=True),
+    timeout: Optional[float] = Body(None, gt=0, le=Config.REQUEST_TIMEOUT_MAX_SECONDS)
+):
+    """
+    Extrai vários perfis em uma requisição, em paralelo entre as contas disponíveis
+    
+    - **items**: Lista de `{"username", "type" (posts/stories/snapshot), "quantity"}`
+      (até BATCH_MAX_ITEMS itens)
+    - **timeout**: Prazo de cada item em segundos, contado a partir do início do item
+      (opcional, padrão REQUEST_TIMEOUT_SECONDS)
+    
+    A falha de um item não interrompe os demais: cada resultado traz `success` e,
+    em caso de erro, `error`/`message`.
+    
+    Requer header: `Authorization: <API_KEY>`
+    """
+    logger.info(f"📥 POST /batch - {len(items)} itens")
+    
+    if not items:
+        raise InvalidRequestError("O batch deve ter pelo menos um item")
+    if len(items) > Config.BATCH_MAX_ITEMS:
+        raise InvalidRequestError(
+            f"O batch aceita no máximo {Config.BATCH_MAX_ITEMS} itens",
+            details={'received': len(items), 'max_items': Config.BATCH_MAX_ITEMS}
+        )
+    
+    results = await extraction_service.extract_batch(items, timeout)
+    succeeded = sum(1 for result in results if result.success)
+    
+    logger.info(f"✓ Batch concluído: {succeeded}/{len(results)} itens com sucesso")
+    
+    return _trusted_response(BatchResponse.construct(
+        success=succeeded == len(results),
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results
+    ))
+
+
 # ==================== STARTUP MESSAGE ====================
 
 if __name__ == "__main__":
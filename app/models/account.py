@@ -28,6 +28,7 @@ class Account:
     usage_count: int = 0
     error_count: int = 0
     last_error: Optional[str] = None
+    session_verified_at: Optional[datetime] = None
     
     def __post_init__(self):
         """Processa campos após inicialização"""
@@ -112,6 +113,28 @@ class Account:
         self.error_count += 1
         self.last_error = error_message
     
+    def mark_session_verified(self):
+        """Registra que a sessão da conta acabou de ser validada no Instagram"""
+        self.session_verified_at = datetime.now()
+    
+    def invalidate_session(self):
+        """Remove o registro de validação (a próxima sessão será verificada)"""
+        self.session_verified_at = None
+    
+    def is_session_verified(self, ttl_minutes: int) -> bool:
+        """
+        Verifica se a sessão foi validada dentro do TTL
+        
+        Args:
+            ttl_minutes: Validade da verificação em minutos (0 desativa o cache)
+        
+        Returns:
+            True se a sessão pode ser usada sem nova verificação
+        """
+        if ttl_minutes <= 0 or not self.session_verified_at:
+            return False
+        return datetime.now() - self.session_verified_at < timedelta(minutes=ttl_minutes)
+    
     def get_proxy_url(self, with_protocol: bool = True) -> str:
         """
         Retorna URL completa do proxy
@@ -140,7 +163,8 @@ class Account:
             'last_used': self.last_used.isoformat() if self.last_used else None,
             'usage_count': self.usage_count,
             'error_count': self.error_count,
-            'last_error': self.last_error
+            'last_error': self.last_error,
+            'session_verified_at': self.session_verified_at.isoformat() if self.session_verified_at else None
         }
     
     def __repr__(self) -> str:
@@ -1,16 +1,26 @@
 """
 Pydantic models para requisições e respostas da API
 """
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Literal
 from pydantic import BaseModel, Field, validator
 
 
+# Uso do cache de respostas: default (usa o cache), bypass (ignora o cache)
+# ou refresh (força nova extração e atualiza o cache)
+CacheMode = Literal["default", "bypass", "refresh"]
+
+# Tipos de extração aceitos no batch
+ExtractionType = Literal["posts", "stories", "snapshot"]
+
+
 # ==================== REQUEST MODELS ====================
 
 class PostsRequest(BaseModel):
     """Request para extrair posts de um perfil"""
     username: str = Field(..., description="Username do perfil (sem @)", min_length=1, max_length=30)
     quantity: int = Field(..., description="Quantidade de posts a extrair", ge=1, le=50)
+    user_id: Optional[int] = Field(None, description="pk do perfil, se já conhecido (evita a busca por username)")
+    cache_mode: CacheMode = Field("default", description="Uso do cache: default, bypass ou refresh")
     
     @validator('username')
     def validate_username(cls, v):
@@ -35,6 +45,8 @@ class PostsRequest(BaseModel):
 class StoriesRequest(BaseModel):
     """Request para extrair stories de um perfil"""
     username: str = Field(..., description="Username do perfil (sem @)", min_length=1, max_length=30)
+    user_id: Optional[int] = Field(None, description="pk do perfil, se já conhecido (evita a busca por username)")
+    cache_mode: CacheMode = Field("default", description="Uso do cache: default, bypass ou refresh")
     
     @validator('username')
     def validate_username(cls, v):
@@ -54,6 +66,32 @@ class StoriesRequest(BaseModel):
         }
 
 
+class BatchItem(BaseModel):
+    """Item de uma extração em lote"""
+    username: str = Field(..., description="Username do perfil (sem @)", min_length=1, max_length=30)
+    type: ExtractionType = Field("posts", description="Tipo de extração: posts, stories ou snapshot")
+    quantity: int = Field(12, description="Quantidade de posts (posts/snapshot)", ge=1, le=50)
+    
+    @validator('username')
+    def validate_username(cls, v):
+        """Remove @ se fornecido e valida caracteres"""
+        username = v.strip().lstrip('@')
+        if not username:
+            raise ValueError("Username não pode ser vazio")
+        if not all(c.isalnum() or c in '._' for c in username):
+            raise ValueError("Username contém caracteres inválidos")
+        return username
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "username": "example_user",
+                "type": "posts",
+                "quantity": 10
+            }
+        }
+
+
 # ==================== RESPONSE MODELS ====================
 
 class MediaItem(BaseModel):
@@ -146,6 +184,28 @@ class PostsResponse(BaseModel):
         }
 
 
+class PostsPageResponse(BaseModel):
+    """Response para extração paginada de posts"""
+    success: bool = Field(..., description="Se a operação foi bem-sucedida")
+    username: str = Field(..., description="Username do perfil extraído")
+    total_posts: int = Field(..., description="Total de posts nesta página")
+    posts: List[Post] = Field(default_factory=list, description="Lista de posts")
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (null se não houver mais posts)")
+    has_more: bool = Field(False, description="Se há mais páginas")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "username": "example_user",
+                "total_posts": 12,
+                "posts": [],
+                "next_cursor": "eyJhIjoiY29udGEiLC...",
+                "has_more": True
+            }
+        }
+
+
 class StoriesResponse(BaseModel):
     """Response para extração de stories"""
     success: bool = Field(..., description="Se a operação foi bem-sucedida")
@@ -166,6 +226,66 @@ class StoriesResponse(BaseModel):
         }
 
 
+class SnapshotResponse(BaseModel):
+    """Response para snapshot de um perfil (posts + stories)"""
+    success: bool = Field(..., description="Se a operação foi bem-sucedida")
+    username: str = Field(..., description="Username do perfil extraído")
+    total_posts: int = Field(..., description="Total de posts retornados")
+    posts: List[Post] = Field(default_factory=list, description="Lista de posts")
+    total_stories: int = Field(..., description="Total de stories retornados")
+    stories: List[Story] = Field(default_factory=list, description="Lista de stories")
+    message: Optional[str] = Field(None, description="Mensagem adicional")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "username": "example_user",
+                "total_posts": 10,
+                "posts": [],
+                "total_stories": 2,
+                "stories": [],
+                "message": "Snapshot extraído com sucesso"
+            }
+        }
+
+
+class BatchItemResult(BaseModel):
+    """Resultado de um item da extração em lote"""
+    username: str = Field(..., description="Username do perfil")
+    type: ExtractionType = Field(..., description="Tipo de extração")
+    success: bool = Field(..., description="Se a extração do item foi bem-sucedida")
+    posts: Optional[List[Post]] = Field(None, description="Posts (posts/snapshot)")
+    stories: Optional[List[Story]] = Field(None, description="Stories (stories/snapshot)")
+    error: Optional[str] = Field(None, description="Tipo de erro, se falhou")
+    message: Optional[str] = Field(None, description="Mensagem de erro, se falhou")
+    details: Optional[Any] = Field(None, description="Detalhes adicionais do erro")
+
+
+class BatchResponse(BaseModel):
+    """Response para extração em lote"""
+    success: bool = Field(..., description="True se todos os itens foram extraídos")
+    total: int = Field(..., description="Total de itens")
+    succeeded: int = Field(..., description="Itens extraídos com sucesso")
+    failed: int = Field(..., description="Itens com erro")
+    results: List[BatchItemResult] = Field(default_factory=list, description="Resultados, na ordem dos itens")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": False,
+                "total": 2,
+                "succeeded": 1,
+                "failed": 1,
+                "results": [
+                    {"username": "example_user", "type": "posts", "success": True, "posts": []},
+                    {"username": "nao_existe", "type": "posts", "success": False,
+                     "error": "ProfileNotFound", "message": "Perfil @nao_existe não existe"}
+                ]
+            }
+        }
+
+
 class ErrorResponse(BaseModel):
     """Response para erros"""
     success: bool = Field(False, description="Sempre False para erros")
@@ -2,11 +2,14 @@
 Gerenciador de pool de contas do Instagram
 """
 import pandas as pd
-from typing import List, Optional
+from typing import Collection, Dict, List, Optional
 from pathlib import Path
+from datetime import datetime
 import threading
+import time
 from app.models.account import Account
 from app.config import Config
+from app.utils.deadline import current_deadline
 from app.utils.logger import get_logger
 from app.utils.exceptions import (
     AccountPoolExhausted,
@@ -35,6 +38,8 @@ class AccountManager:
         self.accounts: List[Account] = []
         self.current_index = 0
         self._lock = threading.Lock()  # Thread-safe para requisições concorrentes
+        # Próximo uso permitido de cada conta (time.monotonic), para ACCOUNT_MIN_INTERVAL_SECONDS
+        self._next_use_at: Dict[str, float] = {}
         
         logger.info(f"Inicializando AccountManager com CSV: {self.csv_path}")
         self._load_accounts()
@@ -105,41 +110,112 @@ class AccountManager:
                 raise
             raise CSVParseError(f"Erro inesperado ao carregar CSV: {e}")
     
-    def get_next_account(self) -> Account:
+    def get_next_account(
+        self,
+        preferred: Optional[str] = None,
+        exclude: Optional[Collection[str]] = None
+    ) -> Account:
         """
         Retorna a próxima conta disponível (rotação round-robin)
         
+        Respeita o intervalo mínimo entre usos de uma mesma conta (ACCOUNT_MIN_INTERVAL_SECONDS):
+        contas ainda no intervalo são puladas; se todas estiverem, aguarda a que libera primeiro
+        
+        Args:
+            preferred: Username de uma conta a usar se estiver disponível
+                (ex.: manter a mesma sessão entre páginas de uma paginação)
+            exclude: Usernames que não devem ser escolhidos (ex.: contas em uso pela mesma requisição)
+        
         Returns:
             Account disponível
             
         Raises:
             AccountPoolExhausted: Se nenhuma conta estiver disponível
+            DeadlineExceeded: Se o intervalo mínimo da conta terminar depois do prazo da requisição
+                (o uso não é reservado)
         """
+        deadline = current_deadline()
         with self._lock:
-            attempts = 0
-            max_attempts = len(self.accounts)
+            account = self._select_account(preferred, exclude or ())
+            wait_seconds = self._reserve_pacing(account, deadline.remaining() if deadline is not None else None)
+        
+        if wait_seconds is None:
+            raise deadline.exceeded(f"aguardando intervalo mínimo da conta {account.username}")
+        
+        if wait_seconds > 0:
+            logger.debug(f"  Aguardando {wait_seconds:.2f}s pelo intervalo mínimo da conta {account.username}")
+            time.sleep(wait_seconds)
+        
+        return account
+    
+    def _select_account(self, preferred: Optional[str] = None, exclude: Collection[str] = ()) -> Account:
+        """Escolhe a conta (chamar com o lock)"""
+        if preferred and preferred not in exclude:
+            account = self.get_account_by_username(preferred)
+            if account and account.is_available():
+                logger.info(f"✓ Conta preferida selecionada: {account.username} (uso: {account.usage_count}x)")
+                return account
+            logger.debug(f"  Conta preferida {preferred} indisponível, usando rotação")
+        
+        now = time.monotonic()
+        attempts = 0
+        max_attempts = len(self.accounts)
+        soonest: Optional[Account] = None
+        
+        while attempts < max_attempts:
+            # Pegar conta atual
+            account = self.accounts[self.current_index]
+            
+            # Avançar índice (round-robin)
+            self.current_index = (self.current_index + 1) % len(self.accounts)
+            attempts += 1
+            
+            if account.username in exclude:
+                continue
             
-            while attempts < max_attempts:
-                # Pegar conta atual
-                account = self.accounts[self.current_index]
-                
-                # Avançar índice (round-robin)
-                self.current_index = (self.current_index + 1) % len(self.accounts)
-                attempts += 1
-                
-                # Verificar se está disponível
-                if account.is_available():
+            # Verificar se está disponível
+            if account.is_available():
+                if self._next_use_at.get(account.username, 0) <= now:
                     logger.info(f"✓ Conta selecionada: {account.username} (uso: {account.usage_count}x)")
                     return account
-                else:
-                    reason = "frozen" if account.is_frozen else f"status={account.status}"
-                    logger.debug(f"  Conta {account.username} indisponível ({reason}), tentando próxima...")
-            
-            # Nenhuma conta disponível
-            raise AccountPoolExhausted(
-                "Todas as contas estão indisponíveis ou em quarentena",
-                details=self.get_pool_status()
-            )
+                if soonest is None or self._next_use_at[account.username] < self._next_use_at[soonest.username]:
+                    soonest = account
+                logger.debug(f"  Conta {account.username} dentro do intervalo mínimo, tentando próxima...")
+            else:
+                reason = "frozen" if account.is_frozen else f"status={account.status}"
+                logger.debug(f"  Conta {account.username} indisponível ({reason}), tentando próxima...")
+        
+        if soonest is not None:
+            logger.info(f"✓ Conta selecionada: {soonest.username} (uso: {soonest.usage_count}x, aguardando intervalo)")
+            return soonest
+        
+        # Nenhuma conta disponível
+        raise AccountPoolExhausted(
+            "Todas as contas estão indisponíveis ou em quarentena",
+            details=self.get_pool_status()
+        )
+    
+    def _reserve_pacing(self, account: Account, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Reserva o próximo uso da conta (chamar com o lock)
+        
+        Args:
+            max_wait: Espera máxima aceita (prazo restante da requisição), ou None sem limite
+        
+        Returns:
+            Segundos a aguardar antes de usar a conta, ou None se a espera passar de max_wait
+            (nada é reservado, para não atrasar quem vier depois)
+        """
+        interval = Config.ACCOUNT_MIN_INTERVAL_SECONDS
+        if interval <= 0:
+            return 0.0
+        
+        now = time.monotonic()
+        start = max(now, self._next_use_at.get(account.username, 0))
+        if max_wait is not None and start - now >= max_wait:
+            return None
+        self._next_use_at[account.username] = start + interval
+        return start - now
     
     def get_account_by_username(self, username: str) -> Optional[Account]:
         """
@@ -165,6 +241,19 @@ class AccountManager:
         """
         return [acc for acc in self.accounts if acc.is_available()]
     
+    def get_earliest_unfreeze(self) -> Optional[datetime]:
+        """
+        Retorna quando a primeira conta congelada (com status 'success') volta a ficar disponível
+        
+        Returns:
+            Datetime do descongelamento mais próximo ou None se nenhuma conta estiver congelada
+        """
+        frozen_until = [
+            acc.frozen_until for acc in self.accounts
+            if acc.status == 'success' and acc.is_frozen and acc.frozen_until
+        ]
+        return min(frozen_until) if frozen_until else None
+    
     def freeze_account(self, username: str, duration_minutes: int = None, reason: str = None):
         """
         Congela uma conta específica
@@ -221,6 +310,19 @@ class AccountManager:
             account.mark_error(error_message)
             logger.error(f"✗ Erro registrado na conta {username}: {error_message}")
     
+    def invalidate_session(self, username: str):
+        """
+        Invalida o registro de sessão verificada de uma conta
+        (usado quando um LoginRequired aparece durante a extração)
+        
+        Args:
+            username: Username da conta
+        """
+        account = self.get_account_by_username(username)
+        if account:
+            account.invalidate_session()
+            logger.info(f"Sessão da conta {username} marcada para nova verificação")
+    
     def get_pool_status(self) -> dict:
         """
         Retorna status do pool de contas
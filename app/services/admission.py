@@ -0,0 +1,241 @@
+"""
+Controle de admissão das requisições de extração (limite de concorrência + fila)
+"""
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Deque, Dict, Optional
+import asyncio
+import concurrent.futures
+import math
+import time
+
+from app.services.account_manager import AccountManager
+from app.config import Config
+from app.utils.logger import get_logger
+from app.utils.exceptions import TooManyRequests
+
+logger = get_logger("admission")
+
+
+class AdmissionSlot:
+    """
+    Vaga de extração ocupada por uma requisição
+    keep_until() adia a devolução da vaga até uma thread de extração terminar
+    """
+
+    def __init__(self):
+        self.pending: Optional[concurrent.futures.Future] = None
+
+    def keep_until(self, job: concurrent.futures.Future):
+        """
+        Mantém a vaga ocupada até o job terminar, mesmo depois de a requisição sair
+        (ex.: prazo esgotado com a thread ainda chamando o Instagram)
+
+        Args:
+            job: Future da thread de extração
+        """
+        self.pending = job
+
+
+class AdmissionController:
+    """
+    Limita o número de extrações simultâneas a MAX_CONCURRENT_REQUESTS
+    Requisições excedentes aguardam em uma fila limitada; quando a fila está cheia
+    (ou a espera passa do timeout) a requisição é rejeitada com TooManyRequests,
+    informando em quantos segundos vale a pena tentar de novo
+
+    Deve ser usado apenas a partir do event loop (não é thread-safe)
+    """
+
+    def __init__(
+        self,
+        account_manager: Optional[AccountManager] = None,
+        max_concurrent: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None
+    ):
+        """
+        Inicializa o controlador
+
+        Args:
+            account_manager: Gerenciador de contas (para considerar contas congeladas no Retry-After)
+            max_concurrent: Extrações simultâneas (usa Config se não fornecido)
+            max_queue: Tamanho máximo da fila de espera (usa Config se não fornecido)
+            queue_timeout: Espera máxima na fila em segundos (usa Config se não fornecido)
+        """
+        self.account_manager = account_manager
+        self.max_concurrent = max_concurrent or Config.MAX_CONCURRENT_REQUESTS
+        self.max_queue = Config.ADMISSION_QUEUE_SIZE if max_queue is None else max_queue
+        self.queue_timeout = Config.ADMISSION_QUEUE_TIMEOUT_SECONDS if queue_timeout is None else queue_timeout
+
+        self._active = 0
+        # Vagas de requisições já encerradas cujas threads de extração ainda não terminaram
+        self._orphaned = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        # Média móvel (EWMA) da duração das extrações, usada para estimar a espera
+        self._avg_duration = Config.ADMISSION_INITIAL_DURATION_SECONDS
+        self._admitted = 0
+        self._rejected = 0
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Context manager que reserva uma vaga de extração
+
+        Yields:
+            AdmissionSlot (a vaga é devolvida na saída, ou quando o job de keep_until() terminar)
+
+        Raises:
+            TooManyRequests: Se a fila estiver cheia ou a espera exceder o timeout
+        """
+        await self._acquire()
+        start = time.monotonic()
+        slot = AdmissionSlot()
+        try:
+            yield slot
+        finally:
+            self._record_duration(time.monotonic() - start)
+            if slot.pending is not None and not slot.pending.done():
+                # A thread ainda trabalha: a vaga só volta (ou passa à fila) quando ela terminar
+                self._orphaned += 1
+                loop = asyncio.get_running_loop()
+                slot.pending.add_done_callback(lambda _: self._release_orphan_threadsafe(loop))
+            else:
+                self._release()
+
+    def try_admit(self) -> bool:
+        """
+        Reserva uma vaga apenas se houver uma livre, sem entrar na fila
+        (a vaga deve ser devolvida com release())
+
+        Returns:
+            True se a vaga foi reservada
+        """
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            self._admitted += 1
+            return True
+        return False
+
+    def release(self):
+        """Devolve uma vaga reservada com try_admit()"""
+        self._release()
+
+    async def _acquire(self):
+        """Ocupa uma vaga, aguardando na fila se necessário"""
+        if self.try_admit():
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._reject("fila de extração cheia")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout or None)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # A vaga foi liberada no mesmo instante do timeout: aproveitar
+                self._admitted += 1
+                return
+            future.cancel()
+            self._discard_waiter(future)
+            self._reject("tempo de espera na fila excedido")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Já tínhamos recebido a vaga: devolver para o próximo da fila
+                self._release()
+            else:
+                future.cancel()
+                self._discard_waiter(future)
+            raise
+
+        self._admitted += 1
+
+    def _release(self):
+        """Libera uma vaga, transferindo-a diretamente ao primeiro da fila se houver"""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def _release_orphan_threadsafe(self, loop: asyncio.AbstractEventLoop):
+        """Devolve, a partir da thread de extração, a vaga mantida por keep_until()"""
+        try:
+            loop.call_soon_threadsafe(self._release_orphan)
+        except RuntimeError:
+            # Event loop já encerrado (shutdown)
+            pass
+
+    def _release_orphan(self):
+        self._orphaned -= 1
+        self._release()
+
+    def _discard_waiter(self, future: asyncio.Future):
+        """Remove um waiter que desistiu da fila"""
+        try:
+            self._waiters.remove(future)
+        except ValueError:
+            pass
+
+    def _reject(self, reason: str):
+        """Lança TooManyRequests com o Retry-After calculado"""
+        self._rejected += 1
+        retry_after = self.retry_after()
+        logger.warning(f"⛔ Requisição rejeitada ({reason}), Retry-After: {retry_after}s")
+        raise TooManyRequests(
+            f"Servidor ocupado: {reason}",
+            details={
+                'retry_after_seconds': retry_after,
+                'active': self._active,
+                'queued': len(self._waiters)
+            },
+            retry_after=retry_after
+        )
+
+    def _record_duration(self, duration: float):
+        """Atualiza a média móvel de duração das extrações"""
+        self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+
+    def retry_after(self) -> int:
+        """
+        Estima em quantos segundos uma nova requisição teria vaga
+        Considera a fila atual e, se não houver contas disponíveis, o menor frozen_until do pool
+
+        Returns:
+            Segundos (mínimo 1)
+        """
+        queue_wait = (len(self._waiters) + 1) * self._avg_duration / self.max_concurrent
+
+        unfreeze_wait = 0.0
+        if self.account_manager and not self.account_manager.get_available_accounts():
+            earliest = self.account_manager.get_earliest_unfreeze()
+            if earliest:
+                unfreeze_wait = (earliest - datetime.now()).total_seconds()
+
+        return max(1, math.ceil(max(queue_wait, unfreeze_wait)))
+
+    def get_status(self) -> Dict:
+        """
+        Retorna estatísticas de admissão
+
+        Returns:
+            Dicionário com estatísticas
+        """
+        return {
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'active': self._active,
+            'orphaned': self._orphaned,
+            'queued': len(self._waiters),
+            'admitted': self._admitted,
+            'rejected': self._rejected,
+            'avg_duration_seconds': round(self._avg_duration, 2)
+        }
+
+    def __repr__(self) -> str:
+        return f"AdmissionController(active={self._active}/{self.max_concurrent}, queued={len(self._waiters)})"
@@ -0,0 +1,446 @@
+"""
+Roteamento entre os backends do instagrapi: API privada (v1) e GraphQL web (gql)
+"""
+from enum import Enum
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+import json
+import threading
+import time
+
+from instagrapi import config as instagrapi_config
+from instagrapi.extractors import extract_media_v1
+
+from instagrapi.exceptions import (
+    ChallengeRequired,
+    ClientNotFoundError,
+    FeedbackRequired,
+    LoginRequired,
+    UserNotFound
+)
+
+from app.services import raw_parser
+from app.utils.logger import get_logger
+from app.utils.exceptions import ConfigurationError, DeadlineExceeded, ProfileNotFound
+
+logger = get_logger("backend_router")
+
+
+class Backend(str, Enum):
+    """Caminho de código do instagrapi usado em uma chamada"""
+    V1 = "v1"          # API privada (mobile), com a sessão da conta
+    GQL = "gql"        # GraphQL/web
+    AUTO = "auto"      # Escolha interna do instagrapi (gql com fallback para v1)
+
+
+ROUTING_MODES = ("cost", "v1", "gql", "instagrapi")
+
+# Erros que não dependem do backend (perfil inexistente, prazo, conta bloqueada):
+# trocar de backend não resolve e a política de retry precisa vê-los
+NO_FALLBACK_ERRORS = (
+    UserNotFound,
+    ProfileNotFound,
+    DeadlineExceeded,
+    LoginRequired,
+    ChallengeRequired,
+    FeedbackRequired
+)
+
+
+def _stories_gql(cl, user_id: int):
+    try:
+        return cl.user_stories_gql(user_id)
+    except ClientNotFoundError as e:
+        raise UserNotFound(e, user_id=user_id)
+    except IndexError:
+        # Perfil sem stories ativos
+        return []
+
+
+def _user_id_gql(cl, username: str) -> int:
+    try:
+        return int(cl.user_info_by_username_gql(username).pk)
+    except ClientNotFoundError as e:
+        raise UserNotFound(e, username=username)
+
+
+def _v1_feed_page(cl, user_id: int, amount: int, end_cursor: str) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Página do feed pela API privada (feed/user/{id}/): itens brutos e próximo max_id
+    Chamada direta ao private_request porque user_medias_v1/user_medias_paginated_v1 do
+    instagrapi engolem qualquer erro que não seja PrivateError (rede, prazo, JSON inválido)
+    e devolvem uma página vazia, que pareceria o fim do feed
+    """
+    data = cl.private_request(
+        f"feed/user/{int(user_id)}/",
+        params={
+            "max_id": end_cursor,
+            "count": amount,
+            "rank_token": cl.rank_token,
+            "ranked_content": "true"
+        }
+    )
+    return data.get("items", [])[:amount], data.get("next_max_id") or ""
+
+
+def _page_v1(cl, user_id: int, amount: int, end_cursor: str):
+    items, next_max_id = _v1_feed_page(cl, user_id, amount, end_cursor)
+    return [extract_media_v1(item) for item in items], next_max_id
+
+
+def _collect(page: Callable[..., Tuple[list, str]]) -> Callable[..., list]:
+    """Junta páginas até `amount` posts (equivalente a user_medias_v1/_gql)"""
+    def collect(cl, user_id: int, amount: int) -> list:
+        posts, end_cursor = [], ""
+        while len(posts) < amount:
+            batch, end_cursor = page(cl, user_id, amount - len(posts), end_cursor)
+            posts.extend(batch)
+            if not batch or not end_cursor:
+                break
+        return posts[:amount]
+    return collect
+
+
+# Operação -> backend -> função (cliente instagrapi, *args) -> resultado
+BACKEND_CALLS: Dict[str, Dict[Backend, Callable[..., Any]]] = {
+    "medias": {
+        Backend.V1: _collect(_page_v1),
+        Backend.GQL: lambda cl, user_id, amount: cl.user_medias_gql(user_id, amount),
+        Backend.AUTO: lambda cl, user_id, amount: cl.user_medias(user_id, amount=amount)
+    },
+    "medias_page": {
+        Backend.V1: _page_v1,
+        Backend.GQL: lambda cl, user_id, amount, end_cursor: cl.user_medias_paginated_gql(
+            user_id, amount, end_cursor=end_cursor
+        ),
+        Backend.AUTO: lambda cl, user_id, amount, end_cursor: cl.user_medias_paginated(
+            user_id, amount, end_cursor=end_cursor
+        )
+    },
+    "stories": {
+        Backend.V1: lambda cl, user_id: cl.user_stories_v1(user_id),
+        Backend.GQL: _stories_gql,
+        Backend.AUTO: lambda cl, user_id: cl.user_stories(user_id)
+    },
+    "user_id": {
+        Backend.V1: lambda cl, username: int(cl.user_info_by_username_v1(username).pk),
+        Backend.GQL: _user_id_gql,
+        Backend.AUTO: lambda cl, username: int(cl.user_id_from_username(username))
+    }
+}
+
+
+# Perfil + primeira página do feed em uma única chamada (endpoint usado pelo site)
+WEB_PROFILE_INFO_URL = "https://i.instagram.com/api/v1/users/web_profile_info/"
+WEB_APP_ID = "936619743392459"
+
+
+class WebProfile(NamedTuple):
+    """Resposta de web_profile_info"""
+    user_id: int
+    is_private: bool
+    media_count: int
+    nodes: List[Dict[str, Any]]   # JSON bruto da primeira página do feed (até 12 posts)
+
+
+def fetch_web_profile(cl, username: str) -> WebProfile:
+    """
+    Busca user_id, dados do perfil e a primeira página de posts em uma única chamada web
+
+    Args:
+        cl: Cliente instagrapi (InstagramClient.client)
+        username: Username do perfil
+
+    Returns:
+        WebProfile
+
+    Raises:
+        UserNotFound: Se o perfil não existir
+        ClientError: Se a chamada falhar (login exigido, throttling etc.)
+    """
+    try:
+        data = cl.public_request(
+            WEB_PROFILE_INFO_URL,
+            params={"username": username.lower()},
+            headers={"x-ig-app-id": WEB_APP_ID},
+            return_json=True,
+            retries_count=1
+        )
+    except ClientNotFoundError as e:
+        raise UserNotFound(e, username=username)
+
+    user = (data.get("data") or {}).get("user")
+    if not user:
+        raise UserNotFound(f"web_profile_info sem usuário para {username}", username=username)
+
+    timeline = user.get("edge_owner_to_timeline_media") or {}
+    return WebProfile(
+        user_id=int(user["id"]),
+        is_private=bool(user.get("is_private")),
+        media_count=timeline.get("count", 0),
+        nodes=[edge["node"] for edge in timeline.get("edges", [])]
+    )
+
+
+# query_hash das consultas GraphQL usadas pelo instagrapi (feed do perfil e reels/stories)
+GQL_USER_MEDIAS_QUERY_HASH = "e7e2f4da4b02303f74f0841279e52d76"
+GQL_REELS_MEDIA_QUERY_HASH = "303a4ae99711322310f25250d988f3b7"
+
+
+def _raw_page_v1(cl, user_id: int, amount: int, end_cursor: str):
+    items, next_max_id = _v1_feed_page(cl, user_id, amount, end_cursor)
+    return raw_parser.posts_from_v1(items), next_max_id
+
+
+def _raw_page_gql(cl, user_id: int, amount: int, end_cursor: str):
+    data = cl.public_graphql_request(
+        {"id": int(user_id), "first": min(amount, 50), "after": end_cursor},
+        query_hash=GQL_USER_MEDIAS_QUERY_HASH
+    )
+    timeline = (data.get("user") or {}).get("edge_owner_to_timeline_media") or {}
+    page_info = timeline.get("page_info") or {}
+    nodes = [edge["node"] for edge in timeline.get("edges", [])][:amount]
+    return raw_parser.posts_from_gql(nodes), page_info.get("end_cursor") if page_info.get("has_next_page") else ""
+
+
+def _raw_stories_v1(cl, user_id: int):
+    data = cl.private_request(
+        f"feed/user/{int(user_id)}/story/",
+        params={"supported_capabilities_new": json.dumps(instagrapi_config.SUPPORTED_CAPABILITIES)}
+    )
+    return raw_parser.stories_from_v1((data.get("reel") or {}).get("items", []))
+
+
+def _raw_stories_gql(cl, user_id: int):
+    cl.inject_sessionid_to_public()
+    try:
+        data = cl.public_graphql_request(
+            {"reel_ids": [int(user_id)], "precomposed_overlay": False},
+            query_hash=GQL_REELS_MEDIA_QUERY_HASH
+        )
+    except ClientNotFoundError as e:
+        raise UserNotFound(e, user_id=user_id)
+    reels = data.get("reels_media") or []
+    # Perfil sem stories ativos não aparece em reels_media
+    return raw_parser.stories_from_gql(reels[0].get("items", [])) if reels else []
+
+
+# Mesmas operações lendo o JSON bruto: devolvem Post/Story já convertidos (RAW_MEDIA_PARSER)
+RAW_BACKEND_CALLS: Dict[str, Dict[Backend, Callable[..., Any]]] = {
+    "medias": {
+        Backend.V1: _collect(_raw_page_v1),
+        Backend.GQL: _collect(_raw_page_gql)
+    },
+    "medias_page": {
+        Backend.V1: _raw_page_v1,
+        Backend.GQL: _raw_page_gql
+    },
+    "stories": {
+        Backend.V1: _raw_stories_v1,
+        Backend.GQL: _raw_stories_gql
+    }
+}
+
+
+class BackendStats:
+    """
+    Médias móveis exponenciais (EWMA) de latência e taxa de erro de um backend em uma operação
+    """
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.last_used = 0.0
+
+    def update(self, seconds: float, ok: bool, alpha: float):
+        """
+        Registra uma chamada
+
+        Args:
+            seconds: Duração da chamada
+            ok: Se a chamada teve sucesso
+            alpha: Peso da nova medição nas médias
+        """
+        self.calls += 1
+        self.last_used = time.monotonic()
+        self.error_rate += alpha * ((0.0 if ok else 1.0) - self.error_rate)
+        if ok:
+            self.latency = seconds if self.latency is None else self.latency + alpha * (seconds - self.latency)
+        else:
+            self.failures += 1
+
+    def cost(self, error_penalty: float) -> float:
+        """
+        Custo esperado de uma chamada: latência média + taxa de erro * penalidade
+
+        Args:
+            error_penalty: Segundos atribuídos a uma falha (chamada perdida + fallback)
+
+        Returns:
+            Custo em segundos (0 para um backend ainda sem sucesso medido e sem falhas)
+        """
+        return (self.latency or 0.0) + self.error_rate * error_penalty
+
+
+class BackendRouter:
+    """
+    Escolhe, por operação, o backend do instagrapi com menor custo medido e cai para o
+    outro quando ele falha. Substitui o fallback interno do instagrapi (que tenta o gql e
+    repete no v1 a cada chamada) por uma escolha explícita baseada no histórico
+    """
+
+    def __init__(
+        self,
+        mode: str = "cost",
+        error_penalty: float = 10.0,
+        probe_interval: float = 60.0,
+        alpha: float = 0.2
+    ):
+        """
+        Inicializa o roteador
+
+        Args:
+            mode: "cost" (menor custo medido), "v1" ou "gql" (backend fixo, com fallback para o
+                outro) ou "instagrapi" (escolha interna do instagrapi, sem medições)
+            error_penalty: Segundos somados ao custo por falha (ponderados pela taxa de erro)
+            probe_interval: Segundos sem uso após os quais o backend mais caro é testado de novo
+            alpha: Peso da medição mais recente nas médias móveis
+
+        Raises:
+            ConfigurationError: Se o modo for desconhecido
+        """
+        if mode not in ROUTING_MODES:
+            raise ConfigurationError(
+                f"Modo de roteamento inválido: {mode!r} (use {', '.join(ROUTING_MODES)})"
+            )
+        self.mode = mode
+        self.error_penalty = error_penalty
+        self.probe_interval = probe_interval
+        self.alpha = alpha
+
+        self._stats: Dict[Tuple[str, Backend], BackendStats] = {
+            (operation, backend): BackendStats()
+            for operation in BACKEND_CALLS
+            for backend in (Backend.V1, Backend.GQL)
+        }
+        self._fallbacks = 0
+        self._lock = threading.Lock()
+
+    def order(self, operation: str) -> List[Backend]:
+        """
+        Ordem em que os backends são tentados para uma operação
+
+        Args:
+            operation: medias, medias_page, stories ou user_id
+
+        Returns:
+            Lista de backends (o primeiro é o escolhido; os demais são fallback)
+        """
+        if self.mode == "instagrapi":
+            return [Backend.AUTO]
+        if self.mode == "v1":
+            return [Backend.V1, Backend.GQL]
+        if self.mode == "gql":
+            return [Backend.GQL, Backend.V1]
+
+        with self._lock:
+            # Empate (ex.: sem medições) mantém a preferência do instagrapi: gql primeiro
+            ranked = sorted(
+                (Backend.GQL, Backend.V1),
+                key=lambda backend: self._stats[(operation, backend)].cost(self.error_penalty)
+            )
+            # O backend preterido é testado de tempos em tempos, para que uma falha
+            # passageira não o exclua para sempre
+            fallback = self._stats[(operation, ranked[1])]
+            if fallback.calls and time.monotonic() - fallback.last_used >= self.probe_interval:
+                fallback.last_used = time.monotonic()
+                ranked.reverse()
+        return ranked
+
+    def call(
+        self,
+        operation: str,
+        client,
+        *args,
+        backend: Optional[Backend] = None,
+        raw: bool = False
+    ) -> Tuple[Any, Backend]:
+        """
+        Executa uma operação no backend escolhido, com fallback para o outro
+
+        Args:
+            operation: medias, medias_page, stories ou user_id
+            client: Cliente instagrapi (InstagramClient.client)
+            *args: Argumentos da operação
+            backend: Força um backend, sem fallback (ex.: continuar uma paginação)
+            raw: Usa o parser de JSON bruto (resultado já em Post/Story; não vale no modo instagrapi)
+
+        Returns:
+            Tupla (resultado, backend usado)
+
+        Raises:
+            A exceção do backend v1, se ele foi tentado; senão, a do último backend tentado
+        """
+        if backend is not None and self.mode != "instagrapi":
+            backends = [backend]
+        else:
+            backends = self.order(operation)
+
+        calls = (RAW_BACKEND_CALLS if raw else BACKEND_CALLS)[operation]
+        errors: Dict[Backend, Exception] = {}
+        for index, current in enumerate(backends):
+            started = time.monotonic()
+            try:
+                result = calls[current](client, *args)
+            except NO_FALLBACK_ERRORS:
+                raise
+            except Exception as e:
+                self._record(operation, current, time.monotonic() - started, ok=False)
+                errors[current] = e
+                if index == len(backends) - 1:
+                    # O erro do v1 (sessão da conta) é o que a política de retry sabe tratar
+                    # (ex.: rate limit da conta); o do gql é do acesso anônimo
+                    raise errors.get(Backend.V1, e)
+                logger.warning(
+                    f"Backend {current.value} falhou em {operation} ({type(e).__name__}: {e}), "
+                    f"usando {backends[index + 1].value}"
+                )
+                with self._lock:
+                    self._fallbacks += 1
+                continue
+
+            self._record(operation, current, time.monotonic() - started, ok=True)
+            return result, current
+
+    def _record(self, operation: str, backend: Backend, seconds: float, ok: bool):
+        if backend is Backend.AUTO:
+            return
+        with self._lock:
+            self._stats[(operation, backend)].update(seconds, ok, self.alpha)
+
+    def get_status(self) -> Dict:
+        """
+        Retorna as medições de cada backend por operação
+
+        Returns:
+            Dicionário com modo, fallbacks e estatísticas
+        """
+        with self._lock:
+            operations = {}
+            for (operation, backend), stats in self._stats.items():
+                operations.setdefault(operation, {})[backend.value] = {
+                    'calls': stats.calls,
+                    'failures': stats.failures,
+                    'latency_ewma': round(stats.latency, 3) if stats.latency is not None else None,
+                    'error_rate': round(stats.error_rate, 3),
+                    'cost': round(stats.cost(self.error_penalty), 3)
+                }
+            return {
+                'mode': self.mode,
+                'fallbacks': self._fallbacks,
+                'operations': operations
+            }
+
+    def __repr__(self) -> str:
+        return f"BackendRouter(mode={self.mode})"
@@ -0,0 +1,279 @@
+"""
+Pool de clientes do Instagram já autenticados, reutilizados entre requisições
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import threading
+
+from instagrapi.exceptions import LoginRequired
+
+from app.models.account import Account
+from app.services.instagram_client import InstagramClient
+from app.config import Config
+from app.utils.logger import get_logger
+from app.utils.single_flight import SingleFlight
+
+logger = get_logger("client_pool")
+
+
+class ClientPool:
+    """
+    Mantém InstagramClients logados por conta para evitar um login a cada requisição
+    Clientes ociosos são devolvidos ao pool e os menos usados (LRU) são descartados
+    quando o limite de clientes ociosos é atingido
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        """
+        Inicializa o pool de clientes
+
+        Args:
+            max_size: Máximo de clientes ociosos mantidos (usa Config se não fornecido)
+        """
+        self.max_size = max_size or Config.CLIENT_POOL_MAX_SIZE
+        # username -> clientes ociosos; a ordem do OrderedDict é a ordem de uso (LRU primeiro)
+        self._idle: "OrderedDict[str, List[InstagramClient]]" = OrderedDict()
+        self._idle_count = 0
+        self._lock = threading.Lock()
+        self._login_flight = SingleFlight()
+
+        # Estatísticas
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._shared_logins = 0
+
+        logger.info(f"ClientPool inicializado (max_size={self.max_size})")
+
+    def acquire(self, account: Account) -> InstagramClient:
+        """
+        Retorna um cliente logado para a conta, reaproveitando um ocioso se houver
+
+        Args:
+            account: Conta que fará a extração
+
+        Returns:
+            InstagramClient autenticado (uso exclusivo até ser devolvido)
+
+        Raises:
+            AccountLoginFailed: Se precisar logar e o login falhar
+        """
+        client = self._take_idle(account)
+        if client is not None:
+            return client
+
+        with self._lock:
+            self._misses += 1
+
+        # Login fora do lock para não bloquear outras contas
+        client = self._create_client(account)
+        return client
+
+    def _take_idle(self, account: Account) -> Optional[InstagramClient]:
+        """Retira um cliente ocioso da conta do pool, se houver"""
+        with self._lock:
+            clients = self._idle.get(account.username)
+            if not clients:
+                return None
+            client = clients.pop()
+            if not clients:
+                del self._idle[account.username]
+            self._idle_count -= 1
+            self._hits += 1
+        logger.debug(f"Cliente reaproveitado do pool: {account.username}")
+        return client
+
+    def _create_client(self, account: Account) -> InstagramClient:
+        """
+        Cria e autentica um novo cliente para a conta
+        Logins concorrentes da mesma conta são coalescidos: apenas um roda e os
+        demais recebem um cliente com a mesma sessão (ou a mesma exceção)
+
+        Args:
+            account: Conta do Instagram
+
+        Returns:
+            InstagramClient autenticado
+        """
+        client, shared = self._login_flight.do(account.username, lambda: self._login_client(account))
+        if not shared:
+            return client
+
+        # Outra thread acabou de logar esta conta: reaproveitar a sessão sem novo login
+        follower = self._new_client(account)
+        follower.adopt_session(client)
+        with self._lock:
+            self._shared_logins += 1
+        logger.debug(f"Login compartilhado (single-flight): {account.username}")
+        return follower
+
+    def _login_client(self, account: Account) -> InstagramClient:
+        """Cria um InstagramClient e faz login (executado uma vez por conta via single-flight)"""
+        logger.info(f"Criando novo cliente para o pool: {account.username}")
+        client = self._new_client(account)
+        client.login()
+        return client
+
+    def _new_client(self, account: Account) -> InstagramClient:
+        """Cria um InstagramClient ainda não logado"""
+        return InstagramClient(account)
+
+    def warm(self, account: Account):
+        """
+        Garante que exista ao menos um cliente logado ocioso para a conta
+
+        Args:
+            account: Conta do Instagram
+
+        Raises:
+            AccountLoginFailed: Se o login falhar
+        """
+        with self._lock:
+            if self._idle.get(account.username):
+                return
+
+        self.release(self._create_client(account))
+
+    def release(self, client: InstagramClient):
+        """
+        Devolve um cliente ao pool após o uso
+
+        Args:
+            client: Cliente obtido via acquire()
+        """
+        if not client.is_logged_in():
+            self.discard(client)
+            return
+
+        evicted = []
+        with self._lock:
+            username = client.account.username
+            self._idle.setdefault(username, []).append(client)
+            self._idle.move_to_end(username)
+            self._idle_count += 1
+
+            # Descartar clientes das contas menos usadas recentemente
+            while self._idle_count > self.max_size:
+                lru_username, lru_clients = next(iter(self._idle.items()))
+                evicted.append(lru_clients.pop(0))
+                if not lru_clients:
+                    del self._idle[lru_username]
+                self._idle_count -= 1
+                self._evictions += 1
+
+        for old_client in evicted:
+            logger.debug(f"Cliente removido do pool (LRU): {old_client.account.username}")
+            old_client.logout()
+
+    def discard(self, client: InstagramClient):
+        """
+        Descarta um cliente que não deve voltar ao pool (ex: sessão inválida)
+
+        Args:
+            client: Cliente a descartar
+        """
+        logger.info(f"Cliente descartado do pool: {client.account.username}")
+        client.logout()
+
+    def invalidate(self, username: str):
+        """
+        Remove todos os clientes ociosos de uma conta
+
+        Args:
+            username: Username da conta
+        """
+        with self._lock:
+            clients = self._idle.pop(username, [])
+            self._idle_count -= len(clients)
+
+        for client in clients:
+            client.logout()
+
+    @contextmanager
+    def client(self, account: Account):
+        """
+        Context manager que obtém um cliente e o devolve ao final
+        Em caso de LoginRequired o cliente é descartado em vez de devolvido
+
+        Args:
+            account: Conta do Instagram
+
+        Yields:
+            InstagramClient autenticado
+        """
+        client = self.acquire(account)
+        try:
+            yield client
+        except LoginRequired:
+            self.discard(client)
+            raise
+        except BaseException:
+            self.release(client)
+            raise
+        else:
+            self.release(client)
+
+    @contextmanager
+    def idle_client(self, account: Account):
+        """
+        Como client(), mas só entrega um cliente já logado e ocioso (nunca faz login)
+        Usado para chamadas paralelas da mesma conta: o Client do instagrapi não é
+        thread-safe e não pode ser compartilhado entre threads
+
+        Args:
+            account: Conta do Instagram
+
+        Yields:
+            InstagramClient autenticado, ou None se não houver cliente ocioso da conta
+        """
+        client = self._take_idle(account)
+        if client is None:
+            yield None
+            return
+        try:
+            yield client
+        except LoginRequired:
+            self.discard(client)
+            raise
+        except BaseException:
+            self.release(client)
+            raise
+        else:
+            self.release(client)
+
+    def close(self):
+        """Descarta todos os clientes ociosos (usado no shutdown)"""
+        with self._lock:
+            clients = [c for pool in self._idle.values() for c in pool]
+            self._idle.clear()
+            self._idle_count = 0
+
+        for client in clients:
+            client.logout()
+        logger.info(f"ClientPool encerrado ({len(clients)} clientes descartados)")
+
+    def get_status(self) -> Dict:
+        """
+        Retorna estatísticas do pool
+
+        Returns:
+            Dicionário com estatísticas
+        """
+        with self._lock:
+            return {
+                'max_size': self.max_size,
+                'idle_clients': self._idle_count,
+                'accounts_with_idle_clients': len(self._idle),
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'shared_logins': self._shared_logins
+            }
+
+    def __len__(self) -> int:
+        """Retorna número de clientes ociosos"""
+        return self._idle_count
+
+    def __repr__(self) -> str:
+        return f"ClientPool(idle={self._idle_count}, max_size={self.max_size})"
@@ -0,0 +1,661 @@
+"""
+Camada assíncrona de extração usada pelas rotas da API
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import contextvars
+import functools
+import math
+import threading
+
+from app.services.account_manager import AccountManager
+from app.services.admission import AdmissionController, AdmissionSlot
+from app.services.backend_router import Backend
+from app.services.extractor import InstagramExtractor
+from app.services.negative_cache import NegativeCache
+from app.services.response_cache import CacheEntry, ResponseCache
+from app.services.stories_cache import StoriesCache
+from app.models.requests import BatchItem, BatchItemResult, CacheMode, Post, Story
+from app.config import Config
+from app.utils.logger import get_logger
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.deadline import current_deadline, deadline_scope, request_deadline
+from app.utils.exceptions import InstagramAPIException, InvalidRequestError, ProfileNotFound, PrivateProfileError
+from app.utils.single_flight import AsyncSingleFlight
+
+logger = get_logger("extraction_service")
+
+
+class ExtractionService:
+    """
+    Executa as extrações (bloqueantes) do InstagramExtractor em um pool de threads
+    dedicado, mantendo o event loop livre para outras requisições e para o /health
+    """
+
+    # Maior quantidade aceita pela API: arredondar além disso custa uma página a mais
+    MAX_FETCH_QUANTITY = 50
+
+    def __init__(
+        self,
+        extractor: InstagramExtractor,
+        account_manager: AccountManager,
+        max_workers: Optional[int] = None,
+        admission: Optional[AdmissionController] = None,
+        posts_cache: Optional[ResponseCache] = None,
+        stories_cache: Optional[StoriesCache] = None,
+        negative_cache: Optional[NegativeCache] = None
+    ):
+        """
+        Inicializa o serviço
+
+        Args:
+            extractor: Extractor síncrono
+            account_manager: Gerenciador de contas (usado para dimensionar o pool)
+            max_workers: Número de threads de extração (calculado se não fornecido)
+            admission: Controle de admissão (cria um a partir do Config se não fornecido)
+            posts_cache: Cache de posts (cria um a partir do Config se não fornecido)
+            stories_cache: Cache de stories (cria um a partir do Config se não fornecido)
+            negative_cache: Cache de perfis inexistentes/privados (cria um a partir do Config se não fornecido)
+        """
+        self.extractor = extractor
+        self.account_manager = account_manager
+        self.admission = admission if admission is not None else AdmissionController(account_manager)
+        if posts_cache is None:
+            posts_cache = ResponseCache(
+                "posts",
+                ttl=Config.POSTS_CACHE_TTL_SECONDS,
+                stale_ttl=Config.POSTS_CACHE_STALE_SECONDS,
+                max_entries=Config.POSTS_CACHE_MAX_ENTRIES
+            )
+        self.posts_cache = posts_cache
+        if stories_cache is None:
+            stories_cache = StoriesCache(Config.STORIES_CACHE_FRESH_SECONDS)
+        self.stories_cache = stories_cache
+        if negative_cache is None:
+            negative_cache = NegativeCache(
+                extractor.user_id_cache,
+                private_ttl=60 * Config.PRIVATE_PROFILE_TTL_MINUTES,
+                max_entries=Config.USER_ID_CACHE_MAX_ENTRIES
+            )
+        self.negative_cache = negative_cache
+        # Atualizações de cache em background (chave -> task)
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        # Extrações idênticas em andamento, chave (endpoint, username, quantidade)
+        self._flight = AsyncSingleFlight()
+        self.max_workers = max_workers or self.compute_workers(account_manager)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="extraction")
+
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+
+        logger.info(f"ExtractionService inicializado com {self.max_workers} workers")
+
+    @staticmethod
+    def compute_workers(account_manager: AccountManager) -> int:
+        """
+        Calcula o tamanho do pool de extração
+        Usa EXTRACTION_WORKERS se configurado; caso contrário, o menor valor entre
+        MAX_CONCURRENT_REQUESTS e o número de contas utilizáveis
+
+        Args:
+            account_manager: Gerenciador de contas
+
+        Returns:
+            Número de workers
+        """
+        if Config.EXTRACTION_WORKERS > 0:
+            return Config.EXTRACTION_WORKERS
+
+        usable_accounts = sum(1 for acc in account_manager.accounts if acc.status == 'success')
+        return max(1, min(Config.MAX_CONCURRENT_REQUESTS, usable_accounts))
+
+    async def run(self, fn: Callable[..., Any], *args, slot: Optional[AdmissionSlot] = None, **kwargs) -> Any:
+        """
+        Executa uma função bloqueante no pool de extração
+        A função roda com o contexto atual (incluindo o prazo da requisição) e, havendo
+        prazo, a espera termina nele mesmo que a thread ainda esteja ocupada; a thread
+        para na próxima verificação do prazo e a vaga de admissão (slot) fica ocupada até lá
+
+        Args:
+            fn: Função a executar
+            *args, **kwargs: Argumentos da função
+            slot: Vaga de admissão da requisição (mantida enquanto a thread executar)
+
+        Returns:
+            Retorno da função
+
+        Raises:
+            DeadlineExceeded: Se o prazo da requisição acabar antes da função terminar
+        """
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check("aguardando vaga de extração")
+
+        with self._lock:
+            self._queued += 1
+
+        context = contextvars.copy_context()
+        job = self._executor.submit(context.run, functools.partial(self._tracked, fn, *args, **kwargs))
+        if slot is not None:
+            # Se a requisição sair antes (prazo esgotado, cliente desconectou), a vaga continua
+            # ocupada até a thread terminar: MAX_CONCURRENT_REQUESTS limita o trabalho real
+            slot.keep_until(job)
+        if deadline is None:
+            return await asyncio.wrap_future(job)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), deadline.remaining())
+        except asyncio.TimeoutError:
+            if job.cancelled():
+                # Nem chegou a executar: sai da contagem da fila
+                with self._lock:
+                    self._queued -= 1
+            raise deadline.exceeded("extração em andamento")
+
+    def _tracked(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Executa fn atualizando os contadores de fila/execução"""
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    @staticmethod
+    def fetch_quantity(quantity: int) -> int:
+        """
+        Arredonda a quantidade pedida para o tamanho de página do Instagram
+        (a página é baixada inteira de qualquer forma; o restante fica no cache),
+        sem passar de MAX_FETCH_QUANTITY
+
+        Args:
+            quantity: Quantidade pedida
+
+        Returns:
+            Quantidade a extrair
+        """
+        page_size = Config.POSTS_PAGE_SIZE
+        if page_size <= 1:
+            return quantity
+        rounded = math.ceil(quantity / page_size) * page_size
+        return max(quantity, min(rounded, ExtractionService.MAX_FETCH_QUANTITY))
+
+    @staticmethod
+    def _covers(entry: CacheEntry, quantity: int) -> bool:
+        """Verifica se a entrada do cache atende à quantidade pedida"""
+        return entry.meta.get('quantity', 0) >= quantity or entry.meta.get('exhausted', False)
+
+    def _store_posts(self, key: str, posts: List[Post], fetched: int):
+        """Armazena posts no cache, marcando se o perfil tem menos posts do que foi pedido"""
+        self.posts_cache.set(key, posts, quantity=fetched, exhausted=len(posts) < fetched)
+
+    def _posts_fetcher(self, key: str, quantity: int) -> Callable[[str, int, Optional[int]], List[Post]]:
+        """
+        Escolhe a extração de posts: incremental quando o cache já tem os posts do perfil
+        (cobrindo a quantidade pedida), completa caso contrário
+
+        Returns:
+            Função (username, quantity, user_id) -> Lista de Posts
+        """
+        entry = self.posts_cache.peek(key) if Config.POSTS_INCREMENTAL_REFRESH else None
+        if entry is None or not entry.value or not self._covers(entry, quantity):
+            return self.extractor.extract_posts
+
+        known_posts = entry.value
+        return lambda username, quantity, user_id: self.extractor.extract_posts_since(
+            username, known_posts, quantity, user_id
+        )
+
+    @contextmanager
+    def _remember_outcome(self, username: str) -> Iterator[None]:
+        """
+        Registra no cache negativo os erros definitivos (inexistente/privado) da extração
+        do bloco, e remove a entrada do perfil quando a extração dá certo
+        """
+        try:
+            yield
+        except (ProfileNotFound, PrivateProfileError) as e:
+            self.negative_cache.record(username, e)
+            raise
+        else:
+            self.negative_cache.invalidate(username)
+
+    async def _run_admitted(self, fn: Callable[..., Any], *args) -> Any:
+        """Executa fn no pool de extração após obter uma vaga no controle de admissão"""
+        async with self.admission.admit() as slot:
+            return await self.run(fn, *args, slot=slot)
+
+    def _posts_flight_key(self, key: str, quantity: int) -> Tuple[str, str, int]:
+        """
+        Chave de coalescência para posts: reaproveita a extração em andamento do mesmo
+        perfil com a menor quantidade que cubra a pedida, ou cria uma chave nova
+        """
+        covering = [
+            flight for flight in self._flight.keys()
+            if flight[0] == "posts" and flight[1] == key and flight[2] >= quantity
+        ]
+        if covering:
+            return min(covering, key=lambda flight: flight[2])
+        return ("posts", key, quantity)
+
+    async def extract_posts(
+        self,
+        username: str,
+        quantity: int,
+        user_id: Optional[int] = None,
+        cache_mode: CacheMode = "default"
+    ) -> List[Post]:
+        """
+        Extrai posts sem bloquear o event loop, passando pelo cache de posts
+        Uma entrada com N posts atende qualquer pedido de até N posts, e as extrações
+        são arredondadas para o tamanho de página do Instagram (POSTS_PAGE_SIZE).
+        Entradas vencidas (dentro da janela stale) são servidas imediatamente
+        enquanto uma atualização roda em background. Requisições simultâneas para o
+        mesmo perfil aguardam uma única extração e recebem o mesmo resultado (ou erro)
+
+        Args:
+            username: Username do perfil (sem @)
+            quantity: Quantidade de posts
+            user_id: pk do perfil, se já conhecido
+            cache_mode: default (usa o cache), bypass (ignora o cache) ou refresh (força nova extração,
+                incremental se o cache já tiver os posts do perfil)
+
+        Returns:
+            Lista de Posts
+
+        Raises:
+            TooManyRequests: Se o limite de extrações simultâneas e a fila estiverem cheios
+        """
+        key = username.lower()
+
+        if cache_mode == "default":
+            self.negative_cache.check(username)
+            cached = self._cached_posts(key, username, quantity, user_id)
+            if cached is not None:
+                return cached
+
+        flight_key = self._posts_flight_key(key, self.fetch_quantity(quantity))
+        fetcher = self._posts_fetcher(key, flight_key[2]) if cache_mode == "refresh" else self.extractor.extract_posts
+        with self._remember_outcome(username):
+            posts, shared = await self._flight.do(
+                flight_key,
+                lambda: self._run_admitted(fetcher, username, flight_key[2], user_id)
+            )
+
+        if shared:
+            logger.info(f"Extração de posts de @{username} compartilhada com requisição em andamento")
+        elif cache_mode != "bypass":
+            self._store_posts(key, posts, flight_key[2])
+        return posts[:quantity]
+
+    def _cached_posts(self, key: str, username: str, quantity: int, user_id: Optional[int]) -> Optional[List[Post]]:
+        """
+        Busca posts no cache, agendando atualização em background se a entrada estiver stale
+
+        Returns:
+            Lista de Posts ou None se o cache não atender ao pedido
+        """
+        entry = self.posts_cache.get(key)
+        if entry is None or not self._covers(entry, quantity):
+            return None
+
+        if entry.is_fresh():
+            logger.info(f"Cache hit: posts de @{username} ({entry.age:.0f}s)")
+        else:
+            logger.info(f"Cache stale: posts de @{username} ({entry.age:.0f}s), atualizando em background")
+            self._schedule_refresh(key, username, entry.meta['quantity'], user_id)
+        return entry.value[:quantity]
+
+    async def stream_posts(
+        self,
+        username: str,
+        quantity: int,
+        user_id: Optional[int] = None,
+        cache_mode: CacheMode = "default"
+    ) -> AsyncIterator[Post]:
+        """
+        Extrai posts página a página, entregando cada post assim que sua página chega
+        (a vaga de admissão é obtida na primeira iteração)
+
+        Args:
+            username: Username do perfil (sem @)
+            quantity: Quantidade de posts
+            user_id: pk do perfil, se já conhecido
+            cache_mode: default (usa o cache), bypass (ignora o cache) ou refresh (força nova extração)
+
+        Yields:
+            Posts, do mais recente ao mais antigo
+
+        Raises:
+            TooManyRequests: Se o limite de extrações simultâneas e a fila estiverem cheios
+        """
+        key = username.lower()
+
+        if cache_mode == "default":
+            self.negative_cache.check(username)
+            cached = self._cached_posts(key, username, quantity, user_id)
+            if cached is not None:
+                for post in cached:
+                    yield post
+                return
+
+        loop = asyncio.get_running_loop()
+        pages: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        collected: List[Post] = []
+
+        def on_page(page: List[Post]):
+            # Chamado na thread de extração
+            loop.call_soon_threadsafe(pages.put_nowait, page)
+
+        def on_done(task: asyncio.Task):
+            if not task.cancelled():
+                task.exception()
+            pages.put_nowait(None)
+
+        async with self.admission.admit() as slot:
+            extraction = asyncio.ensure_future(
+                self.run(self.extractor.stream_posts, username, quantity, on_page, user_id, cancelled, slot=slot)
+            )
+            extraction.add_done_callback(on_done)
+            try:
+                while True:
+                    page = await pages.get()
+                    if page is None:
+                        break
+                    collected.extend(page)
+                    for post in page:
+                        yield post
+                # Propagar erro da extração (se houver)
+                with self._remember_outcome(username):
+                    await extraction
+            finally:
+                # Cliente desconectou ou erro: a extração para na próxima página
+                cancelled.set()
+
+        if cache_mode != "bypass":
+            self._store_posts(key, collected, quantity)
+
+    async def extract_snapshot(
+        self,
+        username: str,
+        quantity: int,
+        user_id: Optional[int] = None,
+        cache_mode: CacheMode = "default"
+    ) -> Tuple[List[Post], List[Story]]:
+        """
+        Extrai posts e stories de um perfil em uma única extração (uma conta, um login,
+        uma resolução de user_id). Se apenas uma das partes estiver no cache, só a outra é extraída
+
+        Args:
+            username: Username do perfil (sem @)
+            quantity: Quantidade de posts
+            user_id: pk do perfil, se já conhecido
+            cache_mode: default (usa o cache), bypass (ignora o cache) ou refresh (força nova extração)
+
+        Returns:
+            Tupla (posts, stories)
+
+        Raises:
+            TooManyRequests: Se o limite de extrações simultâneas e a fila estiverem cheios
+        """
+        key = username.lower()
+
+        if cache_mode == "default":
+            self.negative_cache.check(username)
+            posts = self._cached_posts(key, username, quantity, user_id)
+            stories = self.stories_cache.get(username)
+            if posts is not None and stories is not None:
+                logger.info(f"Cache hit: snapshot de @{username}")
+                return posts, stories
+            if posts is not None:
+                return posts, await self.extract_stories(username, user_id, cache_mode)
+            if stories is not None:
+                return await self.extract_posts(username, quantity, user_id, cache_mode), stories
+
+        fetch_quantity = self.fetch_quantity(quantity)
+        with self._remember_outcome(username):
+            (posts, stories), shared = await self._flight.do(
+                ("snapshot", key, fetch_quantity),
+                lambda: self._run_admitted(self.extractor.extract_snapshot, username, fetch_quantity, user_id)
+            )
+
+        if shared:
+            logger.info(f"Snapshot de @{username} compartilhado com requisição em andamento")
+        elif cache_mode != "bypass":
+            self._store_posts(key, posts, fetch_quantity)
+            self.stories_cache.set(username, stories)
+        return posts[:quantity], stories
+
+    def batch_concurrency(self) -> int:
+        """
+        Itens de um batch processados em paralelo: BATCH_CONCURRENCY se configurado;
+        caso contrário, o menor valor entre MAX_CONCURRENT_REQUESTS e as contas disponíveis
+
+        Returns:
+            Número de itens em paralelo
+        """
+        if Config.BATCH_CONCURRENCY > 0:
+            return Config.BATCH_CONCURRENCY
+        available = len(self.account_manager.get_available_accounts())
+        return max(1, min(Config.MAX_CONCURRENT_REQUESTS, available))
+
+    async def extract_batch(self, items: List[BatchItem], timeout: Optional[float] = None) -> List[BatchItemResult]:
+        """
+        Extrai vários perfis em paralelo, distribuídos entre as contas disponíveis
+        Cada item passa pelo cache, coalescência e admissão normais; a falha de um
+        item é registrada no seu resultado e não interrompe os demais
+
+        Args:
+            items: Itens do batch
+            timeout: Prazo de cada item em segundos, contado quando o item começa (usa REQUEST_TIMEOUT_SECONDS se não fornecido)
+
+        Returns:
+            Resultados, na ordem dos itens
+        """
+        concurrency = self.batch_concurrency()
+        semaphore = asyncio.Semaphore(concurrency)
+        logger.info(f"Batch de {len(items)} itens ({concurrency} em paralelo)")
+
+        async def run_item(item: BatchItem) -> BatchItemResult:
+            result = BatchItemResult(username=item.username, type=item.type, success=True)
+            async with semaphore:
+                try:
+                    with deadline_scope(request_deadline(timeout)):
+                        if item.type == "posts":
+                            result.posts = await self.extract_posts(item.username, item.quantity)
+                        elif item.type == "stories":
+                            result.stories = await self.extract_stories(item.username)
+                        else:
+                            result.posts, result.stories = await self.extract_snapshot(item.username, item.quantity)
+                except InstagramAPIException as e:
+                    logger.warning(f"Item do batch falhou (@{item.username}, {item.type}): {e.message}")
+                    result = BatchItemResult(
+                        username=item.username,
+                        type=item.type,
+                        success=False,
+                        error=e.__class__.__name__,
+                        message=e.message,
+                        details=e.details
+                    )
+                except Exception as e:
+                    logger.error(f"Erro inesperado no item do batch (@{item.username}, {item.type}): {e}")
+                    result = BatchItemResult(
+                        username=item.username,
+                        type=item.type,
+                        success=False,
+                        error="InternalServerError",
+                        message="Erro interno do servidor",
+                        details={'error': str(e)}
+                    )
+            return result
+
+        return list(await asyncio.gather(*(run_item(item) for item in items)))
+
+    async def extract_posts_page(
+        self,
+        username: str,
+        page_size: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Post], Optional[str]]:
+        """
+        Extrai uma página de posts, continuando de onde o cursor parou
+        O cursor guarda o end_cursor do Instagram, o backend que o gerou, o user_id do perfil
+        e a conta usada (a próxima página é pedida pela mesma conta, se disponível)
+
+        Args:
+            username: Username do perfil (sem @)
+            page_size: Quantidade de posts da página
+            cursor: Cursor retornado pela página anterior (None = primeira página)
+
+        Returns:
+            Tupla (posts, cursor da próxima página ou None se não houver mais posts)
+
+        Raises:
+            InvalidRequestError: Se o cursor for inválido ou de outro perfil
+            TooManyRequests: Se o limite de extrações simultâneas e a fila estiverem cheios
+        """
+        key = username.lower()
+        state = decode_cursor(cursor) if cursor else {}
+        if state and state.get('u') != key:
+            raise InvalidRequestError(f"Cursor de paginação não pertence a @{username}")
+
+        # O end_cursor só vale no backend que o gerou; cursores sem backend são de versões anteriores
+        backend = None
+        if state.get('c'):
+            try:
+                backend = Backend(state.get('b'))
+            except ValueError:
+                raise InvalidRequestError("Cursor de paginação expirado, reinicie a paginação")
+
+        self.negative_cache.check(username)
+        with self._remember_outcome(username):
+            async with self.admission.admit() as slot:
+                posts, end_cursor, user_id, account, backend = await self.run(
+                    self.extractor.extract_posts_page,
+                    username,
+                    page_size,
+                    state.get('c', ""),
+                    state.get('id'),
+                    state.get('a'),
+                    backend,
+                    slot=slot
+                )
+
+        next_cursor = None
+        if end_cursor:
+            next_cursor = encode_cursor({'u': key, 'id': user_id, 'c': end_cursor, 'a': account, 'b': backend.value})
+        return posts, next_cursor
+
+    def _schedule_refresh(self, key: str, username: str, quantity: int, user_id: Optional[int]):
+        """
+        Agenda a atualização em background de uma entrada stale
+        Só ocupa uma vaga livre de extração (nunca entra na fila nem disputa com requisições)
+        """
+        if key in self._refreshing:
+            return
+
+        if not self.admission.try_admit():
+            logger.debug(f"Sem vaga livre para atualizar posts de @{username}, mantendo cache stale")
+            return
+
+        task = asyncio.create_task(self._refresh_posts(key, username, quantity, user_id))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh_posts(self, key: str, username: str, quantity: int, user_id: Optional[int]):
+        """Extrai os posts (de forma incremental, se possível) e atualiza o cache (vaga já reservada com try_admit)"""
+        try:
+            # A atualização não herda o prazo da requisição que a disparou
+            with deadline_scope(None):
+                posts = await self.run(self._posts_fetcher(key, quantity), username, quantity, user_id)
+            self._store_posts(key, posts, quantity)
+            logger.info(f"✓ Cache de posts de @{username} atualizado em background")
+        except (ProfileNotFound, PrivateProfileError) as e:
+            self.posts_cache.invalidate(key)
+            self.negative_cache.record(username, e)
+            logger.warning(f"Cache de posts de @{username} removido: {e.message}")
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar cache de posts de @{username}: {e}")
+        finally:
+            self.admission.release()
+
+    async def extract_stories(
+        self,
+        username: str,
+        user_id: Optional[int] = None,
+        cache_mode: CacheMode = "default"
+    ) -> List[Story]:
+        """
+        Extrai stories sem bloquear o event loop, passando pelo cache de stories
+        (stories expirados nunca são servidos do cache). Requisições simultâneas para o
+        mesmo perfil aguardam uma única extração
+
+        Args:
+            username: Username do perfil (sem @)
+            user_id: pk do perfil, se já conhecido
+            cache_mode: default (usa o cache), bypass (ignora o cache) ou refresh (força nova extração)
+
+        Returns:
+            Lista de Stories
+
+        Raises:
+            TooManyRequests: Se o limite de extrações simultâneas e a fila estiverem cheios
+        """
+        if cache_mode == "default":
+            self.negative_cache.check(username)
+            stories = self.stories_cache.get(username)
+            if stories is not None:
+                logger.info(f"Cache hit: {len(stories)} stories de @{username}")
+                return stories
+
+        with self._remember_outcome(username):
+            stories, shared = await self._flight.do(
+                ("stories", username.lower(), 0),
+                lambda: self._run_admitted(self.extractor.extract_stories, username, user_id)
+            )
+
+        if shared:
+            logger.info(f"Extração de stories de @{username} compartilhada com requisição em andamento")
+        elif cache_mode != "bypass":
+            self.stories_cache.set(username, stories)
+        return stories
+
+    def shutdown(self):
+        """Encerra o pool de extração (extrações na fila são canceladas)"""
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        self._flight.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("ExtractionService encerrado")
+
+    def get_status(self) -> Dict:
+        """
+        Retorna estatísticas do pool de extração
+
+        Returns:
+            Dicionário com estatísticas
+        """
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'active': self._active,
+                'queued': self._queued,
+                'completed': self._completed,
+                'in_flight': len(self._flight),
+                'coalesced': self._flight.shared_count,
+                'admission': self.admission.get_status(),
+                'posts_cache': {**self.posts_cache.get_status(), 'refreshing': len(self._refreshing)},
+                'stories_cache': self.stories_cache.get_status(),
+                'negative_cache': self.negative_cache.get_status()
+            }
+
+    def __repr__(self) -> str:
+        return f"ExtractionService(workers={self.max_workers}, active={self._active})"
@@ -1,35 +1,44 @@
 """
 Serviço de extração de dados do Instagram (posts e stories)
 """
-from typing import List, Optional
-from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Set, Tuple, TypeVar
+from datetime import datetime, timedelta
+import contextvars
+import threading
+import time
 
-from instagrapi.exceptions import (
-    UserNotFound,
-    PrivateError,
-    MediaError,
-    RateLimitError,
-    PleaseWaitFewMinutes,
-    LoginRequired
-)
-from pydantic import ValidationError
+from instagrapi.exceptions import PrivateAccount, UserNotFound
+from instagrapi.extractors import extract_media_gql
 
 from app.services.instagram_client import InstagramClient
 from app.services.account_manager import AccountManager
+from app.services.client_pool import ClientPool
+from app.services.user_id_cache import UserIdCache
+from app.services.retry_policy import ErrorAction, ErrorRule, RetryPolicy, build_policies
+from app.services.latency_tracker import LatencyTracker
+from app.services.raw_parser import posts_from_gql
+from app.services.backend_router import Backend, BackendRouter, fetch_web_profile
+from app.models.account import Account
 from app.models.requests import Post, Story, MediaItem
 from app.config import Config
 from app.utils.logger import get_logger
+from app.utils.deadline import Deadline, current_deadline
 from app.utils.exceptions import (
     ProfileNotFound,
     PrivateProfileError,
-    RateLimitExceeded,
     ExtractionError,
-    MaxRetriesExceeded,
-    AccountPoolExhausted
+    AccountPoolExhausted,
+    DeadlineExceeded
 )
 
 logger = get_logger("extractor")
 
+T = TypeVar("T")
+
+# Operações idempotentes (sem entregas parciais) que podem ser executadas em duplicata
+HEDGED_OPERATIONS = ("posts", "stories")
+
 
 class InstagramExtractor:
     """
@@ -37,23 +46,61 @@ class InstagramExtractor:
     Gerencia retry logic e rotação de contas
     """
     
-    def __init__(self, account_manager: AccountManager):
+    def __init__(
+        self,
+        account_manager: AccountManager,
+        client_pool: Optional[ClientPool] = None,
+        user_id_cache: Optional[UserIdCache] = None,
+        retry_policies: Optional[Dict[str, RetryPolicy]] = None,
+        backend_router: Optional[BackendRouter] = None
+    ):
         """
         Inicializa o extractor
         
         Args:
             account_manager: Gerenciador de contas
+            client_pool: Pool de clientes logados (cria um novo se não fornecido)
+            user_id_cache: Cache de username -> user_id (cria um novo se não fornecido)
+            retry_policies: Políticas de retry por operação (usa Config se não fornecido)
+            backend_router: Roteador entre os backends v1 e gql do instagrapi (usa Config se não fornecido)
         """
         self.account_manager = account_manager
+        # Comparar com None: ClientPool define __len__ (clientes ociosos) e um pool vazio é falso
+        self.client_pool = client_pool if client_pool is not None else ClientPool()
+        self.user_id_cache = user_id_cache if user_id_cache is not None else UserIdCache()
+        self.retry_policies = retry_policies if retry_policies is not None else build_policies()
+        if backend_router is None:
+            backend_router = BackendRouter(
+                mode=Config.INSTAGRAM_BACKEND_ROUTING,
+                error_penalty=Config.BACKEND_ERROR_PENALTY_SECONDS,
+                probe_interval=Config.BACKEND_PROBE_INTERVAL_SECONDS
+            )
+        self.backends = backend_router
+        # Parser de JSON bruto no lugar dos modelos do instagrapi (precisa de um backend explícito)
+        self.raw_parser = Config.RAW_MEDIA_PARSER and self.backends.mode != "instagrapi"
+        # Threads auxiliares para chamadas paralelas dentro de uma mesma extração (snapshot)
+        self._fanout = ThreadPoolExecutor(max_workers=Config.MAX_CONCURRENT_REQUESTS, thread_name_prefix="fanout")
+        
+        # Hedging: latências recentes por operação e execuções duplicadas em andamento
+        self.latency = LatencyTracker(min_samples=Config.HEDGE_MIN_SAMPLES)
+        self._hedge_pool = ThreadPoolExecutor(
+            max_workers=Config.MAX_CONCURRENT_REQUESTS + Config.HEDGE_MAX_INFLIGHT,
+            thread_name_prefix="hedge"
+        )
+        self._hedge_slots = threading.BoundedSemaphore(max(Config.HEDGE_MAX_INFLIGHT, 1))
+        self._hedge_lock = threading.Lock()
+        self._hedges_started = 0
+        self._hedges_won = 0
         logger.info("InstagramExtractor inicializado")
     
-    def extract_posts(self, username: str, quantity: int) -> List[Post]:
+    def extract_posts(self, username: str, quantity: int, user_id: Optional[int] = None) -> List[Post]:
         """
         Extrai posts de um perfil do Instagram
         
         Args:
             username: Username do perfil (sem @)
             quantity: Quantidade de posts a extrair
+            user_id: pk do perfil, se já conhecido (evita a busca por username)
             
         Returns:
             Lista de Posts
@@ -61,197 +108,701 @@ class InstagramExtractor:
         Raises:
             ProfileNotFound: Se perfil não existir
             PrivateProfileError: Se perfil for privado e não tiver acesso
-            MaxRetriesExceeded: Se exceder tentativas
+            ExtractionError: Se exceder tentativas
         """
         logger.info(f"Iniciando extração de {quantity} posts de @{username}")
+        self._check_known_missing(username, user_id)
         
-        max_retries = Config.MAX_RETRIES_PER_REQUEST
-        attempt = 0
-        
-        while attempt < max_retries:
-            attempt += 1
+        def fetch(client: InstagramClient, target_user_id: int) -> List[Post]:
+            # Extrair posts (backend v1 ou gql de menor custo)
+            posts = self._fetch_posts(client, target_user_id, quantity)
             
+            logger.info(f"✓ Extração bem-sucedida: {len(posts)} posts obtidos")
+            return posts
+        
+        def fetch_web(client: InstagramClient, _: Optional[int]) -> List[Post]:
+            # user_id + primeira página do feed em uma chamada, em vez de busca do user_id + medias
             try:
-                # Obter conta disponível
-                account = self.account_manager.get_next_account()
-                logger.info(f"Tentativa {attempt}/{max_retries} com conta: {account.username}")
-                
-                # Criar cliente e fazer extração
-                with InstagramClient(account) as client:
-                    # Obter user_id
-                    user_id = client.get_user_id_from_username(username)
-                    
-                    # Extrair medias
-                    medias = client.client.user_medias(user_id, amount=quantity)
-                    
-                    # Converter para nosso formato
-                    posts = self._convert_medias_to_posts(medias, client)
-                    
-                    # Marcar conta como usada com sucesso
-                    self.account_manager.mark_account_used(account.username)
-                    
-                    logger.info(f"✓ Extração bem-sucedida: {len(posts)} posts obtidos")
-                    return posts
-                    
-            except UserNotFound as e:
-                logger.error(f"Perfil @{username} não encontrado")
-                raise ProfileNotFound(f"Perfil @{username} não existe")
+                profile = fetch_web_profile(client.client, username)
+            except (UserNotFound, DeadlineExceeded):
+                raise
+            except Exception as e:
+                logger.warning(f"web_profile_info falhou para @{username} ({type(e).__name__}: {e}), usando o caminho normal")
+                return fetch(client, self._resolve_user_id(client, username))
             
-            except PrivateError as e:
-                logger.warning(f"Perfil @{username} é privado")
-                # Perfil privado: tentar com outra conta que possa ter acesso
-                if attempt < max_retries:
-                    logger.info("Tentando com outra conta...")
-                    continue
-                else:
-                    raise PrivateProfileError(f"Perfil @{username} é privado e nenhuma conta tem acesso")
-            
-            except (RateLimitError, PleaseWaitFewMinutes) as e:
-                logger.warning(f"Rate limit atingido: {e}")
-                # Congelar conta e tentar com outra
-                self.account_manager.freeze_account(
-                    account.username,
-                    duration_minutes=60,
-                    reason="Rate limit exceeded"
+            self.user_id_cache.set(username, profile.user_id)
+            if len(profile.nodes) < min(quantity, profile.media_count):
+                # Perfil privado (feed vazio sem acesso) ou primeira página menor que o pedido
+                return fetch(client, profile.user_id)
+            
+            posts = self._posts_from_gql_nodes(profile.nodes[:quantity], client)
+            logger.info(f"✓ Extração bem-sucedida (web_profile_info): {len(posts)} posts obtidos")
+            return posts
+        
+        known_user_id = user_id or self.user_id_cache.get(username)
+        if known_user_id:
+            def fetch_known(client: InstagramClient, _: Optional[int]) -> List[Post]:
+                # user_id já consultado acima: não repete a busca no cache a cada tentativa
+                return fetch(client, known_user_id)
+            
+            return self._hedged("posts", username, user_id, fetch_known, resolve_user_id=False)
+        if quantity <= Config.WEB_PROFILE_MAX_QUANTITY:
+            return self._hedged("posts", username, user_id, fetch_web, resolve_user_id=False)
+        return self._hedged("posts", username, user_id, fetch)
+    
+    def extract_posts_since(
+        self,
+        username: str,
+        known_posts: List[Post],
+        quantity: int,
+        user_id: Optional[int] = None
+    ) -> List[Post]:
+        """
+        Extração incremental de posts: pagina a partir do post mais recente e para assim que
+        encontra o post mais recente já conhecido, juntando os novos posts à lista conhecida
+        (em regime de polling custa uma página em vez de várias)
+        
+        Se o post conhecido não for encontrado dentro de `quantity` posts (ex.: foi apagado),
+        o resultado é a lista recém-extraída, como em uma extração completa
+        
+        Args:
+            username: Username do perfil (sem @)
+            known_posts: Posts já conhecidos do perfil (ex.: do cache), do mais recente ao mais antigo
+            quantity: Quantidade de posts a retornar
+            user_id: pk do perfil, se já conhecido (evita a busca por username)
+            
+        Returns:
+            Lista de Posts (novos + conhecidos), limitada a `quantity`
+            
+        Raises:
+            ProfileNotFound: Se perfil não existir
+            PrivateProfileError: Se perfil for privado e não tiver acesso
+            ExtractionError: Se exceder tentativas
+        """
+        if not known_posts:
+            return self.extract_posts(username, quantity, user_id)
+        
+        logger.info(f"Iniciando extração incremental de posts de @{username} ({len(known_posts)} conhecidos)")
+        self._check_known_missing(username, user_id)
+        
+        known_ids = {post.id for post in known_posts}
+        # Posts fixados (pinned) aparecem no topo mesmo sendo antigos: o ponto de parada
+        # é o post conhecido mais recente, não o primeiro post conhecido encontrado
+        newest_known_id = max(known_posts, key=lambda post: post.taken_at).id
+        
+        def fetch(client: InstagramClient, target_user_id: int) -> List[Post]:
+            fetched: List[Post] = []
+            new_posts: List[Post] = []
+            end_cursor = ""
+            pages = 0
+            reached_known = False
+            backend: Optional[Backend] = None
+            
+            while not reached_known and len(fetched) < quantity:
+                # As páginas seguintes ficam no backend da primeira (cursores não são intercambiáveis)
+                page, end_cursor, backend = self._fetch_posts_page(
+                    client, target_user_id, Config.POSTS_PAGE_SIZE, end_cursor, backend
                 )
+                pages += 1
                 
-                if attempt < max_retries:
-                    logger.info("Tentando com outra conta...")
-                    continue
-                else:
-                    raise RateLimitExceeded("Rate limit excedido em todas as tentativas")
-            
-            except LoginRequired as e:
-                logger.error(f"Login requerido: {e}")
-                # Congelar conta e tentar com outra
-                self.account_manager.freeze_account(
-                    account.username,
-                    duration_minutes=120,
-                    reason="Login required"
-                )
+                for post in page:
+                    if post.id == newest_known_id:
+                        reached_known = True
+                        break
+                    fetched.append(post)
+                    if post.id not in known_ids:
+                        new_posts.append(post)
                 
-                if attempt < max_retries:
-                    logger.info("Tentando com outra conta...")
-                    continue
-                else:
-                    raise ExtractionError("Falha de autenticação em todas as tentativas")
+                if not page or not end_cursor:
+                    break
             
-            except ValidationError as e:
-                logger.error(f"Erro de validação do Pydantic: {e}")
-                logger.info("Tentando com outra conta (possível problema de versão da API)...")
-                self.account_manager.mark_account_error(account.username, f"Validation error: {str(e)[:100]}")
-                
-                if attempt < max_retries:
-                    continue
-                else:
-                    raise ExtractionError(f"Erro de validação persistente. Atualize o instagrapi: pip install --upgrade instagrapi")
+            if reached_known:
+                posts = (new_posts + known_posts)[:quantity]
+            else:
+                posts = fetched[:quantity]
             
-            except AccountPoolExhausted as e:
-                logger.error("Pool de contas esgotado")
-                raise
+            logger.info(
+                f"✓ Extração incremental: {len(new_posts)} posts novos em {pages} página(s)"
+                f"{'' if reached_known else ' (post conhecido não encontrado, lista substituída)'}"
+            )
+            return posts
+        
+        return self._hedged("posts", username, user_id, fetch)
+    
+    def stream_posts(
+        self,
+        username: str,
+        quantity: int,
+        on_page: Callable[[List[Post]], None],
+        user_id: Optional[int] = None,
+        cancelled: Optional[threading.Event] = None
+    ) -> int:
+        """
+        Extrai posts página a página, entregando cada página convertida a on_page
+        assim que ela chega (sem esperar a extração completa)
+        
+        Em caso de retry com outra conta a paginação recomeça, mas posts já
+        entregues não são repetidos
+        
+        Args:
+            username: Username do perfil (sem @)
+            quantity: Quantidade de posts a extrair
+            on_page: Callback chamado com cada página de Posts
+            user_id: pk do perfil, se já conhecido (evita a busca por username)
+            cancelled: Evento que interrompe a paginação (ex.: cliente desconectou)
             
-            except Exception as e:
-                logger.error(f"Erro inesperado na tentativa {attempt}: {e}")
-                self.account_manager.mark_account_error(account.username, str(e))
+        Returns:
+            Total de posts entregues
+            
+        Raises:
+            ProfileNotFound: Se perfil não existir
+            PrivateProfileError: Se perfil for privado e não tiver acesso
+            ExtractionError: Se exceder tentativas
+        """
+        logger.info(f"Iniciando streaming de {quantity} posts de @{username}")
+        self._check_known_missing(username, user_id)
+        
+        sent_ids = set()
+        
+        def fetch(client: InstagramClient, target_user_id: int) -> int:
+            end_cursor = ""
+            pages = 0
+            backend: Optional[Backend] = None
+            
+            while len(sent_ids) < quantity:
+                if cancelled is not None and cancelled.is_set():
+                    logger.info(f"Streaming de @{username} interrompido após {len(sent_ids)} posts")
+                    break
                 
-                if attempt < max_retries:
-                    logger.info("Tentando novamente...")
-                    continue
-                else:
-                    raise ExtractionError(f"Falha após {max_retries} tentativas: {e}")
+                fetched, end_cursor, backend = self._fetch_posts_page(
+                    client, target_user_id, Config.POSTS_PAGE_SIZE, end_cursor, backend
+                )
+                pages += 1
+                
+                page = [post for post in fetched if post.id not in sent_ids][:quantity - len(sent_ids)]
+                if page:
+                    sent_ids.update(post.id for post in page)
+                    on_page(page)
+                
+                if not fetched or not end_cursor:
+                    break
+            
+            logger.info(f"✓ Streaming concluído: {len(sent_ids)} posts em {pages} página(s)")
+            return len(sent_ids)
+        
+        return self._with_retries("stream", username, user_id, fetch)
+    
+    def extract_posts_page(
+        self,
+        username: str,
+        page_size: int,
+        end_cursor: str = "",
+        user_id: Optional[int] = None,
+        preferred_account: Optional[str] = None,
+        backend: Optional[Backend] = None
+    ) -> Tuple[List[Post], str, int, str, Backend]:
+        """
+        Extrai uma página de posts a partir de um end_cursor do Instagram
+        
+        Args:
+            username: Username do perfil (sem @)
+            page_size: Quantidade de posts da página
+            end_cursor: Cursor do Instagram (end_cursor/max_id) da página anterior ("" = início)
+            user_id: pk do perfil, se já conhecido (evita a busca por username)
+            preferred_account: Conta usada na página anterior (reaproveita a sessão, se disponível)
+            backend: Backend que gerou o end_cursor (obrigatório para continuar a paginação)
+            
+        Returns:
+            Tupla (posts, próximo end_cursor ou "" se acabou, user_id do perfil, conta usada,
+            backend que gerou o próximo end_cursor)
+            
+        Raises:
+            ProfileNotFound: Se perfil não existir
+            PrivateProfileError: Se perfil for privado e não tiver acesso
+            ExtractionError: Se exceder tentativas
+        """
+        logger.info(f"Iniciando extração de página de {page_size} posts de @{username}")
+        self._check_known_missing(username, user_id)
         
-        raise MaxRetriesExceeded(f"Excedido número máximo de tentativas ({max_retries})")
+        def fetch(client: InstagramClient, target_user_id: int) -> Tuple[List[Post], str, int, str, Backend]:
+            # O cursor da página anterior só vale no backend que o gerou
+            posts, next_cursor, used = self._fetch_posts_page(
+                client, target_user_id, page_size, end_cursor, backend if end_cursor else None
+            )
+            
+            logger.info(f"✓ Página extraída: {len(posts)} posts ({used.value})")
+            return posts, (next_cursor or "") if posts else "", target_user_id, client.account.username, used
+        
+        return self._with_retries("page", username, user_id, fetch, preferred_account=preferred_account)
     
-    def extract_stories(self, username: str) -> List[Story]:
+    def extract_stories(self, username: str, user_id: Optional[int] = None) -> List[Story]:
         """
         Extrai stories de um perfil do Instagram
         
         Args:
             username: Username do perfil (sem @)
+            user_id: pk do perfil, se já conhecido (evita a busca por username)
             
         Returns:
             Lista de Stories
             
         Raises:
             ProfileNotFound: Se perfil não existir
-            MaxRetriesExceeded: Se exceder tentativas
+            ExtractionError: Se exceder tentativas
         """
         logger.info(f"Iniciando extração de stories de @{username}")
+        self._check_known_missing(username, user_id)
+        
+        def fetch(client: InstagramClient, target_user_id: int) -> List[Story]:
+            # Extrair stories (backend v1 ou gql de menor custo)
+            stories = self._fetch_stories(client, target_user_id)
+            
+            logger.info(f"✓ Extração bem-sucedida: {len(stories)} stories obtidos")
+            return stories
+        
+        return self._hedged("stories", username, user_id, fetch)
+    
+    def extract_snapshot(
+        self,
+        username: str,
+        quantity: int,
+        user_id: Optional[int] = None
+    ) -> Tuple[List[Post], List[Story]]:
+        """
+        Extrai posts e stories de um perfil em uma única passada: uma conta e uma
+        resolução de user_id. Posts e stories são buscados em paralelo quando a conta
+        tem um segundo cliente ocioso no pool; caso contrário, em sequência no mesmo cliente
         
-        max_retries = Config.MAX_RETRIES_PER_REQUEST
+        Args:
+            username: Username do perfil (sem @)
+            quantity: Quantidade de posts a extrair
+            user_id: pk do perfil, se já conhecido (evita a busca por username)
+            
+        Returns:
+            Tupla (posts, stories)
+            
+        Raises:
+            ProfileNotFound: Se perfil não existir
+            PrivateProfileError: Se perfil for privado e não tiver acesso
+            ExtractionError: Se exceder tentativas
+        """
+        logger.info(f"Iniciando snapshot de @{username} ({quantity} posts + stories)")
+        self._check_known_missing(username, user_id)
+        
+        def fetch(client: InstagramClient, target_user_id: int) -> Tuple[List[Post], List[Story]]:
+            # O Client do instagrapi não é thread-safe (last_json e headers compartilhados):
+            # chamadas em paralelo só com um segundo cliente da conta, sem novo login
+            with self.client_pool.idle_client(client.account) as stories_client:
+                if stories_client is None:
+                    posts = self._fetch_posts(client, target_user_id, quantity)
+                    stories = self._fetch_stories(client, target_user_id)
+                else:
+                    # Stories em uma thread auxiliar com o segundo cliente, posts na thread atual
+                    stories_future = self._fanout.submit(
+                        contextvars.copy_context().run, self._fetch_stories, stories_client, target_user_id
+                    )
+                    try:
+                        posts = self._fetch_posts(client, target_user_id, quantity)
+                    finally:
+                        # O segundo cliente só volta ao pool depois que a chamada dele terminar
+                        wait([stories_future])
+                    stories = stories_future.result()
+            
+            logger.info(f"✓ Snapshot bem-sucedido: {len(posts)} posts e {len(stories)} stories obtidos")
+            return posts, stories
+        
+        return self._with_retries("snapshot", username, user_id, fetch)
+    
+    def _hedge_delay(self, operation: str) -> Optional[float]:
+        """
+        Tempo após o qual uma execução lenta ganha uma duplicata (hedge)
+        
+        Returns:
+            Percentil HEDGE_PERCENTILE das latências recentes da operação, ou None se o
+            hedging estiver desabilitado, sem medições suficientes ou sem uma segunda conta
+        """
+        if not Config.HEDGE_ENABLED or operation not in HEDGED_OPERATIONS:
+            return None
+        
+        delay = self.latency.percentile(operation, Config.HEDGE_PERCENTILE)
+        if delay is None or len(self.account_manager.get_available_accounts()) < 2:
+            return None
+        return delay
+    
+    def _hedged(
+        self,
+        operation: str,
+        username: str,
+        user_id: Optional[int],
+        fetch: Callable[[InstagramClient, int], T],
+        resolve_user_id: bool = True
+    ) -> T:
+        """
+        Executa uma extração com hedging: se ela não terminar dentro do percentil
+        HEDGE_PERCENTILE das latências recentes, uma duplicata começa com outra conta
+        e vale o primeiro resultado. A execução perdedora não faz novas tentativas e
+        seu resultado é descartado. No máximo HEDGE_MAX_INFLIGHT duplicatas rodam ao mesmo tempo
+        
+        Args:
+            operation: Nome da operação (posts ou stories)
+            username: Username do perfil alvo
+            user_id: pk do perfil, se já conhecido
+            fetch: Função (cliente logado, user_id do alvo) -> resultado (sem efeitos colaterais)
+            resolve_user_id: Se False, fetch recebe user_id como informado (resolve por conta própria)
+            
+        Returns:
+            Retorno de fetch
+            
+        Raises:
+            As mesmas exceções de _with_retries (da execução original, se as duas falharem)
+        """
+        delay = self._hedge_delay(operation)
+        if delay is None:
+            return self._with_retries(operation, username, user_id, fetch, resolve_user_id=resolve_user_id)
+        
+        accounts_in_use: Set[str] = set()
+        cancelled = threading.Event()
+        
+        def submit() -> Future:
+            # Cada execução roda com uma cópia do contexto (prazo da requisição)
+            return self._hedge_pool.submit(
+                contextvars.copy_context().run,
+                self._with_retries, operation, username, user_id, fetch,
+                None, accounts_in_use, cancelled, resolve_user_id
+            )
+        
+        primary = submit()
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._hedge_slots.acquire(blocking=False):
+            return primary.result()
+        
+        logger.info(f"Extração de @{username} passou de {delay:.2f}s (p{Config.HEDGE_PERCENTILE:g}), iniciando hedge")
+        hedge = submit()
+        hedge.add_done_callback(lambda _: self._hedge_slots.release())
+        with self._hedge_lock:
+            self._hedges_started += 1
+        
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    cancelled.set()
+                    if future is hedge:
+                        with self._hedge_lock:
+                            self._hedges_won += 1
+                        logger.info(f"✓ Hedge de @{username} venceu a execução original")
+                    return future.result()
+        
+        return primary.result()
+    
+    def get_hedge_status(self) -> Dict:
+        """
+        Retorna estatísticas de hedging e latências
+        
+        Returns:
+            Dicionário com estatísticas
+        """
+        with self._hedge_lock:
+            return {
+                'enabled': Config.HEDGE_ENABLED,
+                'percentile': Config.HEDGE_PERCENTILE,
+                'started': self._hedges_started,
+                'won': self._hedges_won,
+                'latency': self.latency.get_status()
+            }
+    
+    def _with_retries(
+        self,
+        operation: str,
+        username: str,
+        user_id: Optional[int],
+        fetch: Callable[[InstagramClient, int], T],
+        preferred_account: Optional[str] = None,
+        accounts_in_use: Optional[Set[str]] = None,
+        cancelled: Optional[threading.Event] = None,
+        resolve_user_id: bool = True
+    ) -> T:
+        """
+        Executa uma extração seguindo a política de retry da operação
+        
+        Erros de rede são repetidos na mesma conta (a sessão continua válida);
+        os demais trocam de conta, congelando-a quando o erro é da conta.
+        Nenhuma tentativa começa (nem espera) além do prazo da requisição
+        
+        Args:
+            operation: Nome da operação (seleciona a RetryPolicy)
+            username: Username do perfil alvo
+            user_id: pk do perfil, se já conhecido
+            fetch: Função (cliente logado, user_id do alvo) -> resultado
+            preferred_account: Conta a usar na primeira tentativa, se disponível
+            accounts_in_use: Contas em uso por execuções concorrentes da mesma extração (hedge),
+                que não são escolhidas; a conta de cada tentativa é registrada aqui
+            cancelled: Evento que impede novas tentativas (a execução concorrente já venceu)
+            resolve_user_id: Se False, fetch recebe user_id como informado (resolve por conta própria)
+            
+        Returns:
+            Retorno de fetch
+            
+        Raises:
+            ProfileNotFound: Se perfil não existir
+            PrivateProfileError: Se perfil for privado e não tiver acesso
+            RateLimitExceeded: Se todas as tentativas esbarrarem em rate limit
+            ExtractionError: Se as tentativas acabarem por outros erros
+            DeadlineExceeded: Se o prazo da requisição acabar
+        """
+        policy = self.retry_policies[operation]
+        deadline = current_deadline()
+        started = time.monotonic()
         attempt = 0
+        # Tentativas negadas com PrivateAccount: só com todas negadas o perfil é dado como privado
+        denied = 0
         
-        while attempt < max_retries:
+        while True:
             attempt += 1
+            account = None
+            
+            if cancelled is not None and cancelled.is_set():
+                raise ExtractionError(f"Extração de @{username} descartada (execução concorrente concluiu antes)")
             
             try:
+                if deadline is not None:
+                    deadline.check(f"antes da tentativa {attempt}")
+                
                 # Obter conta disponível
-                account = self.account_manager.get_next_account()
-                logger.info(f"Tentativa {attempt}/{max_retries} com conta: {account.username}")
+                if accounts_in_use is not None:
+                    account = self.account_manager.get_next_account(
+                        preferred=preferred_account if attempt == 1 else None,
+                        exclude=accounts_in_use
+                    )
+                    accounts_in_use.add(account.username)
+                elif preferred_account and attempt == 1:
+                    account = self.account_manager.get_next_account(preferred=preferred_account)
+                else:
+                    account = self.account_manager.get_next_account()
+                logger.info(f"Tentativa {attempt}/{policy.max_attempts} com conta: {account.username}")
                 
-                # Criar cliente e fazer extração
-                with InstagramClient(account) as client:
-                    # Obter user_id
-                    user_id = client.get_user_id_from_username(username)
-                    
-                    # Extrair stories
-                    stories_data = client.client.user_stories(user_id)
-                    
-                    # Converter para nosso formato
-                    stories = self._convert_stories_data(stories_data)
-                    
-                    # Marcar conta como usada com sucesso
-                    self.account_manager.mark_account_used(account.username)
-                    
-                    logger.info(f"✓ Extração bem-sucedida: {len(stories)} stories obtidos")
-                    return stories
-                    
-            except UserNotFound as e:
-                logger.error(f"Perfil @{username} não encontrado")
-                raise ProfileNotFound(f"Perfil @{username} não existe")
+                # Obter cliente logado do pool e fazer extração
+                with self.client_pool.client(account) as client:
+                    while True:
+                        try:
+                            # Obter user_id (cache ou Instagram)
+                            if resolve_user_id:
+                                target_user_id = self._resolve_user_id(client, username, user_id)
+                            else:
+                                target_user_id = user_id
+                            result = fetch(client, target_user_id)
+                        except Exception as e:
+                            rule = policy.classify(e)
+                            if rule.action is not ErrorAction.RETRY or attempt >= policy.max_attempts:
+                                raise
+                            
+                            delay = policy.backoff(attempt)
+                            logger.warning(f"{rule.reason}: {e} - repetindo com a mesma conta em {delay:.2f}s")
+                            self._sleep_backoff(delay, deadline)
+                            attempt += 1
+                            logger.info(f"Tentativa {attempt}/{policy.max_attempts} com conta: {account.username}")
+                            continue
+                        
+                        # Marcar conta como usada com sucesso
+                        self.account_manager.mark_account_used(account.username)
+                        self.latency.record(operation, time.monotonic() - started)
+                        return result
             
-            except (RateLimitError, PleaseWaitFewMinutes) as e:
-                logger.warning(f"Rate limit atingido: {e}")
-                self.account_manager.freeze_account(
-                    account.username,
-                    duration_minutes=60,
-                    reason="Rate limit exceeded"
-                )
+            except Exception as e:
+                rule = policy.classify(e)
+                self._handle_failure(rule, e, account, username, user_id)
+                if isinstance(e, PrivateAccount):
+                    denied += 1
                 
-                if attempt < max_retries:
-                    continue
-                else:
-                    raise RateLimitExceeded("Rate limit excedido em todas as tentativas")
-            
-            except ValidationError as e:
-                logger.error(f"Erro de validação do Pydantic (stories): {e}")
-                logger.info("Tentando com outra conta (possível problema de versão da API)...")
-                self.account_manager.mark_account_error(account.username, f"Validation error: {str(e)[:100]}")
+                if attempt >= policy.max_attempts:
+                    error = policy.exhausted_error(rule, username, attempt, e)
+                    if isinstance(error, PrivateProfileError):
+                        error.details['all_denied'] = denied == attempt
+                    raise error
                 
-                if attempt < max_retries:
-                    continue
+                if policy.should_wait(rule):
+                    delay = policy.backoff(attempt)
+                    logger.info(f"Tentando com outra conta em {delay:.2f}s...")
+                    self._sleep_backoff(delay, deadline)
                 else:
-                    raise ExtractionError(f"Erro de validação persistente. Atualize o instagrapi: pip install --upgrade instagrapi")
+                    logger.info("Tentando com outra conta...")
             
-            except AccountPoolExhausted as e:
+            finally:
+                if accounts_in_use is not None and account is not None:
+                    accounts_in_use.discard(account.username)
+    
+    @staticmethod
+    def _sleep_backoff(delay: float, deadline: Optional[Deadline]):
+        """
+        Aguarda o backoff antes da próxima tentativa
+        
+        Raises:
+            DeadlineExceeded: Se a próxima tentativa começaria depois do prazo
+        """
+        if deadline is not None and delay >= deadline.remaining():
+            raise deadline.exceeded("aguardando nova tentativa")
+        time.sleep(delay)
+    
+    def _handle_failure(
+        self,
+        rule: ErrorRule,
+        error: Exception,
+        account: Optional[Account],
+        username: str,
+        user_id: Optional[int]
+    ):
+        """
+        Aplica os efeitos de um erro sobre a conta usada (congelamento, sessão, erro)
+        
+        Raises:
+            ProfileNotFound: Se perfil não existir
+            AccountPoolExhausted: Se não houver contas disponíveis
+        """
+        if rule.action is ErrorAction.FATAL:
+            if isinstance(error, UserNotFound):
+                logger.error(f"Perfil @{username} não encontrado")
+                if user_id is None:
+                    self.user_id_cache.set_not_found(username)
+                raise ProfileNotFound(f"Perfil @{username} não existe")
+            if isinstance(error, AccountPoolExhausted):
                 logger.error("Pool de contas esgotado")
-                raise
+            elif isinstance(error, DeadlineExceeded):
+                logger.warning(f"Extração de @{username} interrompida: {error.message}")
+            raise error
+        
+        logger.warning(f"{rule.reason} ({type(error).__name__}): {error}")
+        if account is None:
+            return
+        
+        if rule.invalidate_session:
+            # Sessão inválida: descartar clientes ociosos e forçar nova verificação
+            self.client_pool.invalidate(account.username)
+            self.account_manager.invalidate_session(account.username)
+        
+        if rule.action is ErrorAction.FREEZE:
+            self.account_manager.freeze_account(
+                account.username,
+                duration_minutes=rule.freeze_minutes or Config.ACCOUNT_FREEZE_DURATION_MINUTES,
+                reason=rule.reason
+            )
+        elif rule.mark_error:
+            self.account_manager.mark_account_error(account.username, f"{rule.reason}: {str(error)[:100]}")
+    
+    def _check_known_missing(self, username: str, user_id: Optional[int]):
+        """
+        Falha imediatamente (sem usar contas) se o perfil foi recentemente identificado como inexistente
+        
+        Raises:
+            ProfileNotFound: Se houver cache negativo para o username
+        """
+        if user_id is None and self.user_id_cache.is_known_missing(username):
+            logger.info(f"Perfil @{username} inexistente (cache)")
+            raise ProfileNotFound(f"Perfil @{username} não existe")
+    
+    def _resolve_user_id(self, client: InstagramClient, username: str, user_id: Optional[int] = None) -> int:
+        """
+        Obtém o user_id do perfil, usando o valor informado ou o cache antes de consultar o Instagram
+        
+        Args:
+            client: Cliente Instagram logado
+            username: Username do perfil
+            user_id: pk do perfil, se já conhecido
             
-            except Exception as e:
-                logger.error(f"Erro inesperado na tentativa {attempt}: {e}")
-                self.account_manager.mark_account_error(account.username, str(e))
-                
-                if attempt < max_retries:
-                    continue
-                else:
-                    raise ExtractionError(f"Falha após {max_retries} tentativas: {e}")
+        Returns:
+            user_id do perfil
+            
+        Raises:
+            ProfileNotFound: Se perfil não existir
+        """
+        if user_id:
+            return user_id
         
-        raise MaxRetriesExceeded(f"Excedido número máximo de tentativas ({max_retries})")
+        cached_user_id = self.user_id_cache.get(username)
+        if cached_user_id:
+            return cached_user_id
+        
+        try:
+            user_id, _ = self.backends.call("user_id", client.client, username)
+        except UserNotFound:
+            logger.error(f"Perfil não encontrado: {username}")
+            self.user_id_cache.set_not_found(username)
+            raise ProfileNotFound(f"Perfil {username} não existe")
+        
+        self.user_id_cache.set(username, user_id)
+        return user_id
+    
+    def _fetch_posts(self, client: InstagramClient, user_id: int, amount: int) -> List[Post]:
+        """
+        Busca os `amount` posts mais recentes pelo backend escolhido
+        
+        Returns:
+            Lista de Posts (do parser de JSON bruto ou convertidos dos modelos do instagrapi)
+        """
+        if self.raw_parser:
+            posts, _ = self.backends.call("medias", client.client, user_id, amount, raw=True)
+            return posts
+        medias, _ = self.backends.call("medias", client.client, user_id, amount)
+        return self._convert_medias_to_posts(medias, client)
+    
+    def _fetch_posts_page(
+        self,
+        client: InstagramClient,
+        user_id: int,
+        amount: int,
+        end_cursor: str,
+        backend: Optional[Backend] = None
+    ) -> Tuple[List[Post], str, Backend]:
+        """
+        Busca uma página de posts
+        
+        Args:
+            backend: Backend obrigatório (continuação de uma paginação), ou None para escolher
+            
+        Returns:
+            Tupla (posts, próximo cursor, backend usado)
+        """
+        (items, next_cursor), used = self.backends.call(
+            "medias_page", client.client, user_id, amount, end_cursor, backend=backend, raw=self.raw_parser
+        )
+        posts = items if self.raw_parser else self._convert_medias_to_posts(items, client)
+        return posts, next_cursor, used
+    
+    def _fetch_stories(self, client: InstagramClient, user_id: int) -> List[Story]:
+        """
+        Busca os stories ativos pelo backend escolhido
+        
+        Returns:
+            Lista de Stories
+        """
+        stories, _ = self.backends.call("stories", client.client, user_id, raw=self.raw_parser)
+        return stories if self.raw_parser else self._convert_stories_data(stories)
+    
+    def _posts_from_gql_nodes(self, nodes: List[dict], client: InstagramClient) -> List[Post]:
+        """
+        Converte nós do feed GraphQL (ex.: web_profile_info) em Posts
+        
+        Returns:
+            Lista de Posts (nós inválidos são ignorados)
+        """
+        if self.raw_parser:
+            return posts_from_gql(nodes)
+        
+        medias = []
+        for node in nodes:
+            try:
+                medias.append(extract_media_gql(node))
+            except Exception as e:
+                logger.warning(f"Erro ao converter media {node.get('id', 'unknown')}: {e}")
+        return self._convert_medias_to_posts(medias, client)
     
     def _convert_medias_to_posts(self, medias, client: InstagramClient) -> List[Post]:
         """
         Converte objetos Media do instagrapi para nossos Posts
         
+        Os campos vêm de modelos já validados pelo instagrapi e têm os tipos certos,
+        então Post/MediaItem são montados sem nova validação (construct)
+        
         Args:
             medias: Lista de Media do instagrapi
             client: Cliente Instagram (para obter URLs)
@@ -269,7 +820,7 @@ class InstagramExtractor:
                 if media.media_type == 8:  # Album/Carousel
                     # Obter todas as mídias do carrossel
                     for resource in media.resources:
-                        media_item = MediaItem(
+                        media_item = MediaItem.construct(
                             media_type=resource.media_type,
                             media_url=str(resource.thumbnail_url) if resource.thumbnail_url else None,
                             thumbnail_url=str(resource.thumbnail_url) if resource.thumbnail_url else None,
@@ -278,7 +829,7 @@ class InstagramExtractor:
                         media_items.append(media_item)
                 else:
                     # Post simples (foto ou vídeo)
-                    media_item = MediaItem(
+                    media_item = MediaItem.construct(
                         media_type=media.media_type,
                         media_url=str(media.thumbnail_url) if media.thumbnail_url else None,
                         thumbnail_url=str(media.thumbnail_url) if media.thumbnail_url else None,
@@ -287,12 +838,12 @@ class InstagramExtractor:
                     media_items.append(media_item)
                 
                 # Criar Post
-                post = Post(
+                post = Post.construct(
                     id=str(media.pk),
                     code=media.code,
                     caption=media.caption_text if media.caption_text else "",
-                    like_count=media.like_count,
-                    comment_count=media.comment_count,
+                    like_count=media.like_count or 0,
+                    comment_count=media.comment_count or 0,
                     media_type=media.media_type,
                     taken_at=media.taken_at.isoformat() if media.taken_at else datetime.now().isoformat(),
                     medias=media_items
@@ -308,7 +859,7 @@ class InstagramExtractor:
     
     def _convert_stories_data(self, stories_data) -> List[Story]:
         """
-        Converte objetos Story do instagrapi para nossos Stories
+        Converte objetos Story do instagrapi para nossos Stories (sem nova validação, como os Posts)
         
         Args:
             stories_data: Lista de Story do instagrapi
@@ -325,17 +876,18 @@ class InstagramExtractor:
                 media_type = getattr(story, 'media_type', 1)
                 thumbnail_url = getattr(story, 'thumbnail_url', None)
                 video_url = getattr(story, 'video_url', None)
-                taken_at = getattr(story, 'taken_at', None)
-                expiring_at = getattr(story, 'expiring_at', None)
+                taken_at = getattr(story, 'taken_at', None) or datetime.now()
+                # Stories expiram 24h após a publicação (nem toda versão do instagrapi expõe expiring_at)
+                expiring_at = getattr(story, 'expiring_at', None) or taken_at + timedelta(hours=24)
                 
-                story_obj = Story(
+                story_obj = Story.construct(
                     id=story_id,
                     media_type=media_type,
                     media_url=str(thumbnail_url) if media_type == 1 and thumbnail_url else None,
                     video_url=str(video_url) if media_type == 2 and video_url else None,
                     thumbnail_url=str(thumbnail_url) if thumbnail_url else None,
-                    taken_at=taken_at.isoformat() if taken_at else datetime.now().isoformat(),
-                    expiring_at=expiring_at.isoformat() if expiring_at else datetime.now().isoformat()
+                    taken_at=taken_at.isoformat(),
+                    expiring_at=expiring_at.isoformat()
                 )
                 
                 stories.append(story_obj)
@@ -18,8 +18,10 @@ from typing import Optional
 import json
 
 from app.models.account import Account
+from app.services.session_store import SessionStore, get_session_store
 from app.config import Config
 from app.utils.logger import get_logger
+from app.utils.deadline import bounded_pauses, bounded_retries, current_deadline, http_timeout
 from app.utils.exceptions import (
     AccountLoginFailed,
     SessionLoadError,
@@ -37,19 +39,24 @@ class InstagramClient:
     proxy, fingerprint e tratamento de exceções
     """
     
-    def __init__(self, account: Account):
+    def __init__(self, account: Account, session_store: Optional[SessionStore] = None):
         """
         Inicializa o cliente Instagram para uma conta específica
         
         Args:
             account: Objeto Account com credenciais e configurações
+            session_store: Store de sessões em memória (usa o global se não fornecido)
         """
         self.account = account
+        # SessionStore define __len__: um store vazio injetado também é falso
+        self.session_store = session_store if session_store is not None else get_session_store()
         self.client = Client()
         self._is_logged_in = False
         
-        # Configurar delays entre requisições
-        self.client.delay_range = [Config.INSTAGRAM_DELAY_MIN, Config.INSTAGRAM_DELAY_MAX]
+        # Configurar delays entre requisições (limitados ao prazo da requisição a cada chamada)
+        self.delay_range = [Config.INSTAGRAM_DELAY_MIN, Config.INSTAGRAM_DELAY_MAX]
+        self.client.delay_range = self.delay_range
+        self.request_timeout = self.client.request_timeout
         
         logger.info(f"Inicializando InstagramClient para: {account.username}")
         
@@ -62,6 +69,9 @@ class InstagramClient:
         # Configurar handler de exceções customizado
         self.client.handle_exception = self._handle_exception
         
+        # Limitar o tempo de cada chamada HTTP (e ao prazo da requisição em andamento)
+        self._setup_timeouts()
+        
         # Tentar desabilitar validação estrita do Pydantic para evitar erros de campos opcionais
         try:
             # Isso pode ajudar com erros de validação de campos novos da API do Instagram
@@ -83,6 +93,45 @@ class InstagramClient:
         except Exception as e:
             logger.warning(f"Erro ao configurar proxy: {e}")
     
+    def _setup_timeouts(self):
+        """
+        Aplica timeout às sessões HTTP do instagrapi, que por padrão não usam nenhum
+        O timeout é INSTAGRAM_HTTP_TIMEOUT_SECONDS, limitado ao prazo restante da requisição
+        
+        As esperas internas do instagrapi também respeitam o prazo: as pausas antes de cada
+        chamada (delay_range e request_timeout), as tentativas do public_request e a espera
+        de 60s do private_request após um 408
+        """
+        for session in (self.client.private, self.client.public):
+            send = session.request
+            
+            def request(method, url, _send=send, _private=session is self.client.private, **kwargs):
+                if kwargs.get("timeout") is None:
+                    kwargs["timeout"] = http_timeout(Config.INSTAGRAM_HTTP_TIMEOUT_SECONDS)
+                response = _send(method, url, **kwargs)
+                deadline = current_deadline()
+                # Após um 408 o private_request dorme 60s antes de repetir a chamada
+                if _private and response.status_code == 408 and deadline is not None and deadline.remaining() < 60:
+                    raise deadline.exceeded("Instagram respondeu 408")
+                return response
+            
+            session.request = request
+        
+        private_request = self.client.private_request
+        public_request = self.client.public_request
+        
+        def bounded_private_request(*args, **kwargs):
+            self.client.delay_range, self.client.request_timeout = bounded_pauses(self.delay_range, self.request_timeout)
+            return private_request(*args, **kwargs)
+        
+        def bounded_public_request(*args, retries_count: int = 3, retries_timeout: float = 2, **kwargs):
+            self.client.delay_range, self.client.request_timeout = bounded_pauses(self.delay_range, self.request_timeout)
+            retries_count = bounded_retries(retries_count, retries_timeout)
+            return public_request(*args, retries_count=retries_count, retries_timeout=retries_timeout, **kwargs)
+        
+        self.client.private_request = bounded_private_request
+        self.client.public_request = bounded_public_request
+    
     def _setup_device(self):
         """Configura device settings baseado no fingerprint da conta"""
         try:
@@ -140,17 +189,21 @@ class InstagramClient:
         Raises:
             AccountLoginFailed: Se não conseguir fazer login
         """
-        session_file = self._get_session_file()
+        session_settings = self.session_store.get(self.account.username)
         
-        # Tentar carregar sessão existente
-        if session_file.exists():
+        # Tentar carregar sessão existente (mantida em memória pelo SessionStore)
+        if session_settings:
             try:
-                logger.info(f"Tentando carregar sessão de: {session_file}")
-                self.client.load_settings(session_file)
+                logger.info(f"Tentando carregar sessão salva: {self.account.username}")
+                self.client.set_settings(session_settings)
                 self.client.login(self.account.username, self.account.password)
                 
-                # Verificar se sessão é válida
-                self.client.get_timeline_feed()
+                # Verificar se sessão é válida (pula a verificação se foi validada há pouco)
+                if self.account.is_session_verified(Config.SESSION_VERIFY_TTL_MINUTES):
+                    logger.debug(f"Sessão verificada recentemente, pulando verificação: {self.account.username}")
+                else:
+                    self.client.get_timeline_feed()
+                    self.account.mark_session_verified()
                 
                 self._is_logged_in = True
                 logger.info(f"✓ Login via sessão bem-sucedido: {self.account.username}")
@@ -158,6 +211,7 @@ class InstagramClient:
                 
             except LoginRequired:
                 logger.info("Sessão inválida, fazendo login fresh...")
+                self.account.invalidate_session()
             except Exception as e:
                 logger.warning(f"Erro ao carregar sessão: {e}")
         
@@ -180,12 +234,13 @@ class InstagramClient:
             self._save_session()
             
             self._is_logged_in = True
+            self.account.mark_session_verified()
             logger.info(f"✓ Login fresh bem-sucedido: {self.account.username}")
             return True
             
         except BadPassword as e:
             logger.error(f"Senha incorreta para {self.account.username}")
-            raise AccountLoginFailed(f"Senha incorreta: {e}")
+            raise AccountLoginFailed(f"Senha incorreta: {e}") from e
         
         except TwoFactorRequired as e:
             logger.error(f"2FA requerido para {self.account.username}")
@@ -197,20 +252,34 @@ class InstagramClient:
                     code = self.client.two_factor_login(two_factor_code)
                     self._save_session()
                     self._is_logged_in = True
+                    self.account.mark_session_verified()
                     logger.info(f"✓ Login 2FA bem-sucedido: {self.account.username}")
                     return True
                 except Exception as e2:
                     logger.error(f"Falha no 2FA: {e2}")
             
-            raise AccountLoginFailed(f"2FA requerido e não configurado: {e}")
+            raise AccountLoginFailed(f"2FA requerido e não configurado: {e}") from e
         
         except ChallengeRequired as e:
             logger.error(f"Challenge requerido para {self.account.username}")
-            raise AccountLoginFailed(f"Challenge requerido: {e}")
+            raise AccountLoginFailed(f"Challenge requerido: {e}") from e
         
         except Exception as e:
             logger.error(f"Erro ao fazer login: {e}")
-            raise AccountLoginFailed(f"Falha no login: {e}")
+            raise AccountLoginFailed(f"Falha no login: {e}") from e
+    
+    def adopt_session(self, other: "InstagramClient"):
+        """
+        Reaproveita a sessão autenticada de outro cliente da mesma conta,
+        sem fazer requisições ao Instagram
+        
+        Args:
+            other: Cliente já logado
+        """
+        self.client.set_settings(other.client.get_settings())
+        # Com a sessão carregada, o login do instagrapi retorna sem requisição
+        self.client.login(self.account.username, self.account.password)
+        self._is_logged_in = True
     
     def _get_2fa_code(self) -> str:
         """
@@ -248,16 +317,13 @@ class InstagramClient:
         Returns:
             Path do arquivo de sessão
         """
-        sessions_dir = Config.get_absolute_path(Config.SESSIONS_DIR_PATH)
-        sessions_dir.mkdir(parents=True, exist_ok=True)
-        return sessions_dir / f"{self.account.username}_session.json"
+        return self.session_store.get_path(self.account.username)
     
     def _save_session(self):
-        """Salva sessão atual em arquivo"""
+        """Salva sessão atual no SessionStore (gravação em disco em background)"""
         try:
-            session_file = self._get_session_file()
-            self.client.dump_settings(session_file)
-            logger.info(f"✓ Sessão salva: {session_file}")
+            self.session_store.put(self.account.username, self.client.get_settings())
+            logger.info(f"✓ Sessão salva: {self.account.username}")
         except Exception as e:
             logger.warning(f"Erro ao salvar sessão: {e}")
     
@@ -338,8 +404,11 @@ class InstagramClient:
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Context manager - saída"""
-        self.logout()
+        """
+        Context manager - saída
+        Mantém a sessão ativa para que o cliente possa ser reutilizado (ver ClientPool);
+        use logout() explicitamente para encerrar
+        """
         return False
     
     def __repr__(self) -> str:
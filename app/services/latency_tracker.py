@@ -0,0 +1,78 @@
+"""
+Latências recentes das extrações (janela deslizante por operação)
+"""
+from collections import deque
+from typing import Deque, Dict, Hashable, Optional
+import math
+import threading
+
+
+class LatencyTracker:
+    """
+    Mantém as últimas N latências de cada operação e calcula percentis sobre elas
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        Inicializa o tracker
+
+        Args:
+            window: Quantidade de medições mantidas por operação
+            min_samples: Medições necessárias antes de calcular percentis
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[Hashable, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: Hashable, seconds: float):
+        """
+        Registra uma medição
+
+        Args:
+            key: Operação medida
+            seconds: Duração em segundos
+        """
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, key: Hashable, percent: float) -> Optional[float]:
+        """
+        Calcula um percentil das medições recentes (nearest-rank)
+
+        Args:
+            key: Operação
+            percent: Percentil (0-100)
+
+        Returns:
+            Latência em segundos, ou None se ainda não houver medições suficientes
+        """
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+
+        rank = max(1, math.ceil(percent / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def get_status(self) -> Dict:
+        """
+        Retorna p50/p95 de cada operação
+
+        Returns:
+            Dicionário operação -> estatísticas
+        """
+        with self._lock:
+            keys = list(self._samples)
+        return {
+            str(key): {
+                'samples': len(self._samples[key]),
+                'p50': self.percentile(key, 50),
+                'p95': self.percentile(key, 95)
+            }
+            for key in keys
+        }
@@ -0,0 +1,155 @@
+"""
+Cache de resultados negativos: perfis inexistentes e perfis privados sem conta com acesso
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import threading
+import time
+
+from app.services.user_id_cache import UserIdCache
+from app.utils.logger import get_logger
+from app.utils.exceptions import ExtractionError, PrivateProfileError, ProfileNotFound
+
+logger = get_logger("negative_cache")
+
+
+class NegativeCache:
+    """
+    Guarda, por username, o erro definitivo da última extração (ProfileNotFound ou
+    PrivateProfileError) por um tempo limitado. Enquanto a entrada vale, novas
+    requisições recebem o mesmo erro sem ocupar vaga de extração nem gastar contas
+
+    Perfis inexistentes ficam no cache negativo do UserIdCache (o mesmo que o extractor
+    consulta, com USER_ID_NEGATIVE_TTL_MINUTES); aqui ficam só os perfis privados
+    """
+
+    def __init__(self, user_id_cache: UserIdCache, private_ttl: float, max_entries: int = 10000):
+        """
+        Inicializa o cache
+
+        Args:
+            user_id_cache: Cache de user_id que guarda os perfis inexistentes
+            private_ttl: Segundos em que um perfil privado é lembrado (0 = não cachear)
+            max_entries: Número máximo de entradas de perfis privados (LRU)
+        """
+        self.user_id_cache = user_id_cache
+        self.private_ttl = private_ttl
+        self.max_entries = max_entries
+
+        # username -> (mensagem, expires_at) dos perfis privados
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def record(self, username: str, error: ExtractionError):
+        """
+        Registra o erro definitivo de um perfil
+
+        PrivateProfileError só é registrado se todas as tentativas foram negadas com
+        PrivateAccount (details['all_denied'])
+
+        Args:
+            username: Username do perfil
+            error: ProfileNotFound ou PrivateProfileError
+        """
+        if isinstance(error, ProfileNotFound):
+            # Normalmente o extractor já registrou ao buscar o user_id
+            if not self.user_id_cache.is_known_missing(username):
+                self.user_id_cache.set_not_found(username)
+            return
+        if not isinstance(error, PrivateProfileError) or self.private_ttl <= 0:
+            return
+        if not error.details.get('all_denied'):
+            # Sem PrivateAccount em todas as contas o erro pode ser da conta (proxy, sessão...)
+            logger.debug(f"Perfil privado não confirmado por todas as contas, sem cache: @{username}")
+            return
+
+        key = username.lower()
+        with self._lock:
+            self._entries[key] = (error.message, time.time() + self.private_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.info(f"Perfil privado cacheado: @{username} ({self.private_ttl:.0f}s)")
+
+    def check(self, username: str):
+        """
+        Relança o erro cacheado do perfil, se houver
+
+        Args:
+            username: Username do perfil
+
+        Raises:
+            ProfileNotFound: Se o perfil foi recentemente identificado como inexistente
+            PrivateProfileError: Se o perfil foi recentemente identificado como privado
+        """
+        error = self.get(username)
+        if error is not None:
+            raise error
+
+    def get(self, username: str) -> Optional[ExtractionError]:
+        """
+        Busca o erro cacheado do perfil
+
+        Args:
+            username: Username do perfil
+
+        Returns:
+            Nova instância do erro cacheado, ou None
+        """
+        key = username.lower()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._hits += 1
+
+        if entry is not None:
+            message, expires_at = entry
+            return PrivateProfileError(message, details={'cached': True, 'expires_in': int(expires_at - now)})
+
+        expires_at = self.user_id_cache.missing_until(username)
+        if expires_at is None:
+            return None
+        with self._lock:
+            self._hits += 1
+        return ProfileNotFound(
+            f"Perfil @{username} não existe",
+            details={'cached': True, 'expires_in': int(expires_at - now)}
+        )
+
+    def invalidate(self, username: str):
+        """
+        Remove o perfil do cache (ex.: extração bem-sucedida)
+
+        Args:
+            username: Username do perfil
+        """
+        with self._lock:
+            self._entries.pop(username.lower(), None)
+        if self.user_id_cache.is_known_missing(username):
+            self.user_id_cache.invalidate(username)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_status(self) -> Dict:
+        """
+        Retorna estatísticas do cache
+
+        Returns:
+            Dicionário com estatísticas
+        """
+        with self._lock:
+            return {
+                'private_entries': len(self._entries),
+                'not_found_ttl_seconds': self.user_id_cache.negative_ttl,
+                'private_ttl_seconds': self.private_ttl,
+                'hits': self._hits
+            }
+
+    def __repr__(self) -> str:
+        return f"NegativeCache(private_entries={len(self._entries)})"
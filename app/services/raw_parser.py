@@ -0,0 +1,227 @@
+"""
+Parser enxuto do JSON bruto do Instagram (API privada v1 e GraphQL web)
+
+Monta Post/MediaItem/Story direto dos dicionários da resposta, lendo apenas os campos
+que a API devolve, sem passar pelos modelos Media/Story do instagrapi (mais baratos e
+imunes a mudanças de schema em campos que não usamos). Os tipos são normalizados aqui,
+então os modelos são montados sem validação (construct)
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.models.requests import Post, Story, MediaItem
+from app.utils.logger import get_logger
+
+logger = get_logger("raw_parser")
+
+# __typename do GraphQL -> media_type (1=foto, 2=vídeo, 8=álbum)
+GQL_MEDIA_TYPES = {
+    "GraphImage": 1,
+    "GraphVideo": 2,
+    "GraphSidecar": 8,
+    "GraphStoryImage": 1,
+    "GraphStoryVideo": 2,
+    "StoryVideo": 2
+}
+
+
+def _gql_media_type(node: Dict[str, Any]) -> int:
+    """
+    media_type de um nó GraphQL pelo __typename; para tipos desconhecidos usa os campos do nó
+
+    Raises:
+        ValueError: Se nem __typename nem is_video/product_type/filhos identificarem o tipo
+    """
+    typename = node.get("__typename")
+    if typename in GQL_MEDIA_TYPES:
+        return GQL_MEDIA_TYPES[typename]
+    if node.get("edge_sidecar_to_children"):
+        media_type = 8
+    elif node.get("is_video") or node.get("product_type") in ("clips", "igtv"):
+        media_type = 2
+    elif node.get("is_video") is False:
+        media_type = 1
+    else:
+        raise ValueError(f"__typename desconhecido: {typename!r}")
+    logger.debug(f"__typename desconhecido {typename!r}, media_type {media_type} pelos campos do nó")
+    return media_type
+
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value, tz=timezone.utc) if value else None
+
+
+def _best_url(candidates: List[Dict[str, Any]], url_key: str, width_key: str, height_key: str) -> Optional[str]:
+    """URL da maior resolução entre as versões de uma mídia"""
+    if not candidates:
+        return None
+    return max(candidates, key=lambda o: (o.get(width_key) or 0) * (o.get(height_key) or 0)).get(url_key)
+
+
+def _v1_urls(item: Dict[str, Any]):
+    thumbnail = _best_url((item.get("image_versions2") or {}).get("candidates"), "url", "width", "height")
+    video = _best_url(item.get("video_versions"), "url", "width", "height")
+    return thumbnail, video
+
+
+def _gql_urls(node: Dict[str, Any]):
+    thumbnail = _best_url(node.get("display_resources"), "src", "config_width", "config_height")
+    thumbnail = thumbnail or node.get("display_url") or node.get("thumbnail_src")
+    video = node.get("video_url") or _best_url(node.get("video_resources"), "src", "config_width", "config_height")
+    return thumbnail, video
+
+
+def _media_item(media_type: int, thumbnail: Optional[str], video: Optional[str]) -> MediaItem:
+    return MediaItem.construct(
+        media_type=media_type,
+        media_url=thumbnail,
+        thumbnail_url=thumbnail,
+        video_url=video if media_type == 2 else None
+    )
+
+
+def post_from_v1(item: Dict[str, Any]) -> Post:
+    """
+    Converte um item do feed da API privada (feed/user/{id}/) em Post
+
+    Args:
+        item: Dicionário do item
+
+    Returns:
+        Post
+    """
+    media_type = item["media_type"]
+    if media_type == 8:
+        medias = []
+        for resource in item.get("carousel_media") or []:
+            thumbnail, video = _v1_urls(resource)
+            medias.append(_media_item(resource["media_type"], thumbnail, video))
+    else:
+        thumbnail, video = _v1_urls(item)
+        medias = [_media_item(media_type, thumbnail, video)]
+
+    taken_at = _timestamp(item.get("taken_at")) or datetime.now()
+    return Post.construct(
+        id=str(item["pk"]),
+        code=item["code"],
+        caption=(item.get("caption") or {}).get("text") or "",
+        like_count=item.get("like_count") or 0,
+        comment_count=item.get("comment_count") or 0,
+        media_type=media_type,
+        taken_at=taken_at.isoformat(),
+        medias=medias
+    )
+
+
+def post_from_gql(node: Dict[str, Any]) -> Post:
+    """
+    Converte um nó de edge_owner_to_timeline_media (GraphQL/web_profile_info) em Post
+
+    Args:
+        node: Dicionário do nó
+
+    Returns:
+        Post
+
+    Raises:
+        ValueError: Se o tipo da mídia (ou de um item do carrossel) não puder ser identificado
+    """
+    media_type = _gql_media_type(node)
+    if media_type == 8:
+        medias = []
+        for edge in (node.get("edge_sidecar_to_children") or {}).get("edges", []):
+            child = edge["node"]
+            child_type = _gql_media_type(child)
+            medias.append(_media_item(child_type, child.get("display_url"), child.get("video_url")))
+    else:
+        thumbnail, video = _gql_urls(node)
+        medias = [_media_item(media_type, thumbnail, video)]
+
+    captions = (node.get("edge_media_to_caption") or {}).get("edges") or []
+    taken_at = _timestamp(node.get("taken_at_timestamp")) or datetime.now()
+    return Post.construct(
+        id=str(node["id"]),
+        code=node["shortcode"],
+        caption=captions[0]["node"].get("text", "") if captions else "",
+        like_count=(node.get("edge_media_preview_like") or node.get("edge_liked_by") or {}).get("count") or 0,
+        comment_count=(node.get("edge_media_to_comment") or {}).get("count") or 0,
+        media_type=media_type,
+        taken_at=taken_at.isoformat(),
+        medias=medias
+    )
+
+
+def story_from_v1(item: Dict[str, Any]) -> Story:
+    """
+    Converte um item do reel da API privada (feed/user/{id}/story/) em Story
+
+    Args:
+        item: Dicionário do item
+
+    Returns:
+        Story
+    """
+    thumbnail, video = _v1_urls(item)
+    return _story(item["pk"], item.get("media_type", 1), thumbnail, video, item.get("taken_at"), item.get("expiring_at"))
+
+
+def story_from_gql(node: Dict[str, Any]) -> Story:
+    """
+    Converte um item de reels_media (GraphQL) em Story
+
+    Args:
+        node: Dicionário do item
+
+    Returns:
+        Story
+    """
+    thumbnail, video = _gql_urls(node)
+    return _story(
+        node["id"], 2 if node.get("is_video") else 1, thumbnail, video,
+        node.get("taken_at_timestamp"), node.get("expiring_at_timestamp")
+    )
+
+
+def _story(pk, media_type: int, thumbnail: Optional[str], video: Optional[str], taken_at, expiring_at) -> Story:
+    taken = _timestamp(taken_at) or datetime.now()
+    # Stories expiram 24h após a publicação
+    expiring = _timestamp(expiring_at) or taken + timedelta(hours=24)
+    return Story.construct(
+        id=str(pk),
+        media_type=media_type,
+        media_url=thumbnail if media_type == 1 else None,
+        video_url=video if media_type == 2 else None,
+        thumbnail_url=thumbnail,
+        taken_at=taken.isoformat(),
+        expiring_at=expiring.isoformat()
+    )
+
+
+def _parse_all(parse, items: List[Dict[str, Any]], kind: str) -> list:
+    results = []
+    for item in items:
+        try:
+            results.append(parse(item))
+        except Exception as e:
+            logger.warning(f"Erro ao converter {kind} {item.get('pk', item.get('id', 'unknown'))}: {e}")
+    return results
+
+
+def posts_from_v1(items: List[Dict[str, Any]]) -> List[Post]:
+    """Converte itens do feed v1 em Posts (itens inválidos são ignorados)"""
+    return _parse_all(post_from_v1, items, "media")
+
+
+def posts_from_gql(nodes: List[Dict[str, Any]]) -> List[Post]:
+    """Converte nós do feed GraphQL em Posts (nós inválidos são ignorados)"""
+    return _parse_all(post_from_gql, nodes, "media")
+
+
+def stories_from_v1(items: List[Dict[str, Any]]) -> List[Story]:
+    """Converte itens do reel v1 em Stories (itens inválidos são ignorados)"""
+    return _parse_all(story_from_v1, items, "story")
+
+
+def stories_from_gql(nodes: List[Dict[str, Any]]) -> List[Story]:
+    """Converte itens de reels_media em Stories (itens inválidos são ignorados)"""
+    return _parse_all(story_from_gql, nodes, "story")
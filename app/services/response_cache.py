@@ -0,0 +1,183 @@
+"""
+Cache em memória das respostas de extração (TTL + stale-while-revalidate)
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Optional
+import threading
+import time
+
+from app.utils.logger import get_logger
+
+logger = get_logger("response_cache")
+
+
+@dataclass
+class CacheEntry:
+    """
+    Entrada do cache
+    Fresca até fresh_until; depois disso pode ser servida (stale) até expires_at
+    """
+    value: Any
+    stored_at: float
+    fresh_until: float
+    expires_at: float
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Verifica se a entrada ainda está dentro do TTL"""
+        return (now or time.time()) < self.fresh_until
+
+    @property
+    def age(self) -> float:
+        """Idade da entrada em segundos"""
+        return time.time() - self.stored_at
+
+
+class ResponseCache:
+    """
+    Cache LRU com TTL e janela de stale-while-revalidate
+
+    Entradas frescas são servidas normalmente; entradas vencidas continuam sendo
+    servidas por mais stale_ttl segundos enquanto o chamador as atualiza em background
+    """
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0, max_entries: int = 1000):
+        """
+        Inicializa o cache
+
+        Args:
+            name: Nome do cache (para logs)
+            ttl: Segundos em que a entrada é considerada fresca (0 = cache desabilitado)
+            stale_ttl: Segundos adicionais em que a entrada vencida ainda pode ser servida
+            max_entries: Número máximo de entradas (LRU)
+        """
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Cache habilitado (TTL > 0)"""
+        return self.ttl > 0
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Busca uma entrada (fresca ou stale)
+
+        Args:
+            key: Chave da entrada
+
+        Returns:
+            CacheEntry ou None se ausente/expirada
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            if entry.expires_at <= now:
+                del self._entries[key]
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if entry.is_fresh(now):
+                self._hits += 1
+            else:
+                self._stale_hits += 1
+            return entry
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Busca uma entrada sem alterar estatísticas nem a ordem do LRU
+
+        Args:
+            key: Chave da entrada
+
+        Returns:
+            CacheEntry ou None se ausente/expirada
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.time():
+                return None
+            return entry
+
+    def set(self, key: Hashable, value: Any, **meta) -> Optional[CacheEntry]:
+        """
+        Armazena uma entrada
+
+        Args:
+            key: Chave da entrada
+            value: Valor a cachear
+            **meta: Metadados guardados junto com o valor
+
+        Returns:
+            CacheEntry criada (None se o cache estiver desabilitado)
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        entry = CacheEntry(
+            value=value,
+            stored_at=now,
+            fresh_until=now + self.ttl,
+            expires_at=now + self.ttl + self.stale_ttl,
+            meta=meta
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, key: Hashable):
+        """
+        Remove uma entrada
+
+        Args:
+            key: Chave da entrada
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_status(self) -> Dict:
+        """
+        Retorna estatísticas do cache
+
+        Returns:
+            Dicionário com estatísticas
+        """
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'ttl_seconds': self.ttl,
+                'stale_seconds': self.stale_ttl,
+                'hits': self._hits,
+                'stale_hits': self._stale_hits,
+                'misses': self._misses
+            }
+
+    def __repr__(self) -> str:
+        return f"ResponseCache(name={self.name}, entries={len(self._entries)}, ttl={self.ttl}s)"
@@ -0,0 +1,287 @@
+"""
+Política de retry das extrações: classificação de erros do Instagram e backoff exponencial com jitter
+"""
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Callable, Dict, Optional, Tuple, Type
+import random
+
+from instagrapi.exceptions import (
+    UserNotFound,
+    PrivateAccount,
+    RateLimitError,
+    PleaseWaitFewMinutes,
+    LoginRequired,
+    BadPassword,
+    TwoFactorRequired,
+    ChallengeError,
+    FeedbackRequired,
+    ProxyAddressIsBlocked,
+    SentryBlock,
+    ClientConnectionError,
+    ClientRequestTimeout,
+    ClientIncompleteReadError,
+    ClientJSONDecodeError,
+    ClientThrottledError,
+    ClientLoginRequired
+)
+from pydantic import ValidationError
+import requests
+
+from app.config import Config
+from app.utils.logger import get_logger
+from app.utils.exceptions import (
+    InstagramAPIException,
+    AccountLoginFailed,
+    ConfigurationError,
+    ProfileNotFound,
+    PrivateProfileError,
+    RateLimitExceeded,
+    ExtractionError,
+    AccountPoolExhausted,
+    DeadlineExceeded
+)
+
+logger = get_logger("retry_policy")
+
+
+class ErrorAction(str, Enum):
+    """O que fazer após um erro em uma tentativa"""
+    RETRY = "retry"      # Repetir com a mesma conta e sessão (erro transitório de rede)
+    ROTATE = "rotate"    # Tentar com outra conta
+    FREEZE = "freeze"    # Congelar a conta e tentar com outra
+    FATAL = "fatal"      # Propagar imediatamente
+
+
+@dataclass(frozen=True)
+class ErrorRule:
+    """
+    Regra de classificação de um grupo de exceções
+
+    final_error/final_message definem a exceção lançada quando as tentativas acabam
+    (a mensagem aceita {username}, {attempts} e {error})
+    """
+    exceptions: Tuple[Type[BaseException], ...]
+    action: ErrorAction
+    reason: str
+    freeze_minutes: Optional[int] = None
+    invalidate_session: bool = False
+    mark_error: bool = False
+    final_error: Type[InstagramAPIException] = ExtractionError
+    final_message: str = "Falha após {attempts} tentativas: {error}"
+
+    def matches(self, error: BaseException) -> bool:
+        return isinstance(error, self.exceptions)
+
+
+# A ordem importa: a primeira regra compatível vale. No instagrapi quase todos os erros
+# (UserNotFound, LoginRequired, RateLimitError, ProxyAddressIsBlocked...) são subclasses
+# de PrivateError, que não indica perfil privado; só PrivateAccount indica
+DEFAULT_RULES: Tuple[ErrorRule, ...] = (
+    ErrorRule(
+        (ProfileNotFound, UserNotFound, AccountPoolExhausted, DeadlineExceeded),
+        ErrorAction.FATAL,
+        reason="Erro definitivo"
+    ),
+    ErrorRule(
+        (RateLimitError, PleaseWaitFewMinutes, ClientThrottledError),
+        ErrorAction.FREEZE,
+        reason="Rate limit exceeded",
+        final_error=RateLimitExceeded,
+        final_message="Rate limit excedido em todas as tentativas"
+    ),
+    ErrorRule(
+        (LoginRequired, ClientLoginRequired, ChallengeError, FeedbackRequired, BadPassword, TwoFactorRequired,
+         AccountLoginFailed),
+        ErrorAction.FREEZE,
+        reason="Login required",
+        freeze_minutes=120,
+        invalidate_session=True,
+        final_message="Falha de autenticação em todas as tentativas"
+    ),
+    ErrorRule(
+        (ProxyAddressIsBlocked, SentryBlock),
+        ErrorAction.FREEZE,
+        reason="Proxy/IP bloqueado",
+        final_message="Proxy ou IP bloqueado em todas as tentativas"
+    ),
+    ErrorRule(
+        (PrivateAccount,),
+        ErrorAction.ROTATE,
+        reason="Perfil privado",
+        final_error=PrivateProfileError,
+        final_message="Perfil @{username} é privado e nenhuma conta tem acesso"
+    ),
+    ErrorRule(
+        (ClientConnectionError, ClientRequestTimeout, ClientIncompleteReadError,
+         ClientJSONDecodeError, requests.ConnectionError, requests.Timeout),
+        ErrorAction.RETRY,
+        reason="Erro de rede"
+    ),
+    ErrorRule(
+        (ValidationError,),
+        ErrorAction.ROTATE,
+        reason="Validation error",
+        mark_error=True,
+        final_message="Erro de validação persistente. Atualize o instagrapi: pip install --upgrade instagrapi"
+    ),
+    ErrorRule(
+        (Exception,),
+        ErrorAction.ROTATE,
+        reason="Erro inesperado",
+        mark_error=True
+    ),
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Política de retry de uma operação
+
+    O atraso antes da tentativa n+1 é base_delay * multiplier^(n-1), limitado a max_delay,
+    multiplicado por um fator aleatório em [1 - jitter, 1] (jitter=1 é o "full jitter").
+    Trocas de conta por congelamento não esperam: o problema era da conta, não do Instagram
+    """
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    multiplier: float = 2.0
+    jitter: float = 1.0
+    rules: Tuple[ErrorRule, ...] = DEFAULT_RULES
+
+    def classify(self, error: BaseException) -> ErrorRule:
+        """
+        Encontra a regra que trata a exceção
+
+        Args:
+            error: Exceção da tentativa
+
+        Returns:
+            Primeira ErrorRule compatível
+        """
+        # InstagramClient.login embrulha o erro do instagrapi (BadPassword, ChallengeRequired,
+        # erro de rede...) em AccountLoginFailed: a classificação vale pela causa
+        if isinstance(error, AccountLoginFailed) and error.__cause__ is not None:
+            error = error.__cause__
+        for rule in self.rules:
+            if rule.matches(error):
+                return rule
+        return DEFAULT_RULES[-1]
+
+    def backoff(self, attempt: int, rand: Callable[[], float] = random.random) -> float:
+        """
+        Calcula o atraso antes da próxima tentativa
+
+        Args:
+            attempt: Número da tentativa que acabou de falhar (a partir de 1)
+            rand: Gerador de números em [0, 1) (injetável nos testes)
+
+        Returns:
+            Segundos a aguardar
+        """
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** max(attempt - 1, 0))
+        return delay * (1 - self.jitter * rand())
+
+    def should_wait(self, rule: ErrorRule) -> bool:
+        """Indica se a próxima tentativa deve aguardar o backoff"""
+        return rule.action in (ErrorAction.RETRY, ErrorAction.ROTATE)
+
+    def exhausted_error(self, rule: ErrorRule, username: str, attempts: int, error: BaseException) -> InstagramAPIException:
+        """
+        Monta a exceção lançada quando as tentativas acabam
+
+        Args:
+            rule: Regra do último erro
+            username: Username do perfil alvo
+            attempts: Tentativas realizadas
+            error: Último erro
+
+        Returns:
+            Exceção da API
+        """
+        message = rule.final_message.format(username=username, attempts=attempts, error=error)
+        return rule.final_error(message, details={'attempts': attempts, 'last_error': type(error).__name__})
+
+
+# Ajustes por operação sobre a política padrão
+OPERATION_DEFAULTS: Dict[str, Dict] = {
+    "posts": {},
+    "stories": {},
+    "snapshot": {},
+    # Streaming e paginação já entregaram dados ao cliente: falhar rápido é melhor que esperar muito
+    "stream": {"max_delay": 4.0},
+    "page": {"max_delay": 4.0},
+}
+
+_FIELD_TYPES = {
+    "max_attempts": int,
+    "base_delay": float,
+    "max_delay": float,
+    "multiplier": float,
+    "jitter": float,
+}
+
+
+def parse_overrides(spec: str) -> Dict[str, Dict]:
+    """
+    Interpreta RETRY_OPERATION_OVERRIDES
+
+    Formato: "operação:campo=valor,campo=valor;operação:campo=valor"
+    (ex.: "stories:max_attempts=2;page:base_delay=0.2,max_delay=2")
+
+    Args:
+        spec: Texto da configuração
+
+    Returns:
+        Dicionário operação -> {campo: valor}
+
+    Raises:
+        ConfigurationError: Se o formato, a operação ou o campo forem inválidos
+    """
+    overrides: Dict[str, Dict] = {}
+    for chunk in filter(None, (part.strip() for part in spec.split(";"))):
+        operation, sep, assignments = chunk.partition(":")
+        operation = operation.strip()
+        if not sep or operation not in OPERATION_DEFAULTS:
+            raise ConfigurationError(f"RETRY_OPERATION_OVERRIDES inválido: '{chunk}'")
+
+        fields = overrides.setdefault(operation, {})
+        for assignment in filter(None, (a.strip() for a in assignments.split(","))):
+            name, sep, value = assignment.partition("=")
+            name = name.strip()
+            if not sep or name not in _FIELD_TYPES:
+                raise ConfigurationError(f"RETRY_OPERATION_OVERRIDES: campo inválido '{assignment}'")
+            try:
+                fields[name] = _FIELD_TYPES[name](value.strip())
+            except ValueError:
+                raise ConfigurationError(f"RETRY_OPERATION_OVERRIDES: valor inválido '{assignment}'")
+    return overrides
+
+
+def build_policies(overrides: Optional[str] = None) -> Dict[str, RetryPolicy]:
+    """
+    Monta as políticas de retry de cada operação a partir do Config
+
+    Args:
+        overrides: Ajustes por operação (usa Config.RETRY_OPERATION_OVERRIDES se não fornecido)
+
+    Returns:
+        Dicionário operação -> RetryPolicy
+    """
+    base = RetryPolicy(
+        max_attempts=Config.MAX_RETRIES_PER_REQUEST,
+        base_delay=Config.RETRY_BASE_DELAY_SECONDS,
+        max_delay=Config.RETRY_MAX_DELAY_SECONDS,
+        jitter=Config.RETRY_JITTER
+    )
+    parsed = parse_overrides(Config.RETRY_OPERATION_OVERRIDES if overrides is None else overrides)
+
+    policies = {}
+    for operation, defaults in OPERATION_DEFAULTS.items():
+        fields = {**defaults, **parsed.get(operation, {})}
+        if "max_delay" in defaults and "max_delay" not in parsed.get(operation, {}):
+            fields["max_delay"] = min(defaults["max_delay"], base.max_delay)
+        policies[operation] = replace(base, **fields)
+    return policies
+
@@ -0,0 +1,238 @@
+"""
+Armazenamento em memória das sessões do Instagram com persistência assíncrona
+"""
+from pathlib import Path
+from typing import Dict, Optional, Set
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+from app.config import Config
+from app.utils.logger import get_logger
+
+logger = get_logger("session_store")
+
+
+class SessionStore:
+    """
+    Mantém os settings de sessão (instagrapi) de cada conta em memória
+    As gravações em disco são feitas por uma thread em background (write-behind),
+    agrupando várias atualizações da mesma conta em uma única escrita atômica
+    """
+
+    def __init__(self, sessions_dir: Optional[Path] = None, flush_interval: Optional[float] = None):
+        """
+        Inicializa o store
+
+        Args:
+            sessions_dir: Diretório dos arquivos de sessão (usa Config se não fornecido)
+            flush_interval: Segundos para agrupar escritas antes de gravar (usa Config se não fornecido)
+        """
+        self.sessions_dir = Path(sessions_dir or Config.get_absolute_path(Config.SESSIONS_DIR_PATH))
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = Config.SESSION_FLUSH_INTERVAL_SECONDS if flush_interval is None else flush_interval
+
+        self._settings: Dict[str, Dict] = {}
+        self._missing: Set[str] = set()  # contas já procuradas em disco sem arquivo
+        self._dirty: Set[str] = set()
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+
+    def get_path(self, username: str) -> Path:
+        """
+        Retorna caminho do arquivo de sessão da conta
+
+        Args:
+            username: Username da conta
+
+        Returns:
+            Path do arquivo de sessão
+        """
+        return self.sessions_dir / f"{username}_session.json"
+
+    def load_all(self) -> int:
+        """
+        Carrega para memória todas as sessões existentes em disco (usado no startup)
+
+        Returns:
+            Número de sessões carregadas
+        """
+        loaded = 0
+        for path in self.sessions_dir.glob("*_session.json"):
+            username = path.name[:-len("_session.json")]
+            settings = self._read_file(path)
+            if settings is not None:
+                with self._condition:
+                    self._settings.setdefault(username, settings)
+                    self._missing.discard(username)
+                loaded += 1
+
+        logger.info(f"✓ {loaded} sessões carregadas em memória de {self.sessions_dir}")
+        return loaded
+
+    def get(self, username: str) -> Optional[Dict]:
+        """
+        Retorna uma cópia dos settings da conta
+        O disco só é consultado na primeira vez que uma conta não pré-carregada é pedida
+
+        Args:
+            username: Username da conta
+
+        Returns:
+            Settings da sessão ou None se não houver sessão salva
+        """
+        with self._condition:
+            if username in self._settings:
+                return copy.deepcopy(self._settings[username])
+            if username in self._missing:
+                return None
+
+        settings = self._read_file(self.get_path(username))
+
+        with self._condition:
+            if username in self._settings:  # gravada enquanto líamos
+                return copy.deepcopy(self._settings[username])
+            if settings is None:
+                self._missing.add(username)
+                return None
+            self._settings[username] = settings
+            return copy.deepcopy(settings)
+
+    def put(self, username: str, settings: Dict):
+        """
+        Atualiza os settings em memória e agenda a gravação em disco
+
+        Args:
+            username: Username da conta
+            settings: Settings retornados por Client.get_settings()
+        """
+        with self._condition:
+            self._settings[username] = copy.deepcopy(settings)
+            self._missing.discard(username)
+            self._dirty.add(username)
+            self._ensure_writer()
+            self._condition.notify_all()
+
+    def delete(self, username: str):
+        """
+        Remove a sessão da conta da memória e do disco
+
+        Args:
+            username: Username da conta
+        """
+        with self._condition:
+            self._settings.pop(username, None)
+            self._dirty.discard(username)
+            self._missing.add(username)
+
+        try:
+            self.get_path(username).unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Erro ao remover sessão de {username}: {e}")
+
+    def flush(self):
+        """Grava imediatamente todas as sessões pendentes"""
+        # Serializa os flushes para que um snapshot antigo nunca sobrescreva um mais novo
+        with self._write_lock:
+            with self._condition:
+                pending = {username: self._settings[username] for username in self._dirty if username in self._settings}
+                self._dirty.clear()
+
+            for username, settings in pending.items():
+                self._write_file(username, settings)
+
+    def close(self):
+        """Grava as sessões pendentes e encerra a thread de escrita (usado no shutdown)"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            writer = self._writer
+
+        if writer:
+            writer.join(timeout=10)
+        self.flush()
+        logger.info("SessionStore encerrado")
+
+    def _ensure_writer(self):
+        """Inicia a thread de escrita se ainda não estiver rodando (chamar com o lock)"""
+        if self._writer is None and not self._closed:
+            self._writer = threading.Thread(target=self._writer_loop, name="session-writer", daemon=True)
+            self._writer.start()
+
+    def _writer_loop(self):
+        """Aguarda sessões pendentes, agrupa as atualizações e grava em disco"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._dirty or self._closed)
+                if self._closed:
+                    return
+                # Janela de agrupamento: novas atualizações da mesma conta viram uma só escrita
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and time.monotonic() < deadline:
+                    self._condition.wait(timeout=deadline - time.monotonic())
+                if self._closed:
+                    return
+
+            self.flush()
+
+    def _read_file(self, path: Path) -> Optional[Dict]:
+        """Lê um arquivo de sessão (None se não existir ou estiver corrompido)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Erro ao ler sessão {path}: {e}")
+            return None
+
+    def _write_file(self, username: str, settings: Dict):
+        """Grava a sessão de forma atômica (arquivo temporário + rename)"""
+        path = self.get_path(username)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.sessions_dir, prefix=f".{username}_", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(settings, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            logger.debug(f"✓ Sessão gravada: {path}")
+        except Exception as e:
+            logger.warning(f"Erro ao salvar sessão de {username}: {e}")
+
+    def __len__(self) -> int:
+        """Retorna número de sessões em memória"""
+        return len(self._settings)
+
+    def __repr__(self) -> str:
+        return f"SessionStore(sessions={len(self._settings)}, pending={len(self._dirty)})"
+
+
+# Store global da aplicação (criado sob demanda)
+_session_store: Optional[SessionStore] = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """
+    Retorna o SessionStore global (cria na primeira chamada)
+
+    Returns:
+        SessionStore
+    """
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            _session_store = SessionStore()
+        return _session_store
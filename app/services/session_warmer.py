@@ -0,0 +1,159 @@
+"""
+Pré-aquecimento das sessões das contas no startup da aplicação
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+import threading
+
+from app.models.account import Account
+from app.services.account_manager import AccountManager
+from app.services.client_pool import ClientPool
+from app.config import Config
+from app.utils.logger import get_logger
+
+logger = get_logger("session_warmer")
+
+
+class SessionWarmer:
+    """
+    Faz login (carrega e valida sessões) das contas disponíveis em paralelo,
+    com número limitado de workers e intervalo entre logins para evitar
+    uma rajada de logins no Instagram
+    """
+
+    def __init__(
+        self,
+        account_manager: AccountManager,
+        client_pool: ClientPool,
+        max_workers: Optional[int] = None,
+        stagger_seconds: Optional[float] = None
+    ):
+        """
+        Inicializa o warmer
+
+        Args:
+            account_manager: Gerenciador de contas
+            client_pool: Pool onde os clientes aquecidos serão guardados
+            max_workers: Logins simultâneos (usa Config se não fornecido)
+            stagger_seconds: Intervalo entre o início de cada login (usa Config se não fornecido)
+        """
+        self.account_manager = account_manager
+        self.client_pool = client_pool
+        self.max_workers = max_workers or Config.PREWARM_MAX_WORKERS
+        self.stagger_seconds = Config.PREWARM_STAGGER_SECONDS if stagger_seconds is None else stagger_seconds
+
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Progresso
+        self._status = "idle"
+        self._total = 0
+        self._warm = 0
+        self._failed = 0
+        self._errors: Dict[str, str] = {}
+        self._started_at: Optional[datetime] = None
+        self._finished_at: Optional[datetime] = None
+
+    def start(self, accounts: Optional[List[Account]] = None):
+        """
+        Inicia o aquecimento em background (retorna imediatamente)
+
+        Args:
+            accounts: Contas a aquecer (padrão: todas as contas disponíveis)
+        """
+        accounts = accounts if accounts is not None else self.account_manager.get_available_accounts()
+
+        with self._condition:
+            self._status = "running"
+            self._total = len(accounts)
+            self._started_at = datetime.now()
+
+        logger.info(
+            f"🔥 Aquecendo sessões de {len(accounts)} contas "
+            f"(workers={self.max_workers}, intervalo={self.stagger_seconds}s)"
+        )
+
+        self._thread = threading.Thread(target=self._run, args=(accounts,), name="session-warmer", daemon=True)
+        self._thread.start()
+
+    def _run(self, accounts: List[Account]):
+        """Submete os logins ao executor respeitando o intervalo entre eles"""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="warmup") as executor:
+            for index, account in enumerate(accounts):
+                if index and self._stop_event.wait(self.stagger_seconds):
+                    break
+                executor.submit(self._warm_account, account)
+
+        with self._condition:
+            self._status = "stopped" if self._stop_event.is_set() else "done"
+            self._finished_at = datetime.now()
+            self._condition.notify_all()
+
+        logger.info(f"🔥 Aquecimento finalizado: {self._warm}/{self._total} contas prontas, {self._failed} falhas")
+
+    def _warm_account(self, account: Account):
+        """Faz login de uma conta e guarda o cliente no pool"""
+        if self._stop_event.is_set():
+            return
+
+        try:
+            self.client_pool.warm(account)
+            with self._condition:
+                self._warm += 1
+                self._condition.notify_all()
+            logger.info(f"✓ Sessão aquecida: {account.username}")
+
+        except Exception as e:
+            self.account_manager.mark_account_error(account.username, f"Warmup failed: {e}")
+            with self._condition:
+                self._failed += 1
+                self._errors[account.username] = str(e)
+                self._condition.notify_all()
+
+    def wait_until_ready(self, min_ready: int, timeout: Optional[float] = None) -> bool:
+        """
+        Bloqueia até que min_ready contas estejam aquecidas, o aquecimento termine
+        ou o timeout expire
+
+        Args:
+            min_ready: Mínimo de contas aquecidas
+            timeout: Tempo máximo de espera em segundos (None = sem limite)
+
+        Returns:
+            True se o mínimo de contas foi atingido
+        """
+        with self._condition:
+            target = min(min_ready, self._total)
+            self._condition.wait_for(
+                lambda: self._warm >= target or self._status != "running",
+                timeout=timeout
+            )
+            return self._warm >= target
+
+    def stop(self):
+        """Interrompe logins pendentes (usado no shutdown)"""
+        self._stop_event.set()
+
+    def get_progress(self) -> Dict:
+        """
+        Retorna o progresso do aquecimento
+
+        Returns:
+            Dicionário com progresso
+        """
+        with self._condition:
+            return {
+                'status': self._status,
+                'total': self._total,
+                'warm': self._warm,
+                'failed': self._failed,
+                'pending': self._total - self._warm - self._failed,
+                'errors': dict(self._errors),
+                'started_at': self._started_at.isoformat() if self._started_at else None,
+                'finished_at': self._finished_at.isoformat() if self._finished_at else None
+            }
+
+    def __repr__(self) -> str:
+        return f"SessionWarmer(status={self._status}, warm={self._warm}/{self._total})"
@@ -0,0 +1,173 @@
+"""
+Cache de stories com expiração individual por story (expiring_at)
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import heapq
+import itertools
+import threading
+import time
+
+from app.models.requests import Story
+from app.utils.logger import get_logger
+
+logger = get_logger("stories_cache")
+
+
+@dataclass
+class _StoriesEntry:
+    """Stories de um perfil (story_id -> Story, na ordem retornada pelo Instagram)"""
+    stories: Dict[str, Story]
+    stored_at: float
+    fresh_until: float
+    generation: int = field(default=0)
+
+
+class StoriesCache:
+    """
+    Cache de stories por username
+
+    Cada story sai do cache exatamente no seu expiring_at e o perfil inteiro sai ao fim
+    da janela de frescor (após a qual é preciso consultar o Instagram para descobrir
+    stories novos). As expirações ficam em um heap de prazos: cada acesso consome apenas
+    os prazos já vencidos, sem varrer as entradas
+    """
+
+    def __init__(self, fresh_seconds: float):
+        """
+        Inicializa o cache
+
+        Args:
+            fresh_seconds: Janela em que a lista de stories de um perfil é reutilizada (0 = desabilitado)
+        """
+        self.fresh_seconds = fresh_seconds
+
+        self._entries: Dict[str, _StoriesEntry] = {}
+        # (prazo, seq, username, generation, story_id ou None para o perfil inteiro)
+        self._deadlines: List[Tuple[float, int, str, int, Optional[str]]] = []
+        self._seq = itertools.count()
+        self._generation = itertools.count(1)
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._expired_stories = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Cache habilitado (janela de frescor > 0)"""
+        return self.fresh_seconds > 0
+
+    @staticmethod
+    def _expiry_timestamp(story: Story) -> float:
+        """Converte o expiring_at (ISO 8601) do story em timestamp"""
+        return datetime.fromisoformat(story.expiring_at).timestamp()
+
+    def _push(self, deadline: float, username: str, generation: int, story_id: Optional[str]):
+        heapq.heappush(self._deadlines, (deadline, next(self._seq), username, generation, story_id))
+
+    def _expire(self, now: float):
+        """Remove stories e perfis cujo prazo já passou (chamar com o lock)"""
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, username, generation, story_id = heapq.heappop(self._deadlines)
+            entry = self._entries.get(username)
+            if entry is None or entry.generation != generation:
+                # Prazo de uma entrada que já foi substituída ou removida
+                continue
+
+            if story_id is None:
+                del self._entries[username]
+            elif entry.stories.pop(story_id, None) is not None:
+                self._expired_stories += 1
+
+    def get(self, username: str) -> Optional[List[Story]]:
+        """
+        Retorna os stories ainda não expirados de um perfil
+
+        Args:
+            username: Username do perfil
+
+        Returns:
+            Lista de Stories, ou None se o perfil não estiver no cache (ou fora da janela de frescor)
+        """
+        key = username.lower()
+        with self._lock:
+            self._expire(time.time())
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            return list(entry.stories.values())
+
+    def set(self, username: str, stories: List[Story]):
+        """
+        Armazena os stories de um perfil, agendando a expiração de cada um
+
+        Args:
+            username: Username do perfil
+            stories: Stories retornados pelo Instagram
+        """
+        if not self.enabled:
+            return
+
+        key = username.lower()
+        now = time.time()
+        generation = next(self._generation)
+        entry = _StoriesEntry(stories={}, stored_at=now, fresh_until=now + self.fresh_seconds, generation=generation)
+
+        with self._lock:
+            for story in stories:
+                try:
+                    expires_at = self._expiry_timestamp(story)
+                except ValueError:
+                    logger.warning(f"expiring_at inválido no story {story.id}: {story.expiring_at}")
+                    continue
+
+                if expires_at <= now:
+                    continue
+                entry.stories[story.id] = story
+                if expires_at < entry.fresh_until:
+                    self._push(expires_at, key, generation, story.id)
+
+            self._entries[key] = entry
+            self._push(entry.fresh_until, key, generation, None)
+            self._expire(now)
+
+    def invalidate(self, username: str):
+        """
+        Remove um perfil do cache (os prazos pendentes são descartados ao vencer)
+
+        Args:
+            username: Username do perfil
+        """
+        with self._lock:
+            self._entries.pop(username.lower(), None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_status(self) -> Dict:
+        """
+        Retorna estatísticas do cache
+
+        Returns:
+            Dicionário com estatísticas
+        """
+        with self._lock:
+            self._expire(time.time())
+            return {
+                'enabled': self.enabled,
+                'profiles': len(self._entries),
+                'stories': sum(len(entry.stories) for entry in self._entries.values()),
+                'pending_deadlines': len(self._deadlines),
+                'fresh_seconds': self.fresh_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'expired_stories': self._expired_stories
+            }
+
+    def __repr__(self) -> str:
+        return f"StoriesCache(profiles={len(self._entries)}, fresh={self.fresh_seconds}s)"
@@ -0,0 +1,211 @@
+"""
+Cache persistente de username -> user_id (pk) do Instagram
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import sqlite3
+import threading
+import time
+
+from app.config import Config
+from app.utils.logger import get_logger
+
+logger = get_logger("user_id_cache")
+
+
+class UserIdCache:
+    """
+    Cache de username -> user_id em dois níveis:
+    LRU em memória na frente de um SQLite em disco que sobrevive a restarts
+
+    Perfis inexistentes (UserNotFound) também são cacheados, por um tempo limitado
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        max_entries: Optional[int] = None,
+        negative_ttl_minutes: Optional[int] = None
+    ):
+        """
+        Inicializa o cache
+
+        Args:
+            db_path: Caminho do SQLite (usa Config se não fornecido)
+            max_entries: Entradas mantidas em memória (usa Config se não fornecido)
+            negative_ttl_minutes: Validade do cache de perfis inexistentes (usa Config se não fornecido)
+        """
+        self.db_path = Path(db_path or Config.get_absolute_path(Config.USER_ID_CACHE_PATH))
+        self.max_entries = max_entries or Config.USER_ID_CACHE_MAX_ENTRIES
+        self.negative_ttl = 60 * (
+            Config.USER_ID_NEGATIVE_TTL_MINUTES if negative_ttl_minutes is None else negative_ttl_minutes
+        )
+
+        # username -> (user_id ou None se inexistente, expires_at ou None se não expira)
+        self._memory: "OrderedDict[str, Tuple[Optional[str], Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS user_ids ("
+            "username TEXT PRIMARY KEY, user_id TEXT, expires_at REAL, updated_at REAL)"
+        )
+        self._db.commit()
+
+        logger.info(f"UserIdCache inicializado: {self.db_path}")
+
+    def _lookup(self, username: str) -> Optional[Tuple[Optional[str], Optional[float]]]:
+        """Busca a entrada (memória, depois disco); descarta entradas expiradas"""
+        username = username.lower()
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(username)
+            if entry is None:
+                row = self._db.execute(
+                    "SELECT user_id, expires_at FROM user_ids WHERE username = ?", (username,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._remember(username, entry)
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            if entry[1] is not None and entry[1] <= now:
+                self._forget(username)
+                self._misses += 1
+                return None
+
+            self._memory.move_to_end(username)
+            self._hits += 1
+            return entry
+
+    def get(self, username: str) -> Optional[int]:
+        """
+        Retorna o user_id cacheado
+
+        Args:
+            username: Username do perfil
+
+        Returns:
+            user_id ou None se não estiver no cache (ou se o perfil for inexistente)
+        """
+        entry = self._lookup(username)
+        if entry is None or entry[0] is None:
+            return None
+        return int(entry[0])
+
+    def is_known_missing(self, username: str) -> bool:
+        """
+        Verifica se o perfil foi recentemente identificado como inexistente
+
+        Args:
+            username: Username do perfil
+
+        Returns:
+            True se houver cache negativo válido
+        """
+        return self.missing_until(username) is not None
+
+    def missing_until(self, username: str) -> Optional[float]:
+        """
+        Retorna até quando o perfil fica registrado como inexistente
+
+        Args:
+            username: Username do perfil
+
+        Returns:
+            Timestamp de expiração do cache negativo, ou None se não houver
+        """
+        entry = self._lookup(username)
+        if entry is None or entry[0] is not None:
+            return None
+        return entry[1]
+
+    def set(self, username: str, user_id):
+        """
+        Armazena o user_id de um perfil (sem expiração)
+
+        Args:
+            username: Username do perfil
+            user_id: pk do perfil
+        """
+        self._store(username.lower(), str(user_id), None)
+
+    def set_not_found(self, username: str):
+        """
+        Registra que o perfil não existe (expira após o TTL negativo)
+
+        Args:
+            username: Username do perfil
+        """
+        if self.negative_ttl > 0:
+            self._store(username.lower(), None, time.time() + self.negative_ttl)
+
+    def invalidate(self, username: str):
+        """
+        Remove o perfil do cache
+
+        Args:
+            username: Username do perfil
+        """
+        with self._lock:
+            self._forget(username.lower())
+
+    def _store(self, username: str, user_id: Optional[str], expires_at: Optional[float]):
+        """Grava a entrada em memória e em disco"""
+        with self._lock:
+            self._remember(username, (user_id, expires_at))
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO user_ids (username, user_id, expires_at, updated_at) VALUES (?, ?, ?, ?)",
+                    (username, user_id, expires_at, time.time())
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao gravar user_id de {username} em disco: {e}")
+
+    def _remember(self, username: str, entry: Tuple[Optional[str], Optional[float]]):
+        """Guarda a entrada no LRU em memória (chamar com o lock)"""
+        self._memory[username] = entry
+        self._memory.move_to_end(username)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _forget(self, username: str):
+        """Remove a entrada da memória e do disco (chamar com o lock)"""
+        self._memory.pop(username, None)
+        try:
+            self._db.execute("DELETE FROM user_ids WHERE username = ?", (username,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao remover user_id de {username} do disco: {e}")
+
+    def close(self):
+        """Fecha a conexão com o SQLite"""
+        with self._lock:
+            self._db.close()
+
+    def get_status(self) -> Dict:
+        """
+        Retorna estatísticas do cache
+
+        Returns:
+            Dicionário com estatísticas
+        """
+        with self._lock:
+            return {
+                'memory_entries': len(self._memory),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+    def __repr__(self) -> str:
+        return f"UserIdCache(memory={len(self._memory)}, path={self.db_path})"
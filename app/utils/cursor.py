@@ -0,0 +1,70 @@
+"""
+Cursores opacos de paginação (assinados com HMAC para não serem adulterados)
+"""
+from typing import Any, Dict
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+
+from app.config import Config
+from app.utils.exceptions import InvalidRequestError
+
+# Sem CURSOR_SECRET/API_KEY os cursores valem apenas enquanto o processo estiver no ar
+_FALLBACK_SECRET = secrets.token_bytes(32)
+
+
+def _secret() -> bytes:
+    """Chave usada na assinatura dos cursores"""
+    secret = Config.CURSOR_SECRET or Config.API_KEY
+    return secret.encode() if secret else _FALLBACK_SECRET
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """
+    Gera um cursor opaco a partir de um payload JSON
+
+    Args:
+        payload: Dados do cursor (serializáveis em JSON)
+
+    Returns:
+        Cursor no formato <payload base64url>.<assinatura base64url>
+    """
+    body = _b64encode(json.dumps(payload, separators=(",", ":"), sort_keys=True).encode())
+    signature = hmac.new(_secret(), body.encode(), hashlib.sha256).digest()
+    return f"{body}.{_b64encode(signature)}"
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Valida e decodifica um cursor gerado por encode_cursor
+
+    Args:
+        cursor: Cursor recebido do cliente
+
+    Returns:
+        Payload do cursor
+
+    Raises:
+        InvalidRequestError: Se o cursor for malformado ou a assinatura não conferir
+    """
+    try:
+        body, signature = cursor.split(".", 1)
+        expected = hmac.new(_secret(), body.encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            raise ValueError("assinatura inválida")
+        payload = json.loads(_b64decode(body))
+        if not isinstance(payload, dict):
+            raise ValueError("payload inválido")
+        return payload
+    except (ValueError, TypeError) as e:
+        raise InvalidRequestError("Cursor de paginação inválido", details={'error': str(e)})
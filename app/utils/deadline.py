@@ -0,0 +1,175 @@
+"""
+Prazo (deadline) de uma requisição, propagado até as tentativas e chamadas HTTP ao Instagram
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+import time
+
+from app.config import Config
+from app.utils.exceptions import DeadlineExceeded
+
+
+class Deadline:
+    """
+    Instante limite (relógio monotônico) para concluir uma requisição
+    """
+
+    def __init__(self, timeout: float):
+        """
+        Inicializa o prazo a partir de agora
+
+        Args:
+            timeout: Segundos disponíveis
+        """
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        """Segundos restantes (0 se o prazo já passou)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Indica se o prazo já passou"""
+        return time.monotonic() >= self.expires_at
+
+    def exceeded(self, stage: str) -> DeadlineExceeded:
+        """
+        Monta o erro de prazo excedido
+
+        Args:
+            stage: Etapa em que o prazo acabou (para a mensagem)
+
+        Returns:
+            DeadlineExceeded
+        """
+        return DeadlineExceeded(
+            f"Tempo limite de {self.timeout:g}s excedido ({stage})",
+            details={'timeout': self.timeout, 'stage': stage}
+        )
+
+    def check(self, stage: str):
+        """
+        Falha se o prazo já passou
+
+        Args:
+            stage: Etapa atual (para a mensagem)
+
+        Raises:
+            DeadlineExceeded: Se o prazo acabou
+        """
+        if self.expired:
+            raise self.exceeded(stage)
+
+    def __repr__(self) -> str:
+        return f"Deadline(timeout={self.timeout}s, remaining={self.remaining():.1f}s)"
+
+
+# Prazo da requisição em andamento; copiado para as threads de extração junto com o contexto
+_current: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Retorna o prazo da requisição atual (None = sem prazo)"""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """
+    Define o prazo do contexto atual enquanto o bloco executa
+
+    Args:
+        deadline: Prazo (None remove o prazo herdado)
+
+    Yields:
+        O prazo definido
+    """
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def request_deadline(timeout: Optional[float] = None) -> Optional[Deadline]:
+    """
+    Cria o prazo de uma requisição da API
+
+    Args:
+        timeout: Segundos informados na requisição (usa REQUEST_TIMEOUT_SECONDS se não fornecido)
+
+    Returns:
+        Deadline ou None se o prazo estiver desabilitado (REQUEST_TIMEOUT_SECONDS = 0)
+    """
+    timeout = timeout or Config.REQUEST_TIMEOUT_SECONDS
+    return Deadline(timeout) if timeout > 0 else None
+
+
+def http_timeout(default: float) -> float:
+    """
+    Timeout de uma chamada HTTP ao Instagram, limitado ao prazo restante da requisição
+
+    Args:
+        default: Timeout padrão da chamada (INSTAGRAM_HTTP_TIMEOUT_SECONDS)
+
+    Returns:
+        Segundos
+
+    Raises:
+        DeadlineExceeded: Se o prazo já acabou (a chamada nem é feita)
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    deadline.check("chamada ao Instagram")
+    return min(default, deadline.remaining())
+
+
+def bounded_pauses(delay_range: List[float], request_timeout: float) -> Tuple[List[float], float]:
+    """
+    Pausas do instagrapi antes de cada chamada, limitadas ao prazo restante
+    (a pausa aleatória de delay_range e a espera fixa de request_timeout)
+    Juntas usam no máximo metade do prazo restante, deixando a outra metade para a chamada
+
+    Args:
+        delay_range: Intervalo configurado [mínimo, máximo] em segundos
+        request_timeout: Espera fixa configurada, em segundos
+
+    Returns:
+        Tupla (delay_range, request_timeout) a usar nesta chamada
+
+    Raises:
+        DeadlineExceeded: Se o prazo já acabou (a chamada nem é feita)
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return delay_range, request_timeout
+    deadline.check("pausa antes da chamada ao Instagram")
+    limit = deadline.remaining() / 4
+    return [min(delay_range[0], limit), min(delay_range[1], limit)], min(request_timeout, limit)
+
+
+def bounded_retries(retries_count: int, retries_timeout: float) -> int:
+    """
+    Tentativas do public_request do instagrapi que cabem no prazo restante
+    (entre tentativas ele espera retries_timeout segundos)
+
+    Args:
+        retries_count: Tentativas pedidas
+        retries_timeout: Espera entre tentativas, em segundos
+
+    Returns:
+        Tentativas a fazer (ao menos 1)
+
+    Raises:
+        DeadlineExceeded: Se o prazo já acabou (a chamada nem é feita)
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return retries_count
+    deadline.check("chamada ao Instagram")
+    if retries_timeout <= 0:
+        return retries_count
+    return max(1, min(retries_count, 1 + int(deadline.remaining() // retries_timeout)))
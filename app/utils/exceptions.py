@@ -83,4 +83,16 @@ class InvalidRequestError(InstagramAPIException):
 
 class MaxRetriesExceeded(InstagramAPIException):
     """Número máximo de tentativas excedido"""
-    pass
\ No newline at end of file
+    pass
+
+
+class DeadlineExceeded(InstagramAPIException):
+    """Prazo da requisição (timeout) esgotado antes da extração terminar"""
+    pass
+
+
+class TooManyRequests(InstagramAPIException):
+    """Servidor no limite de extrações simultâneas e com a fila de espera cheia"""
+    def __init__(self, message: str, details: dict = None, retry_after: int = 1):
+        self.retry_after = retry_after
+        super().__init__(message, details)
@@ -0,0 +1,160 @@
+"""
+Single-flight: execuções concorrentes com a mesma chave compartilham um único resultado
+"""
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+import asyncio
+import threading
+
+from app.utils.deadline import current_deadline
+
+
+class _Call:
+    """Execução em andamento para uma chave"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Garante que apenas uma execução por chave rode ao mesmo tempo
+    Chamadas concorrentes com a mesma chave aguardam a execução em andamento
+    e recebem o mesmo resultado (ou a mesma exceção)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Executa fn() ou aguarda a execução já em andamento para a chave
+
+        Args:
+            key: Chave que identifica a operação
+            fn: Função a executar
+
+        Returns:
+            Tupla (resultado, shared) onde shared=True indica que o resultado
+            foi produzido pela execução de outra chamada
+
+        Raises:
+            A exceção lançada por fn() (repassada a todos que aguardavam)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Retorna se há execução em andamento para a chave"""
+        with self._lock:
+            return key in self._calls
+
+    def __len__(self) -> int:
+        """Retorna número de execuções em andamento"""
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    Versão assíncrona do SingleFlight, para uso a partir do event loop
+
+    A execução roda em uma task própria: se quem a iniciou for cancelado
+    (ex.: cliente desconectou), os demais que aguardam continuam recebendo o resultado
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Executa await fn() ou aguarda a execução já em andamento para a chave
+
+        Args:
+            key: Chave que identifica a operação
+            fn: Função que retorna a coroutine a executar
+
+        Returns:
+            Tupla (resultado, shared) onde shared=True indica que o resultado
+            foi produzido pela execução de outra chamada
+
+        Raises:
+            DeadlineExceeded: Se o prazo de quem aguarda a execução de outra chamada acabar antes
+                (a execução continua para os demais)
+            A exceção lançada por fn() (repassada a todos que aguardavam)
+        """
+        task = self._tasks.get(key)
+        shared = task is not None
+        if shared:
+            self._shared += 1
+        else:
+            task = asyncio.create_task(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+
+        # A execução segue o prazo de quem a iniciou; quem só aguarda respeita o próprio prazo
+        deadline = current_deadline()
+        if not shared or deadline is None:
+            return await asyncio.shield(task), shared
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), deadline.remaining()), shared
+        except asyncio.TimeoutError:
+            raise deadline.exceeded("aguardando extração em andamento") from None
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        """Remove a execução concluída e consome a exceção (evita aviso se ninguém mais aguardava)"""
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()
+
+    def keys(self) -> List[Hashable]:
+        """Retorna as chaves com execução em andamento"""
+        return list(self._tasks)
+
+    def cancel_all(self):
+        """Cancela todas as execuções em andamento"""
+        for task in list(self._tasks.values()):
+            task.cancel()
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Retorna se há execução em andamento para a chave"""
+        return key in self._tasks
+
+    @property
+    def shared_count(self) -> int:
+        """Número de chamadas que reaproveitaram uma execução em andamento"""
+        return self._shared
+
+    def __len__(self) -> int:
+        """Retorna número de execuções em andamento"""
+        return len(self._tasks)
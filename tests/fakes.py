@@ -0,0 +1,201 @@
+"""
+Fakes compartilhados pelos scripts de teste (contas, pool de clientes, cache de user_id e mídias)
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Optional
+import threading
+import time
+
+from app.models.account import Account
+from app.services.client_pool import ClientPool
+
+
+def make_account(username: str, status: str = "success", thread_id: int = 1) -> Account:
+    return Account(
+        email=f"{username}@example.com",
+        username=username,
+        password="senha123",
+        status=status,
+        created_at="2025-10-15 10:00:00",
+        fingerprint="{}",
+        proxy_used="",
+        thread_id=thread_id
+    )
+
+
+def make_media(pk: int, hours_ago: Optional[int] = None):
+    """Media do instagrapi (foto) com os campos lidos pela conversão"""
+    return SimpleNamespace(
+        pk=pk, code=f"C{pk}", caption_text="", like_count=0, comment_count=0, media_type=1,
+        thumbnail_url=f"https://instagram.com/{pk}.jpg", video_url=None, resources=[],
+        taken_at=datetime(2025, 10, 15) - timedelta(hours=pk if hours_ago is None else hours_ago)
+    )
+
+
+def make_v1_item(pk: int, hours_ago: Optional[int] = None) -> dict:
+    """Item bruto do feed v1 (foto), equivalente a make_media, para fakes de private_request"""
+    taken_at = datetime(2025, 10, 15, tzinfo=timezone.utc) - timedelta(hours=pk if hours_ago is None else hours_ago)
+    return {
+        "pk": pk, "id": f"{pk}_42", "code": f"C{pk}", "media_type": 1, "taken_at": int(taken_at.timestamp()),
+        "user": {"pk": "42", "username": "perfil"}, "caption": None, "like_count": 0, "comment_count": 0,
+        "image_versions2": {"candidates": [{"url": f"https://instagram.com/{pk}.jpg", "width": 1080, "height": 1080}]}
+    }
+
+
+def make_story(pk: int):
+    """Story do instagrapi (foto) publicado há uma hora"""
+    return SimpleNamespace(
+        pk=pk, media_type=1, thumbnail_url=f"https://instagram.com/s{pk}.jpg", video_url=None,
+        taken_at=datetime.now() - timedelta(hours=1)
+    )
+
+
+class FakeAccountManager:
+    """
+    Contas em memória: com `names`, rotaciona entre elas respeitando preferred/exclude;
+    sem `names`, entrega uma conta nova (conta_0, conta_1...) a cada pedido
+    """
+
+    def __init__(self, names=None):
+        self.names = list(names) if names else None
+        self.accounts = [SimpleNamespace(username=name, status='success') for name in self.names or ["conta_0"]]
+        self.used = []
+        self.frozen = []
+        self.errors = {}
+        self.invalidated = []
+        self.index = 0
+        self._lock = threading.Lock()
+
+    def get_next_account(self, preferred=None, exclude=()):
+        with self._lock:
+            if preferred:
+                name = preferred
+            elif self.names is None:
+                name = f"conta_{len(self.used)}"
+            else:
+                for _ in self.names:
+                    name = self.names[self.index % len(self.names)]
+                    self.index += 1
+                    if name not in exclude:
+                        break
+                else:
+                    raise AssertionError("sem contas")
+            self.used.append(name)
+        return SimpleNamespace(username=name)
+
+    def get_available_accounts(self):
+        return self.accounts
+
+    def get_earliest_unfreeze(self):
+        return None
+
+    def mark_account_used(self, username):
+        pass
+
+    def mark_account_error(self, username, error):
+        self.errors[username] = error
+
+    def freeze_account(self, username, duration_minutes, reason):
+        self.frozen.append((username, duration_minutes))
+
+    def invalidate_session(self, username):
+        self.invalidated.append(username)
+
+
+class FakePool:
+    """
+    Entrega o mesmo cliente (api) para qualquer conta e registra as contas usadas;
+    com `idle_api`, idle_client() entrega um segundo cliente ocioso sobre essa api
+    """
+
+    def __init__(self, api=None, idle_api=None):
+        self.api = api
+        self.idle_api = idle_api
+        self.accounts_used = []
+
+    @contextmanager
+    def client(self, account):
+        self.accounts_used.append(account.username)
+        yield SimpleNamespace(client=self.api, account=account)
+
+    @contextmanager
+    def idle_client(self, account):
+        yield SimpleNamespace(client=self.idle_api, account=account) if self.idle_api is not None else None
+
+    def invalidate(self, username):
+        pass
+
+
+class FakeUserIdCache:
+    """Cache de user_id em memória; `user_id` é devolvido para usernames desconhecidos"""
+
+    def __init__(self, user_id=None):
+        self.user_id = user_id
+        self.ids = {}
+        self.missing = []
+
+    negative_ttl = 3600
+
+    def is_known_missing(self, username):
+        return username in self.missing
+
+    def missing_until(self, username):
+        return time.time() + self.negative_ttl if username in self.missing else None
+
+    def get(self, username):
+        return self.ids.get(username, self.user_id)
+
+    def set(self, username, user_id):
+        self.ids[username] = user_id
+
+    def set_not_found(self, username):
+        self.missing.append(username)
+
+    def invalidate(self, username):
+        self.ids.pop(username, None)
+        self.missing = [name for name in self.missing if name != username]
+
+
+class FakeClient:
+    """Substitui o InstagramClient para não fazer login real"""
+
+    def __init__(self, account: Account, pool: "CountingClientPool"):
+        self.account = account
+        self.pool = pool
+        self._is_logged_in = False
+        self.session = None
+
+    def login(self):
+        time.sleep(self.pool.login_delay)
+        with self.pool.lock:
+            self.pool.logins += 1
+        if self.pool.login_error:
+            raise self.pool.login_error
+        self.session = f"sessao-{self.account.username}"
+        self._is_logged_in = True
+
+    def adopt_session(self, other: "FakeClient"):
+        self.session = other.session
+        self._is_logged_in = True
+
+    def is_logged_in(self) -> bool:
+        return self._is_logged_in
+
+    def logout(self):
+        self._is_logged_in = False
+
+
+class CountingClientPool(ClientPool):
+    """ClientPool que cria FakeClients e conta os logins"""
+
+    def __init__(self, max_size: int, login_delay: float = 0.0):
+        super().__init__(max_size=max_size)
+        self.logins = 0
+        self.login_delay = login_delay
+        self.login_error = None
+        self.lock = threading.Lock()
+
+    def _new_client(self, account: Account) -> FakeClient:
+        return FakeClient(account, self)
@@ -68,6 +68,15 @@ def test_account():
     print(f"  Error count: {account.error_count}")
     print(f"  Last error: {account.last_error}")
     
+    # Teste 7b: Cache de verificação de sessão
+    assert not account.is_session_verified(ttl_minutes=30)
+    account.mark_session_verified()
+    assert account.is_session_verified(ttl_minutes=30)
+    assert not account.is_session_verified(ttl_minutes=0)
+    account.invalidate_session()
+    assert not account.is_session_verified(ttl_minutes=30)
+    print(f"\n✓ Verificação de sessão respeita TTL e invalidação")
+
     # Teste 8: Serializar para dict
     account_dict = account.to_dict()
     print(f"\n✓ Conta serializada para dict:")
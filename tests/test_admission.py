@@ -0,0 +1,96 @@
+"""
+Script para testar o AdmissionController
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from app.services.admission import AdmissionController
+from app.utils.exceptions import TooManyRequests
+
+
+class FakeAccountManager:
+    """Pool sem contas disponíveis, com descongelamento em 5 minutos"""
+
+    def get_available_accounts(self):
+        return []
+
+    def get_earliest_unfreeze(self):
+        return datetime.now() + timedelta(minutes=5)
+
+
+def test_admission():
+    print("="*50)
+    print("Testando AdmissionController")
+    print("="*50)
+
+    async def scenario():
+        controller = AdmissionController(max_concurrent=2, max_queue=1, queue_timeout=5)
+        release = asyncio.Event()
+        order = []
+
+        async def job(name):
+            async with controller.admit():
+                order.append(name)
+                await release.wait()
+
+        # ========== TESTE 1: Limite de concorrência e fila ==========
+        print("\n[TESTE 1] 2 em execução, 1 na fila, o 4º é rejeitado")
+        tasks = [asyncio.create_task(job(f"job{i}")) for i in range(3)]
+        await asyncio.sleep(0.05)
+        status = controller.get_status()
+        assert status['active'] == 2 and status['queued'] == 1, status
+        assert order == ["job0", "job1"]
+
+        try:
+            async with controller.admit():
+                raise AssertionError("deveria ter sido rejeitado")
+        except TooManyRequests as e:
+            assert e.retry_after >= 1
+            assert e.details['queued'] == 1
+            print(f"✓ Rejeitado com Retry-After={e.retry_after}s")
+
+        # ========== TESTE 2: Vaga é transferida para a fila ==========
+        print("\n[TESTE 2] Ao liberar, o próximo da fila executa")
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["job0", "job1", "job2"]
+        status = controller.get_status()
+        assert status['active'] == 0 and status['queued'] == 0
+        assert status['admitted'] == 3 and status['rejected'] == 1
+        print(f"✓ Status final: {status}")
+
+        # ========== TESTE 3: Timeout na fila ==========
+        print("\n[TESTE 3] Espera na fila além do timeout gera 429")
+        controller = AdmissionController(max_concurrent=1, max_queue=5, queue_timeout=0.1)
+        blocker = asyncio.Event()
+
+        async def hold():
+            async with controller.admit():
+                await blocker.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        try:
+            async with controller.admit():
+                raise AssertionError("deveria ter expirado")
+        except TooManyRequests:
+            pass
+        assert controller.get_status()['queued'] == 0
+        blocker.set()
+        await holder
+        assert controller.get_status()['active'] == 0
+        print("✓ Timeout da fila rejeitado e waiter removido")
+
+        # ========== TESTE 4: Retry-After considera contas congeladas ==========
+        print("\n[TESTE 4] Retry-After usa o frozen_until mais próximo")
+        controller = AdmissionController(FakeAccountManager(), max_concurrent=1, max_queue=0)
+        retry_after = controller.retry_after()
+        assert 290 <= retry_after <= 300, retry_after
+        print(f"✓ Retry-After={retry_after}s (≈5 minutos)")
+
+    asyncio.run(scenario())
+    print("\n✅ Todos os testes do AdmissionController passaram!")
+
+
+if __name__ == "__main__":
+    test_admission()
@@ -0,0 +1,97 @@
+"""
+Script para testar as respostas HTTP de erro da API (sem servidor e sem rede)
+"""
+import asyncio
+import json
+
+import app.main as main
+from app.config import Config
+from app.utils.exceptions import TooManyRequests
+
+
+class BusyExtractionService:
+    """Serviço que sempre responde como servidor no limite de extrações"""
+
+    async def extract_posts(self, username, quantity, user_id=None, cache_mode="default"):
+        raise TooManyRequests(
+            "Servidor ocupado, tente novamente em instantes",
+            {"queue": 1},
+            retry_after=7,
+        )
+
+
+async def asgi_post(path: str, payload: dict, headers: dict) -> dict:
+    """Envia um POST direto para o app ASGI e devolve status, headers e corpo"""
+    body = json.dumps(payload).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")]
+        + [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    received = False
+    response = {"status": None, "headers": {}, "body": b""}
+
+    async def receive():
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode().lower(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await main.app(scope, receive, send)
+    return response
+
+
+def test_too_many_requests_response():
+    print("="*50)
+    print("Testando resposta HTTP 429 da API")
+    print("="*50)
+
+    original_service = main.extraction_service
+    original_key = Config.API_KEY
+    main.extraction_service = BusyExtractionService()
+    Config.API_KEY = "chave-de-teste"
+    try:
+        # Teste 1: TooManyRequests vira 429 com Retry-After e corpo ErrorResponse
+        print("\n[TESTE 1] POST /posts com servidor ocupado")
+        response = asyncio.run(asgi_post(
+            "/posts",
+            {"username": "perfil", "quantity": 5},
+            {"Authorization": "chave-de-teste"},
+        ))
+        body = json.loads(response["body"])
+        assert response["status"] == 429, response
+        assert response["headers"]["retry-after"] == "7", response["headers"]
+        assert body["success"] is False
+        assert body["error"] == "TooManyRequests", body
+        assert body["message"] == "Servidor ocupado, tente novamente em instantes"
+        assert body["details"] == {"queue": 1}
+        print(f"✓ Status {response['status']}, Retry-After {response['headers']['retry-after']}")
+    finally:
+        main.extraction_service = original_service
+        Config.API_KEY = original_key
+
+    print("\n" + "="*50)
+    print("✓ Todos os testes passaram!")
+    print("="*50)
+
+
+if __name__ == "__main__":
+    test_too_many_requests_response()
@@ -0,0 +1,178 @@
+"""
+Script para testar o roteamento entre os backends v1 e gql do instagrapi
+"""
+from types import SimpleNamespace
+import time
+
+from instagrapi.exceptions import ClientConnectionError, ClientLoginRequired, PleaseWaitFewMinutes, UserNotFound
+
+from app.services.backend_router import Backend, BackendRouter
+from app.services.extractor import InstagramExtractor
+from app.utils.exceptions import DeadlineExceeded, ProfileNotFound
+from tests.fakes import FakeUserIdCache, make_v1_item
+
+
+class FakeInstagramAPI:
+    """Registra o backend de cada chamada; falhas e atrasos configuráveis por backend"""
+
+    def __init__(self):
+        self.calls = []
+        self.errors = {}
+        self.delays = {"v1": 0.0, "gql": 0.0}
+
+    def _call(self, backend, result):
+        self.calls.append(backend)
+        time.sleep(self.delays[backend])
+        if backend in self.errors:
+            raise self.errors[backend]
+        return result
+
+    rank_token = "token"
+
+    def private_request(self, endpoint, params=None):
+        # feed/user/{id}/ da API privada (backend v1)
+        items = [make_v1_item(pk) for pk in range(1, int(params["count"]) + 1)]
+        return self._call("v1", {"items": items, "next_max_id": "2_3"})
+
+    def user_medias_gql(self, user_id, amount=0):
+        return self._call("gql", ["media_gql"] * amount)
+
+    def user_medias(self, user_id, amount=0):
+        return self._call("gql", ["media_auto"] * amount)
+
+    def user_medias_paginated_gql(self, user_id, amount, end_cursor=None):
+        return self._call("gql", (["media_gql"] * amount, "QVFE"))
+
+    def user_info_by_username_v1(self, username):
+        return self._call("v1", SimpleNamespace(pk=42))
+
+    def user_info_by_username_gql(self, username):
+        return self._call("gql", SimpleNamespace(pk=42))
+
+
+def test_backend_router():
+    print("="*50)
+    print("Testando roteamento entre backends v1 e gql")
+    print("="*50)
+
+    # ========== TESTE 1: Fallback e aprendizado ==========
+    print("\n[TESTE 1] Backend que falha perde a preferência")
+    api = FakeInstagramAPI()
+    router = BackendRouter(error_penalty=10, probe_interval=60)
+    api.errors["gql"] = ClientLoginRequired("login required")
+
+    medias, backend = router.call("medias", api, 42, 2)
+    assert [media.pk for media in medias] == ["1", "2"] and backend is Backend.V1
+    assert api.calls == ["gql", "v1"]
+
+    api.calls.clear()
+    assert router.call("medias", api, 42, 2)[1] is Backend.V1
+    assert api.calls == ["v1"], "gql não deveria ser tentado de novo"
+    status = router.get_status()
+    assert status['fallbacks'] == 1
+    assert status['operations']['medias']['gql']['failures'] == 1
+    print("✓ gql falhou uma vez; chamadas seguintes vão direto ao v1")
+
+    # ========== TESTE 2: Escolha por latência ==========
+    print("\n[TESTE 2] Entre dois backends funcionando, o mais rápido vence")
+    api = FakeInstagramAPI()
+    api.delays["gql"] = 0.03
+    router = BackendRouter(probe_interval=60)
+    for _ in range(3):
+        router.call("medias", api, 42, 1, backend=Backend.GQL)
+        router.call("medias", api, 42, 1, backend=Backend.V1)
+    assert router.order("medias") == [Backend.V1, Backend.GQL]
+    assert router.order("user_id") == [Backend.GQL, Backend.V1], "operações são medidas separadamente"
+    print("✓ v1 (mais rápido) escolhido para medias; user_id sem medições mantém gql")
+
+    # ========== TESTE 3: Erros que não trocam de backend ==========
+    print("\n[TESTE 3] Perfil inexistente e erro da conta")
+    api = FakeInstagramAPI()
+    router = BackendRouter()
+    api.errors["gql"] = UserNotFound("not found")
+    try:
+        router.call("user_id", api, "sumido")
+        raise AssertionError("deveria lançar UserNotFound")
+    except UserNotFound:
+        pass
+    assert api.calls == ["gql"]
+
+    api.calls.clear()
+    api.errors = {"gql": ClientLoginRequired("login"), "v1": PleaseWaitFewMinutes("wait")}
+    try:
+        router.call("medias", api, 42, 1)
+        raise AssertionError("deveria falhar")
+    except PleaseWaitFewMinutes:
+        pass
+    print("✓ UserNotFound sem fallback; com os dois falhando vale o erro do v1 (conta)")
+
+    # ========== TESTE 4: Paginação presa ao backend do cursor ==========
+    print("\n[TESTE 4] Cursor de uma página só vale no backend que o gerou")
+    api = FakeInstagramAPI()
+    api.errors["v1"] = RuntimeError("conexão perdida")
+    try:
+        BackendRouter().call("medias_page", api, 42, 5, "3178_1234", backend=Backend.V1)
+        raise AssertionError("deveria falhar sem fallback")
+    except RuntimeError:
+        pass
+    assert api.calls == ["v1"]
+    print("✓ Backend fixado não cai para o outro")
+
+    # ========== TESTE 5: Backend preterido volta a ser testado ==========
+    print("\n[TESTE 5] Depois do intervalo, o backend preterido é testado de novo")
+    api = FakeInstagramAPI()
+    router = BackendRouter(probe_interval=0.05)
+    api.errors["gql"] = RuntimeError("instável")
+    router.call("medias", api, 42, 1)
+    del api.errors["gql"]
+    assert router.order("medias")[0] is Backend.V1
+    time.sleep(0.06)
+    api.calls.clear()
+    assert router.call("medias", api, 42, 1)[1] is Backend.GQL
+    assert api.calls == ["gql"]
+    print("✓ gql recuperado volta a ser medido")
+
+    # ========== TESTE 6: Modo instagrapi e integração com o extractor ==========
+    print("\n[TESTE 6] Escolha interna do instagrapi e busca de user_id pelo extractor")
+    api = FakeInstagramAPI()
+    assert BackendRouter(mode="instagrapi").call("medias", api, 42, 1) == (["media_auto"], Backend.AUTO)
+
+    cache = FakeUserIdCache()
+    extractor = InstagramExtractor(None, client_pool=object(), user_id_cache=cache, backend_router=BackendRouter())
+    client = SimpleNamespace(client=api)
+    api.errors = {"gql": UserNotFound("not found")}
+    try:
+        extractor._resolve_user_id(client, "sumido")
+        raise AssertionError("deveria lançar ProfileNotFound")
+    except ProfileNotFound:
+        pass
+    assert cache.missing == ["sumido"]
+    print("✓ Modo instagrapi usa user_medias; UserNotFound vira ProfileNotFound")
+
+    # ========== TESTE 7: Erros do v1 não viram feed vazio ==========
+    print("\n[TESTE 7] Erro de rede ou prazo no v1 sai do call()")
+    api = FakeInstagramAPI()
+    api.errors = {"v1": DeadlineExceeded("prazo"), "gql": ClientConnectionError("rede")}
+    router = BackendRouter(mode="v1")
+    try:
+        router.call("medias", api, 123, 12)
+        raise AssertionError("deveria lançar DeadlineExceeded")
+    except DeadlineExceeded:
+        pass
+    assert api.calls == ["v1"], "prazo não cai para o gql"
+
+    api.errors["v1"] = ClientConnectionError("rede")
+    for operation, args in (("medias", (123, 12)), ("medias_page", (123, 12, ""))):
+        try:
+            router.call(operation, api, *args)
+            raise AssertionError(f"{operation} deveria lançar ClientConnectionError")
+        except ClientConnectionError:
+            pass
+    assert router.get_status()['operations']['medias']['v1']['failures'] == 1
+    print("✓ DeadlineExceeded e ClientConnectionError propagam (e contam como falha)")
+
+    print("\n✅ Todos os testes de roteamento passaram!")
+
+
+if __name__ == "__main__":
+    test_backend_router()
@@ -0,0 +1,119 @@
+"""
+Script para testar a extração em lote e o intervalo mínimo entre usos de uma conta
+"""
+import asyncio
+import time
+
+from app.config import Config
+from app.models.requests import BatchItem
+from app.services.account_manager import AccountManager
+from app.services.extraction_service import ExtractionService
+from app.services.response_cache import ResponseCache
+from app.utils.deadline import Deadline, deadline_scope
+from app.utils.exceptions import DeadlineExceeded, ProfileNotFound
+from tests.fakes import FakeUserIdCache, make_account
+
+
+class FakeAccountManager(AccountManager):
+    """AccountManager com contas em memória (sem CSV)"""
+
+    def _load_accounts(self):
+        self.accounts = [make_account(f"conta_{i}", thread_id=i) for i in range(2)]
+
+
+class FakeExtractor:
+    def __init__(self, account_manager, delay: float):
+        self.account_manager = account_manager
+        self.delay = delay
+        self.accounts_used = []
+        self.user_id_cache = FakeUserIdCache()
+
+    def _work(self, username):
+        account = self.account_manager.get_next_account()
+        self.accounts_used.append(account.username)
+        time.sleep(self.delay)
+        if username.startswith("inexistente"):
+            raise ProfileNotFound(f"Perfil @{username} não existe")
+
+    def extract_posts(self, username, quantity, user_id=None):
+        self._work(username)
+        return []
+
+    def extract_stories(self, username, user_id=None):
+        self._work(username)
+        return []
+
+
+def test_batch():
+    print("="*50)
+    print("Testando extração em lote")
+    print("="*50)
+
+    original_interval = Config.ACCOUNT_MIN_INTERVAL_SECONDS
+    try:
+        # ========== TESTE 1: Intervalo mínimo por conta ==========
+        print("\n[TESTE 1] Contas respeitam ACCOUNT_MIN_INTERVAL_SECONDS")
+        Config.ACCOUNT_MIN_INTERVAL_SECONDS = 0.2
+        manager = FakeAccountManager(csv_path="memoria")
+        start = time.monotonic()
+        used = [manager.get_next_account().username for _ in range(4)]
+        elapsed = time.monotonic() - start
+        assert used == ["conta_0", "conta_1", "conta_0", "conta_1"], used
+        assert 0.15 < elapsed < 0.4, f"deveria aguardar um intervalo ({elapsed:.2f}s)"
+        print(f"✓ 4 usos de 2 contas em {elapsed:.2f}s")
+
+        # ========== TESTE 2: Intervalo além do prazo ==========
+        print("\n[TESTE 2] Espera pelo intervalo não passa do prazo da requisição")
+        Config.ACCOUNT_MIN_INTERVAL_SECONDS = 1
+        manager = FakeAccountManager(csv_path="memoria")
+        manager.get_next_account()
+        manager.get_next_account()
+        reserved = dict(manager._next_use_at)
+        start = time.monotonic()
+        with deadline_scope(Deadline(0.2)):
+            try:
+                manager.get_next_account()
+                raise AssertionError("deveria lançar DeadlineExceeded")
+            except DeadlineExceeded:
+                pass
+        elapsed = time.monotonic() - start
+        assert elapsed < 0.1, f"não deveria dormir até o prazo ({elapsed:.2f}s)"
+        assert manager._next_use_at == reserved, "o uso não é reservado"
+        with deadline_scope(Deadline(5)):
+            assert manager.get_next_account().username == "conta_0"
+        print(f"✓ DeadlineExceeded em {elapsed:.2f}s, sem reserva; com prazo suficiente a conta é usada")
+
+        # ========== TESTE 3: Batch paralelo com falha isolada ==========
+        print("\n[TESTE 3] Itens em paralelo; falha de um item não interrompe o batch")
+        Config.ACCOUNT_MIN_INTERVAL_SECONDS = 0
+        manager = FakeAccountManager(csv_path="memoria")
+        extractor = FakeExtractor(manager, delay=0.2)
+        service = ExtractionService(
+            extractor, manager, max_workers=2, posts_cache=ResponseCache("posts", ttl=0)
+        )
+        items = [
+            BatchItem(username="perfil_a", type="posts", quantity=5),
+            BatchItem(username="@inexistente", type="posts"),
+            BatchItem(username="perfil_b", type="stories"),
+            BatchItem(username="perfil_c", type="posts"),
+        ]
+        assert service.batch_concurrency() == 2
+
+        start = time.monotonic()
+        results = asyncio.run(service.extract_batch(items))
+        elapsed = time.monotonic() - start
+        assert [r.username for r in results] == ["perfil_a", "inexistente", "perfil_b", "perfil_c"]
+        assert [r.success for r in results] == [True, False, True, True]
+        assert results[1].error == "ProfileNotFound" and results[2].stories == []
+        assert elapsed < 0.6, f"itens deveriam rodar em paralelo ({elapsed:.2f}s)"
+        assert set(extractor.accounts_used) == {"conta_0", "conta_1"}
+        print(f"✓ 4 itens em {elapsed:.2f}s, contas: {sorted(set(extractor.accounts_used))}")
+        service.shutdown()
+    finally:
+        Config.ACCOUNT_MIN_INTERVAL_SECONDS = original_interval
+
+    print("\n✅ Todos os testes de batch passaram!")
+
+
+if __name__ == "__main__":
+    test_batch()
@@ -0,0 +1,146 @@
+"""
+Script para testar o ClientPool (sem acesso ao Instagram)
+"""
+from concurrent.futures import ThreadPoolExecutor
+import tempfile
+
+from instagrapi.exceptions import LoginRequired
+
+from app.services.extractor import InstagramExtractor
+from app.services.instagram_client import InstagramClient
+from app.services.session_store import SessionStore
+from app.utils.exceptions import AccountLoginFailed
+from tests.fakes import CountingClientPool, make_account
+
+
+def test_client_pool():
+    print("="*50)
+    print("Testando ClientPool")
+    print("="*50)
+
+    pool = CountingClientPool(max_size=2)
+    acc_a, acc_b, acc_c = make_account("conta_a"), make_account("conta_b"), make_account("conta_c")
+
+    # ========== TESTE 1: Reutilização ==========
+    print("\n[TESTE 1] Cliente é reutilizado entre usos")
+    with pool.client(acc_a) as first:
+        pass
+    with pool.client(acc_a) as second:
+        pass
+    assert first is second
+    assert pool.logins == 1
+    assert first.is_logged_in()
+    print(f"✓ Um único login para dois usos: {pool.get_status()}")
+
+    # ========== TESTE 2: Uso concorrente da mesma conta ==========
+    print("\n[TESTE 2] Clientes em uso não são compartilhados")
+    c1 = pool.acquire(acc_a)
+    c2 = pool.acquire(acc_a)
+    assert c1 is not c2
+    pool.release(c1)
+    pool.release(c2)
+    assert len(pool) == 2
+    print(f"✓ Dois clientes ociosos para {acc_a.username}")
+
+    # ========== TESTE 3: Eviction LRU ==========
+    print("\n[TESTE 3] Eviction LRU quando o pool enche")
+    with pool.client(acc_b):
+        pass
+    with pool.client(acc_c):
+        pass
+    status = pool.get_status()
+    assert status['idle_clients'] == 2
+    assert status['evictions'] == 2
+    assert not c1.is_logged_in() and not c2.is_logged_in()
+    print(f"✓ Clientes de {acc_a.username} removidos: {status}")
+
+    # ========== TESTE 4: LoginRequired descarta o cliente ==========
+    print("\n[TESTE 4] LoginRequired descarta o cliente")
+    try:
+        with pool.client(acc_b) as client:
+            raise LoginRequired("sessão expirada")
+    except LoginRequired:
+        pass
+    assert not client.is_logged_in()
+    assert acc_b.username not in pool._idle
+    print("✓ Cliente com sessão inválida não voltou ao pool")
+
+    # ========== TESTE 5: close ==========
+    print("\n[TESTE 5] close() esvazia o pool")
+    pool.close()
+    assert len(pool) == 0
+    print("✓ Pool vazio após close()")
+
+    # ========== TESTE 6: Single-flight de login ==========
+    print("\n[TESTE 6] Logins concorrentes da mesma conta viram um só")
+    pool = CountingClientPool(max_size=10, login_delay=0.2)
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        clients = list(executor.map(lambda _: pool.acquire(acc_a), range(5)))
+    assert pool.logins == 1
+    assert len({id(c) for c in clients}) == 5
+    assert all(c.session == "sessao-conta_a" for c in clients)
+    assert pool.get_status()['shared_logins'] == 4
+    print(f"✓ 1 login para 5 requisições simultâneas: {pool.get_status()}")
+
+    # ========== TESTE 7: Erro compartilhado ==========
+    print("\n[TESTE 7] Erro do login é repassado a todos que aguardavam")
+    pool = CountingClientPool(max_size=10, login_delay=0.2)
+    pool.login_error = AccountLoginFailed("Senha incorreta")
+
+    def try_acquire(_):
+        try:
+            pool.acquire(acc_b)
+            return None
+        except AccountLoginFailed as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        errors = list(executor.map(try_acquire, range(4)))
+    assert pool.logins == 1
+    assert all(isinstance(e, AccountLoginFailed) for e in errors)
+    print("✓ Todas as chamadas receberam AccountLoginFailed de um único login")
+
+    # ========== TESTE 8: Pool e store vazios injetados são usados ==========
+    print("\n[TESTE 8] Dependências vazias (len == 0) não são trocadas por novas")
+    pool = CountingClientPool(max_size=10)
+    assert len(pool) == 0
+    extractor = InstagramExtractor(None, pool)
+    assert extractor.client_pool is pool
+    with extractor.client_pool.client(acc_a):
+        pass
+    assert pool.logins == 1 and len(pool) == 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = SessionStore(sessions_dir=tmp_dir, flush_interval=60)
+        assert len(store) == 0
+        client = InstagramClient(acc_a, session_store=store)
+        assert client.session_store is store
+        client._save_session()
+        assert store.get(acc_a.username) is not None
+        store.close()
+    print("✓ Extractor usa o pool recebido; InstagramClient grava no store recebido")
+
+    # ========== TESTE 9: idle_client nunca faz login ==========
+    print("\n[TESTE 9] idle_client só entrega clientes ociosos")
+    pool = CountingClientPool(max_size=10)
+    with pool.idle_client(acc_a) as client:
+        assert client is None
+    assert pool.logins == 0
+    pool.warm(acc_a)
+    with pool.client(acc_a):
+        with pool.idle_client(acc_a) as second:
+            assert second is None, "o único cliente está em uso"
+    c1, c2 = pool.acquire(acc_a), pool.acquire(acc_a)
+    pool.release(c1)
+    pool.release(c2)
+    with pool.client(acc_a) as first:
+        with pool.idle_client(acc_a) as second:
+            assert second is not None and second is not first
+    assert pool.logins == 2 and len(pool) == 2
+    print("✓ Segundo cliente só quando já existe um ocioso; os dois voltam ao pool")
+
+    print("\n✅ Todos os testes do ClientPool passaram!")
+
+
+if __name__ == "__main__":
+    test_client_pool()
@@ -0,0 +1,225 @@
+"""
+Script para testar o prazo (deadline) das requisições
+"""
+import asyncio
+import io
+import tempfile
+import time
+
+from instagrapi.exceptions import ClientConnectionError, ClientError
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from app.services.backend_router import BackendRouter
+from app.services.extraction_service import ExtractionService
+from app.services.extractor import InstagramExtractor
+from app.services.instagram_client import InstagramClient
+from app.services.response_cache import ResponseCache
+from app.services.retry_policy import RetryPolicy, build_policies
+from app.services.session_store import SessionStore
+from app.utils.deadline import Deadline, bounded_pauses, bounded_retries, current_deadline, deadline_scope, http_timeout
+from app.utils.exceptions import DeadlineExceeded
+from app.utils.single_flight import AsyncSingleFlight
+from tests.fakes import FakeAccountManager, FakePool, FakeUserIdCache, make_account
+
+
+class StatusAdapter(BaseAdapter):
+    """Transporte HTTP falso: responde sempre o mesmo status, sem rede"""
+
+    def __init__(self, status: int):
+        super().__init__()
+        self.status = status
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        response = Response()
+        response.status_code = self.status
+        response.url = request.url
+        response.request = request
+        response.headers = CaseInsensitiveDict()
+        response._content = b"{}"
+        response.raw = io.BytesIO(b"{}")
+        return response
+
+    def close(self):
+        pass
+
+
+def test_deadline():
+    print("="*50)
+    print("Testando prazo das requisições")
+    print("="*50)
+
+    # ========== TESTE 1: Deadline e timeout HTTP ==========
+    print("\n[TESTE 1] Timeout HTTP limitado ao prazo restante")
+    assert http_timeout(30) == 30
+    with deadline_scope(Deadline(5)) as deadline:
+        assert current_deadline() is deadline
+        assert 4 < http_timeout(30) <= 5
+        assert http_timeout(2) == 2
+    assert current_deadline() is None
+
+    with deadline_scope(Deadline(0)):
+        try:
+            http_timeout(30)
+            raise AssertionError("deveria lançar DeadlineExceeded")
+        except DeadlineExceeded as e:
+            assert e.details['timeout'] == 0
+    print("✓ min(timeout padrão, prazo restante); prazo esgotado impede a chamada")
+
+    # ========== TESTE 2: Retry não espera além do prazo ==========
+    print("\n[TESTE 2] Backoff maior que o prazo restante encerra as tentativas")
+    manager = FakeAccountManager()
+    policies = {op: RetryPolicy(max_attempts=5, base_delay=1, jitter=0) for op in build_policies("")}
+    extractor = InstagramExtractor(manager, FakePool(), FakeUserIdCache(), retry_policies=policies)
+
+    def fetch(client, user_id):
+        raise ClientConnectionError("reset")
+
+    start = time.monotonic()
+    with deadline_scope(Deadline(0.3)):
+        try:
+            extractor._with_retries("posts", "perfil", 42, fetch)
+            raise AssertionError("deveria lançar DeadlineExceeded")
+        except DeadlineExceeded:
+            pass
+    assert time.monotonic() - start < 0.2
+    assert manager.used == ["conta_0"]
+    print("✓ DeadlineExceeded sem dormir o backoff de 1s")
+
+    # ========== TESTE 3: ExtractionService respeita o prazo ==========
+    print("\n[TESTE 3] Espera pela thread de extração termina no prazo")
+
+    class SlowExtractor:
+        def __init__(self):
+            self.seen = []
+            self.user_id_cache = FakeUserIdCache()
+
+        def extract_posts(self, username, quantity, user_id=None):
+            self.seen.append(current_deadline())
+            time.sleep(0.5)
+            return []
+
+    async def scenario():
+        slow = SlowExtractor()
+        service = ExtractionService(
+            slow, FakeAccountManager(), max_workers=1, posts_cache=ResponseCache("posts", ttl=0)
+        )
+        start = time.monotonic()
+        with deadline_scope(Deadline(0.1)) as deadline:
+            try:
+                await service.extract_posts("perfil", 5)
+                raise AssertionError("deveria lançar DeadlineExceeded")
+            except DeadlineExceeded:
+                pass
+        elapsed = time.monotonic() - start
+        assert elapsed < 0.3, elapsed
+        assert slow.seen == [deadline], "o prazo deve chegar à thread de extração"
+        admission = service.get_status()['admission']
+        assert admission['active'] == 1 and admission['orphaned'] == 1, "a vaga segue ocupada com a thread"
+        await asyncio.sleep(0.5)
+        admission = service.get_status()['admission']
+        assert admission['active'] == 0 and admission['orphaned'] == 0
+        service.shutdown()
+        print(f"✓ 504 após {elapsed:.2f}s (thread recebeu o prazo); vaga devolvida quando a thread terminou")
+
+    asyncio.run(scenario())
+
+    # ========== TESTE 4: Esperas internas do instagrapi ==========
+    print("\n[TESTE 4] Pausas e tentativas do instagrapi limitadas ao prazo")
+    assert bounded_pauses([1, 3], 1) == ([1, 3], 1) and bounded_retries(3, 2) == 3
+    with deadline_scope(Deadline(1)):
+        delay_range, request_timeout = bounded_pauses([1, 3], 1)
+        assert delay_range[1] + request_timeout <= 0.5
+        assert bounded_retries(3, 2) == 1
+    with deadline_scope(Deadline(20)):
+        assert bounded_pauses([1, 3], 1) == ([1, 3], 1) and bounded_retries(3, 2) == 3
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        client = InstagramClient(make_account("conta_0"), session_store=SessionStore(sessions_dir=tmp_dir))
+        public, private = StatusAdapter(500), StatusAdapter(408)
+        client.client.public.mount("https://", public)
+        client.client.private.mount("https://", private)
+
+        # Sem prazo: pausas de 2-4s e 3 tentativas com 2s entre elas (>= 10s); com 1s de prazo, uma só
+        start = time.monotonic()
+        with deadline_scope(Deadline(1)):
+            try:
+                client.client.public_request("https://www.instagram.com/perfil/")
+                raise AssertionError("deveria lançar ClientError")
+            except ClientError:
+                pass
+        elapsed = time.monotonic() - start
+        assert public.calls == 1 and elapsed < 1, (public.calls, elapsed)
+
+        # Após um 408 o instagrapi dormiria 60s antes de repetir
+        start = time.monotonic()
+        with deadline_scope(Deadline(1)):
+            try:
+                client.client.private_request("feed/timeline/")
+                raise AssertionError("deveria lançar DeadlineExceeded")
+            except DeadlineExceeded:
+                pass
+        elapsed = time.monotonic() - start
+        assert private.calls == 1 and elapsed < 1, (private.calls, elapsed)
+        assert client.client.delay_range != client.delay_range
+    print(f"✓ public_request: 1 tentativa; private_request: 408 encerra em {elapsed:.2f}s")
+
+    # ========== TESTE 5: Quem aguarda outra extração respeita o próprio prazo ==========
+    print("\n[TESTE 5] Seguidor do single-flight termina no próprio prazo")
+
+    async def shared_extraction():
+        flight = AsyncSingleFlight()
+
+        async def extraction():
+            await asyncio.sleep(0.5)
+            return "posts"
+
+        leader = asyncio.create_task(flight.do("perfil", extraction))
+        await asyncio.sleep(0)
+        start = time.monotonic()
+        with deadline_scope(Deadline(0.1)):
+            try:
+                await flight.do("perfil", extraction)
+                raise AssertionError("deveria lançar DeadlineExceeded")
+            except DeadlineExceeded:
+                pass
+        elapsed = time.monotonic() - start
+        assert elapsed < 0.3, elapsed
+        assert await leader == ("posts", False), "a extração continua para quem a iniciou"
+        assert flight.shared_count == 1
+        return elapsed
+
+    elapsed = asyncio.run(shared_extraction())
+    print(f"✓ Seguidor recebe 504 em {elapsed:.2f}s; líder recebe o resultado")
+
+    # ========== TESTE 6: Prazo dentro do instagrapi pelo backend v1 ==========
+    print("\n[TESTE 6] Prazo esgotado na chamada v1 vira 504, não feed vazio")
+
+    class ExpiringInstagramAPI:
+        rank_token = "token"
+
+        def private_request(self, endpoint, params=None):
+            # Como o wrapper de session.request do InstagramClient
+            time.sleep(0.15)
+            http_timeout(30)
+            return {"items": []}
+
+    extractor = InstagramExtractor(
+        FakeAccountManager(), FakePool(ExpiringInstagramAPI()), FakeUserIdCache(user_id=42),
+        backend_router=BackendRouter(mode="v1")
+    )
+    with deadline_scope(Deadline(0.1)):
+        try:
+            posts = extractor.extract_posts("perfil", 12)
+            raise AssertionError(f"deveria lançar DeadlineExceeded, retornou {posts}")
+        except DeadlineExceeded:
+            pass
+    print("✓ DeadlineExceeded chega ao _with_retries pelo BackendRouter")
+    print("\n✅ Todos os testes de prazo passaram!")
+
+
+if __name__ == "__main__":
+    test_deadline()
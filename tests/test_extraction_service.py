@@ -0,0 +1,137 @@
+"""
+Script para testar o ExtractionService (sem acesso ao Instagram)
+"""
+import asyncio
+import time
+
+from app.config import Config
+from app.services.extraction_service import ExtractionService
+from app.services.response_cache import ResponseCache
+from app.utils.exceptions import ProfileNotFound
+from tests.fakes import FakeUserIdCache, make_account
+
+
+class FakeExtractor:
+    """Extractor bloqueante que simula uma extração lenta"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = []
+        self.user_id_cache = FakeUserIdCache()
+
+    def extract_posts(self, username: str, quantity: int, user_id=None):
+        self.calls.append((username, quantity))
+        time.sleep(self.delay)
+        if username == "inexistente":
+            raise ProfileNotFound(f"Perfil @{username} não existe")
+        return [f"{username}-{i}" for i in range(quantity)]
+
+    def extract_stories(self, username: str, user_id=None):
+        time.sleep(self.delay)
+        return []
+
+
+class FakeAccountManager:
+    def __init__(self, statuses):
+        self.accounts = [make_account(f"conta_{i}", status, i) for i, status in enumerate(statuses)]
+
+
+def test_extraction_service():
+    print("="*50)
+    print("Testando ExtractionService")
+    print("="*50)
+
+    # ========== TESTE 1: Dimensionamento do pool ==========
+    print("\n[TESTE 1] Número de workers acompanha contas e MAX_CONCURRENT_REQUESTS")
+    original_workers, original_max = Config.EXTRACTION_WORKERS, Config.MAX_CONCURRENT_REQUESTS
+    try:
+        Config.EXTRACTION_WORKERS = 0
+        Config.MAX_CONCURRENT_REQUESTS = 3
+        assert ExtractionService.compute_workers(FakeAccountManager(["success"] * 5)) == 3
+        assert ExtractionService.compute_workers(FakeAccountManager(["success", "failed"])) == 1
+        assert ExtractionService.compute_workers(FakeAccountManager(["failed"])) == 1
+        Config.EXTRACTION_WORKERS = 7
+        assert ExtractionService.compute_workers(FakeAccountManager(["success"])) == 7
+    finally:
+        Config.EXTRACTION_WORKERS, Config.MAX_CONCURRENT_REQUESTS = original_workers, original_max
+    print("✓ Dimensionamento correto")
+
+    # ========== TESTE 2: Event loop livre ==========
+    print("\n[TESTE 2] Extrações não bloqueiam o event loop")
+    service = ExtractionService(FakeExtractor(delay=0.3), FakeAccountManager(["success"] * 2), max_workers=2)
+
+    async def scenario():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        start = time.monotonic()
+        results = await asyncio.gather(
+            service.extract_posts("perfil_a", 2),
+            service.extract_posts("perfil_b", 3),
+        )
+        elapsed = time.monotonic() - start
+        beat.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(scenario())
+    assert results == [["perfil_a-0", "perfil_a-1"], ["perfil_b-0", "perfil_b-1", "perfil_b-2"]]
+    assert elapsed < 0.55, f"extrações deveriam rodar em paralelo ({elapsed:.2f}s)"
+    assert ticks >= 5, "event loop ficou bloqueado"
+    print(f"✓ 2 extrações em {elapsed:.2f}s, event loop executou {ticks} ticks")
+
+    status = service.get_status()
+    assert status['completed'] == 2 and status['active'] == 0 and status['queued'] == 0
+    print(f"✓ Status: {status}")
+
+    service.shutdown()
+
+    # ========== TESTE 3: Coalescência de requisições idênticas ==========
+    print("\n[TESTE 3] Requisições simultâneas do mesmo perfil compartilham a extração")
+    extractor = FakeExtractor(delay=0.2)
+    service = ExtractionService(
+        extractor,
+        FakeAccountManager(["success"] * 4),
+        max_workers=4,
+        posts_cache=ResponseCache("posts", ttl=0)
+    )
+
+    async def coalescing():
+        first = asyncio.create_task(service.extract_posts("perfil", 5))
+        await asyncio.sleep(0.01)
+        results = await asyncio.gather(
+            first,
+            service.extract_posts("Perfil", 3),
+            service.extract_posts("perfil", 5),
+            service.extract_posts("perfil", 20),
+            service.extract_posts("outro", 5),
+        )
+
+        errors = await asyncio.gather(
+            service.extract_posts("inexistente", 1),
+            service.extract_posts("inexistente", 1),
+            return_exceptions=True
+        )
+        return results, errors
+
+    results, errors = asyncio.run(coalescing())
+    assert results[1] == ["perfil-0", "perfil-1", "perfil-2"]
+    assert results[0] == results[2] and len(results[3]) == 20
+    # Quantidades arredondadas para a página (POSTS_PAGE_SIZE=12)
+    assert sorted(extractor.calls) == [("inexistente", 12), ("outro", 12), ("perfil", 12), ("perfil", 24)]
+    assert all(isinstance(e, ProfileNotFound) for e in errors)
+    status = service.get_status()
+    assert status['coalesced'] == 3 and status['in_flight'] == 0
+    print(f"✓ 7 requisições, {len(extractor.calls)} extrações (coalesced={status['coalesced']})")
+
+    service.shutdown()
+    print("\n✅ Todos os testes do ExtractionService passaram!")
+
+
+if __name__ == "__main__":
+    test_extraction_service()
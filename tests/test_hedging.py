@@ -0,0 +1,79 @@
+"""
+Script para testar o hedging de extrações lentas
+"""
+import time
+
+from app.config import Config
+from app.services.extractor import InstagramExtractor
+from app.services.latency_tracker import LatencyTracker
+from tests.fakes import FakeAccountManager, FakePool, FakeUserIdCache
+
+
+def slow_fetch(client, user_id):
+    time.sleep(0.6 if client.account.username == "conta_lenta" else 0.05)
+    return client.account.username
+
+
+def test_hedging():
+    print("="*50)
+    print("Testando hedging")
+    print("="*50)
+
+    # ========== TESTE 1: Percentis ==========
+    print("\n[TESTE 1] Percentis da janela de latências")
+    tracker = LatencyTracker(window=100, min_samples=10)
+    for i in range(1, 101):
+        tracker.record("posts", i / 100)
+    assert tracker.percentile("posts", 50) == 0.5
+    assert tracker.percentile("posts", 95) == 0.95
+    assert tracker.percentile("stories", 95) is None
+    print("✓ p50=0.5s, p95=0.95s; sem medições suficientes = None")
+
+    original = (Config.HEDGE_ENABLED, Config.HEDGE_MIN_SAMPLES)
+    Config.HEDGE_ENABLED, Config.HEDGE_MIN_SAMPLES = True, 5
+    try:
+        extractor = InstagramExtractor(FakeAccountManager(["conta_lenta", "conta_rapida"]), FakePool(), FakeUserIdCache())
+
+        # ========== TESTE 2: Sem histórico não há hedge ==========
+        print("\n[TESTE 2] Sem medições suficientes a extração segue normal")
+        assert extractor._hedged("posts", "perfil", 42, slow_fetch) == "conta_lenta"
+        assert extractor.get_hedge_status()['started'] == 0
+        print("✓ Nenhuma duplicata")
+
+        # ========== TESTE 3: Conta lenta perde para a duplicata ==========
+        print("\n[TESTE 3] Extração acima do p95 ganha duplicata em outra conta")
+        for _ in range(30):
+            extractor.latency.record("posts", 0.1)
+        extractor.account_manager.index = 0
+        start = time.monotonic()
+        assert extractor._hedged("posts", "perfil", 42, slow_fetch) == "conta_rapida"
+        elapsed = time.monotonic() - start
+        assert elapsed < 0.4, elapsed
+        status = extractor.get_hedge_status()
+        assert status['started'] == 1 and status['won'] == 1
+        print(f"✓ Resultado da conta rápida em {elapsed:.2f}s")
+
+        # ========== TESTE 4: Limite de duplicatas simultâneas ==========
+        print("\n[TESTE 4] HEDGE_MAX_INFLIGHT limita a carga extra")
+        assert extractor._hedge_slots.acquire(blocking=False)
+        try:
+            extractor.account_manager.index = 0
+            assert extractor._hedged("posts", "perfil", 42, slow_fetch) == "conta_lenta"
+        finally:
+            extractor._hedge_slots.release()
+        assert extractor.get_hedge_status()['started'] == 1
+        print("✓ Sem vaga de hedge, a extração original é aguardada")
+
+        # ========== TESTE 5: Operações com entregas parciais não usam hedge ==========
+        print("\n[TESTE 5] Streaming e paginação nunca são duplicados")
+        assert extractor._hedge_delay("stream") is None
+        assert extractor._hedge_delay("page") is None
+        print("✓ Apenas posts e stories")
+    finally:
+        Config.HEDGE_ENABLED, Config.HEDGE_MIN_SAMPLES = original
+
+    print("\n✅ Todos os testes de hedging passaram!")
+
+
+if __name__ == "__main__":
+    test_hedging()
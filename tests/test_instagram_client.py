@@ -150,7 +150,7 @@ def test_instagram_client():
             test_id = ig_client.get_user_id_from_username("instagram")
             print(f"✓ Operação dentro do context: user_id={test_id}")
         
-        print(f"✓ Saiu do context (auto-logout)")
+        print(f"✓ Saiu do context (sessão mantida: {ig_client.is_logged_in()})")
         
     except Exception as e:
         print(f"✗ Erro no context manager: {e}")
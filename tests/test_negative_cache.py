@@ -0,0 +1,164 @@
+"""
+Script para testar o cache de resultados negativos (perfis inexistentes e privados)
+"""
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from instagrapi.exceptions import PrivateAccount, ProxyAddressIsBlocked
+
+from app.services.extraction_service import ExtractionService
+from app.services.extractor import InstagramExtractor
+from app.services.negative_cache import NegativeCache
+from app.services.response_cache import ResponseCache
+from app.services.user_id_cache import UserIdCache
+from app.services.retry_policy import RetryPolicy, build_policies
+from app.utils.exceptions import ExtractionError, PrivateProfileError, ProfileNotFound
+from tests.fakes import FakeAccountManager, FakePool, FakeUserIdCache
+
+
+class FakeExtractor:
+    """Perfis 'privado' e 'sumido' falham; os demais retornam uma lista vazia"""
+
+    def __init__(self):
+        self.calls = []
+        self.private = {"privado"}
+        self.user_id_cache = FakeUserIdCache()
+
+    def extract_posts(self, username, quantity, user_id=None):
+        self.calls.append(username)
+        if username in self.private:
+            raise PrivateProfileError(
+                f"Perfil @{username} é privado e nenhuma conta tem acesso", details={'all_denied': True}
+            )
+        if username == "sumido":
+            raise ProfileNotFound(f"Perfil @{username} não existe")
+        return []
+
+
+def test_negative_cache():
+    print("="*50)
+    print("Testando cache de resultados negativos")
+    print("="*50)
+
+    # ========== TESTE 1: TTL por tipo de erro ==========
+    print("\n[TESTE 1] Erros ficam em cache pelo TTL do seu tipo")
+    with tempfile.TemporaryDirectory() as tmp:
+        user_ids = UserIdCache(Path(tmp) / "user_ids.sqlite3", max_entries=10, negative_ttl_minutes=60)
+        user_ids.negative_ttl = 0.1
+        cache = NegativeCache(user_ids, private_ttl=60)
+        cache.record("Sumido", ProfileNotFound("Perfil @sumido não existe"))
+        cache.record("privado", PrivateProfileError("Perfil @privado é privado", details={'all_denied': True}))
+        cache.record("bloqueado", PrivateProfileError("Perfil @bloqueado é privado", details={'all_denied': False}))
+        # Inexistente fica só no UserIdCache, o mesmo que o extractor consulta
+        assert user_ids.is_known_missing("sumido") and len(cache) == 1
+        try:
+            cache.check("sumido")
+            raise AssertionError("deveria lançar ProfileNotFound")
+        except ProfileNotFound as e:
+            assert e.details['cached'] is True
+        time.sleep(0.15)
+        cache.check("sumido")
+        assert isinstance(cache.get("PRIVADO"), PrivateProfileError)
+        assert cache.get("bloqueado") is None, "privado sem confirmação de todas as contas não é cacheado"
+        assert cache.get_status()['private_entries'] == 1
+
+        # Extração bem-sucedida limpa o registro de inexistente, mas não o user_id conhecido
+        user_ids.negative_ttl = 60
+        user_ids.set_not_found("voltou")
+        user_ids.set("conhecido", 42)
+        cache.invalidate("voltou")
+        cache.invalidate("conhecido")
+        assert cache.get("voltou") is None and user_ids.get("conhecido") == 42
+
+        user_ids.negative_ttl = 0
+        disabled = NegativeCache(user_ids, private_ttl=0)
+        disabled.record("sumido", ProfileNotFound("x"))
+        disabled.record("privado", PrivateProfileError("x", details={'all_denied': True}))
+        assert len(disabled) == 0 and disabled.get("sumido") is None
+        user_ids.close()
+    print("✓ Inexistente expira em 0.1s, privado continua; TTL 0 desabilita")
+
+    # ========== TESTE 2: Requisições repetidas não usam contas ==========
+    print("\n[TESTE 2] Perfil privado responde do cache sem nova extração")
+
+    async def scenario():
+        extractor = FakeExtractor()
+        service = ExtractionService(
+            extractor,
+            FakeAccountManager(),
+            max_workers=2,
+            posts_cache=ResponseCache("posts", ttl=0),
+            negative_cache=NegativeCache(extractor.user_id_cache, private_ttl=60)
+        )
+
+        for username, error_type in (("privado", PrivateProfileError), ("sumido", ProfileNotFound)):
+            for _ in range(3):
+                try:
+                    await service.extract_posts(username, 5)
+                    raise AssertionError("deveria falhar")
+                except error_type:
+                    pass
+        assert extractor.calls == ["privado", "sumido"], extractor.calls
+        print(f"✓ 6 requisições, {len(extractor.calls)} extrações")
+
+        # ========== TESTE 3: refresh ignora e limpa o cache ==========
+        print("\n[TESTE 3] Perfil que ficou público é liberado por refresh")
+        extractor.private.clear()
+        assert await service.extract_posts("privado", 5, cache_mode="refresh") == []
+        assert await service.extract_posts("privado", 5) == []
+        assert extractor.calls.count("privado") == 3
+        assert service.get_status()['negative_cache']['private_entries'] == 0
+        assert extractor.user_id_cache.is_known_missing("sumido")
+        service.shutdown()
+        print("✓ Extração bem-sucedida remove a entrada negativa")
+
+    asyncio.run(scenario())
+
+    # ========== TESTE 4: Só PrivateAccount em todas as contas é cacheado ==========
+    print("\n[TESTE 4] Bloqueio de proxy não vira perfil privado em cache")
+
+    class DeniedInstagramAPI:
+        def __init__(self, error):
+            self.error = error
+
+        def user_medias(self, user_id, amount=0):
+            raise self.error
+
+        def private_request(self, endpoint, params=None):
+            raise self.error
+
+        user_medias_gql = user_medias
+        rank_token = "token"
+
+    async def outcome(error):
+        policies = {op: RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.01) for op in build_policies("")}
+        extractor = InstagramExtractor(
+            FakeAccountManager(), FakePool(DeniedInstagramAPI(error)), FakeUserIdCache(), retry_policies=policies
+        )
+        service = ExtractionService(
+            extractor, FakeAccountManager(), max_workers=1,
+            posts_cache=ResponseCache("posts", ttl=0),
+            negative_cache=NegativeCache(extractor.user_id_cache, private_ttl=3600)
+        )
+        try:
+            await service.extract_posts("perfil", 5, user_id=42)
+            raise AssertionError("deveria falhar")
+        except ExtractionError as e:
+            failure = e
+        cached = service.negative_cache.get("perfil")
+        service.shutdown()
+        return failure, cached
+
+    failure, cached = asyncio.run(outcome(ProxyAddressIsBlocked("blocked")))
+    assert not isinstance(failure, PrivateProfileError) and cached is None
+    failure, cached = asyncio.run(outcome(PrivateAccount("Not authorized to view user")))
+    assert isinstance(failure, PrivateProfileError) and isinstance(cached, PrivateProfileError)
+    print("✓ ProxyAddressIsBlocked não é cacheado; PrivateAccount em todas as contas é")
+
+    print("\n✅ Todos os testes do cache negativo passaram!")
+
+
+if __name__ == "__main__":
+    test_negative_cache()
@@ -0,0 +1,122 @@
+"""
+Script para testar a paginação por cursor (sem acesso ao Instagram)
+"""
+import asyncio
+from types import SimpleNamespace
+
+from app.services.backend_router import BackendRouter
+from app.services.extraction_service import ExtractionService
+from app.services.extractor import InstagramExtractor
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.exceptions import InvalidRequestError
+from tests.fakes import FakeAccountManager, FakePool, FakeUserIdCache, make_media, make_v1_item
+
+
+class FakeInstagramAPI:
+    def __init__(self, total: int):
+        self.feed = [make_media(i) for i in range(total)]
+        self.cursors = []
+        self.backends = []
+
+    def user_medias_paginated(self, user_id, amount, end_cursor=""):
+        self.cursors.append(end_cursor)
+        start = int(end_cursor or 0)
+        page = self.feed[start:start + amount]
+        return page, str(start + amount) if start + amount < len(self.feed) else ""
+
+    # Backends v1 e gql respondem igual no fake (cursores numéricos nos dois)
+    rank_token = "token"
+
+    def private_request(self, endpoint, params=None):
+        # feed/user/{id}/ da API privada (backend v1)
+        self.backends.append("v1")
+        page, next_cursor = self.user_medias_paginated(42, params["count"], params["max_id"])
+        return {"items": [make_v1_item(int(media.pk)) for media in page], "next_max_id": next_cursor}
+
+    def user_medias_paginated_gql(self, user_id, amount, end_cursor=""):
+        self.backends.append("gql")
+        return self.user_medias_paginated(user_id, amount, end_cursor)
+
+    def user_info_by_username_v1(self, username):
+        return SimpleNamespace(pk=42)
+
+    user_info_by_username_gql = user_info_by_username_v1
+
+
+def test_pagination():
+    print("="*50)
+    print("Testando paginação por cursor")
+    print("="*50)
+
+    # ========== TESTE 1: Cursor assinado ==========
+    print("\n[TESTE 1] Cursor é opaco e não pode ser adulterado")
+    cursor = encode_cursor({'u': 'perfil', 'c': 'abc', 'a': 'conta_1'})
+    assert decode_cursor(cursor) == {'u': 'perfil', 'c': 'abc', 'a': 'conta_1'}
+    body, signature = cursor.split(".")
+    tampered = encode_cursor({'u': 'perfil', 'c': 'xyz', 'a': 'conta_1'}).split(".")[0] + "." + signature
+    for invalid in (tampered, "lixo", cursor + "x"):
+        try:
+            decode_cursor(invalid)
+            raise AssertionError(f"cursor inválido aceito: {invalid}")
+        except InvalidRequestError:
+            pass
+    print("✓ Cursores adulterados rejeitados")
+
+    # ========== TESTE 2: Histórico completo sem repetir páginas ==========
+    print("\n[TESTE 2] Percorrer 130 posts em páginas de 50, na mesma conta")
+    api = FakeInstagramAPI(130)
+    pool = FakePool(api)
+    extractor = InstagramExtractor(FakeAccountManager(["conta_0", "conta_1"]), pool, FakeUserIdCache())
+    service = ExtractionService(extractor, FakeAccountManager(), max_workers=1)
+
+    async def walk():
+        ids, cursor, pages = [], None, 0
+        while True:
+            posts, cursor = await service.extract_posts_page("perfil", 50, cursor)
+            ids.extend(post.id for post in posts)
+            pages += 1
+            if cursor is None:
+                return ids, pages
+
+    ids, pages = asyncio.run(walk())
+    assert ids == [str(i) for i in range(130)] and pages == 3
+    assert api.cursors == ["", "50", "100"], api.cursors
+    assert len(set(pool.accounts_used)) == 1, pool.accounts_used
+    print(f"✓ {len(ids)} posts em {pages} páginas, conta: {pool.accounts_used[0]}")
+
+    # ========== TESTE 3: Cursor de outro perfil ==========
+    print("\n[TESTE 3] Cursor de outro perfil é rejeitado")
+    other = encode_cursor({'u': 'outro', 'c': '50', 'id': 7, 'a': 'conta_1'})
+    try:
+        asyncio.run(service.extract_posts_page("perfil", 50, other))
+        raise AssertionError("cursor de outro perfil aceito")
+    except InvalidRequestError:
+        pass
+    print("✓ InvalidRequestError lançado")
+
+    # ========== TESTE 4: Backend guardado no cursor ==========
+    print("\n[TESTE 4] Próximas páginas seguem no backend que gerou o cursor")
+    api = FakeInstagramAPI(130)
+    extractor.client_pool = FakePool(api)
+    extractor.backends = BackendRouter(mode="v1")
+    _, cursor = asyncio.run(service.extract_posts_page("perfil", 50))
+    assert decode_cursor(cursor)['b'] == "v1"
+    # Sem medições o roteador prefere gql, mas o cursor "50" (sem "_") é do v1
+    extractor.backends = BackendRouter(mode="cost")
+    while cursor is not None:
+        _, cursor = asyncio.run(service.extract_posts_page("perfil", 50, cursor))
+    assert api.backends == ["v1", "v1", "v1"], api.backends
+    legacy = encode_cursor({'u': 'perfil', 'c': '50', 'id': 42, 'a': 'conta_0'})
+    try:
+        asyncio.run(service.extract_posts_page("perfil", 50, legacy))
+        raise AssertionError("cursor sem backend aceito")
+    except InvalidRequestError:
+        pass
+    print(f"✓ Backends usados: {api.backends}; cursor sem backend rejeitado")
+    service.shutdown()
+
+    print("\n✅ Todos os testes de paginação passaram!")
+
+
+if __name__ == "__main__":
+    test_pagination()
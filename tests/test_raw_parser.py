@@ -0,0 +1,172 @@
+"""
+Script para testar o parser de JSON bruto (paridade com a conversão via modelos do instagrapi)
+"""
+from instagrapi.extractors import extract_media_gql, extract_media_v1, extract_story_gql, extract_story_v1
+
+from app.services.backend_router import Backend, BackendRouter
+from app.services.extractor import InstagramExtractor
+from app.services.raw_parser import posts_from_gql, posts_from_v1, stories_from_gql, stories_from_v1
+
+USER = {"pk": "42", "username": "perfil"}
+
+
+def v1_image(pk: int):
+    return {"candidates": [
+        {"url": f"https://instagram.com/{pk}_small.jpg", "width": 150, "height": 150},
+        {"url": f"https://instagram.com/{pk}.jpg", "width": 1080, "height": 1080}
+    ]}
+
+
+def v1_item(pk: int, media_type: int):
+    item = {
+        "pk": pk, "id": f"{pk}_42", "code": f"code{pk}", "media_type": media_type,
+        "taken_at": 1700000000 - pk * 3600, "user": dict(USER),
+        "caption": {"text": f"post {pk}"}, "like_count": 10 * pk, "comment_count": pk
+    }
+    if media_type == 8:
+        item["carousel_media"] = [
+            {"pk": pk * 10 + 1, "id": f"{pk * 10 + 1}_42", "media_type": 1, "image_versions2": v1_image(pk * 10 + 1)},
+            {"pk": pk * 10 + 2, "id": f"{pk * 10 + 2}_42", "media_type": 2, "image_versions2": v1_image(pk * 10 + 2),
+             "video_versions": [{"url": f"https://instagram.com/{pk * 10 + 2}.mp4", "width": 720, "height": 1280}]}
+        ]
+    else:
+        item["image_versions2"] = v1_image(pk)
+        if media_type == 2:
+            item["video_versions"] = [
+                {"url": f"https://instagram.com/{pk}_low.mp4", "width": 360, "height": 640},
+                {"url": f"https://instagram.com/{pk}.mp4", "width": 720, "height": 1280}
+            ]
+    return item
+
+
+def gql_node(pk: int, typename: str):
+    node = {
+        "__typename": typename, "id": str(pk), "shortcode": f"code{pk}",
+        "owner": {"id": "42", "username": "perfil"}, "taken_at_timestamp": 1700000000 - pk * 3600,
+        "display_url": f"https://instagram.com/{pk}.jpg",
+        "display_resources": [
+            {"src": f"https://instagram.com/{pk}_small.jpg", "config_width": 150, "config_height": 150},
+            {"src": f"https://instagram.com/{pk}.jpg", "config_width": 1080, "config_height": 1080}
+        ],
+        "edge_media_to_caption": {"edges": [{"node": {"text": f"post {pk}"}}]},
+        "edge_media_preview_like": {"count": 10 * pk}, "edge_media_to_comment": {"count": pk}
+    }
+    if typename == "GraphVideo":
+        node["video_url"] = f"https://instagram.com/{pk}.mp4"
+    if typename == "GraphSidecar":
+        node["edge_sidecar_to_children"] = {"edges": [
+            {"node": {"__typename": "GraphImage", "id": str(pk * 10 + 1), "display_url": f"https://instagram.com/{pk * 10 + 1}.jpg"}},
+            {"node": {"__typename": "GraphVideo", "id": str(pk * 10 + 2), "display_url": f"https://instagram.com/{pk * 10 + 2}.jpg",
+                      "video_url": f"https://instagram.com/{pk * 10 + 2}.mp4"}}
+        ]}
+    return node
+
+
+def v1_story(pk: int, media_type: int):
+    story = {
+        "pk": pk, "id": f"{pk}_42", "code": f"s{pk}", "media_type": media_type, "user": dict(USER),
+        "taken_at": 1700000000, "expiring_at": 1700086400, "image_versions2": v1_image(pk)
+    }
+    if media_type == 2:
+        story["video_versions"] = [{"url": f"https://instagram.com/{pk}.mp4", "width": 720, "height": 1280}]
+    return story
+
+
+def gql_story(pk: int, is_video: bool):
+    story = {
+        "__typename": "GraphStoryVideo" if is_video else "GraphStoryImage", "id": str(pk), "is_video": is_video,
+        "owner": {"id": "42", "username": "perfil"}, "taken_at_timestamp": 1700000000,
+        "expiring_at_timestamp": 1700086400, "display_url": f"https://instagram.com/{pk}.jpg"
+    }
+    if is_video:
+        story["video_resources"] = [{"src": f"https://instagram.com/{pk}.mp4", "config_width": 720, "config_height": 1280}]
+    return story
+
+
+def dump(models):
+    return [model.dict() for model in models]
+
+
+def test_raw_parser():
+    print("="*50)
+    print("Testando parser de JSON bruto")
+    print("="*50)
+
+    extractor = InstagramExtractor(None, client_pool=object(), user_id_cache=object())
+
+    # ========== TESTE 1: Posts v1 ==========
+    print("\n[TESTE 1] Feed v1 (foto, vídeo, carrossel)")
+    items = [v1_item(1, 1), v1_item(2, 2), v1_item(3, 8)]
+    expected = extractor._convert_medias_to_posts([extract_media_v1(item) for item in items], None)
+    assert dump(posts_from_v1(items)) == dump(expected)
+    print("✓ Mesmo resultado que extract_media_v1 + conversão")
+
+    # ========== TESTE 2: Posts GraphQL ==========
+    print("\n[TESTE 2] Feed GraphQL (foto, vídeo, carrossel)")
+    nodes = [gql_node(1, "GraphImage"), gql_node(2, "GraphVideo"), gql_node(3, "GraphSidecar")]
+    expected = extractor._convert_medias_to_posts([extract_media_gql(node) for node in nodes], None)
+    assert dump(posts_from_gql(nodes)) == dump(expected)
+    print("✓ Mesmo resultado que extract_media_gql + conversão")
+
+    # ========== TESTE 3: Stories ==========
+    print("\n[TESTE 3] Stories v1 e GraphQL")
+    items = [v1_story(1, 1), v1_story(2, 2)]
+    expected = extractor._convert_stories_data([extract_story_v1(item) for item in items])
+    parsed = stories_from_v1(items)
+    assert [s.dict(exclude={'expiring_at'}) for s in parsed] == [s.dict(exclude={'expiring_at'}) for s in expected]
+    assert parsed[0].expiring_at == "2023-11-15T22:13:20+00:00"
+
+    nodes = [gql_story(1, False), gql_story(2, True)]
+    expected = extractor._convert_stories_data([extract_story_gql(node) for node in nodes])
+    parsed = stories_from_gql(nodes)
+    assert [s.dict(exclude={'expiring_at'}) for s in parsed] == [s.dict(exclude={'expiring_at'}) for s in expected]
+    print("✓ Mesmos campos; expiring_at vem do próprio JSON")
+
+    # ========== TESTE 4: Campos que não usamos não quebram a conversão ==========
+    print("\n[TESTE 4] Mudança de schema fora dos campos usados")
+    item = v1_item(4, 1)
+    item["user"] = {"username": "perfil"}         # sem pk: o instagrapi falha
+    item["clips_metadata"] = {"formato": "novo"}
+    try:
+        extract_media_v1(item)
+        raise AssertionError("instagrapi deveria falhar")
+    except AssertionError as e:
+        assert "pk" in str(e)
+    assert [p.id for p in posts_from_v1([item, {"pk": 5}])] == ["4"], "item inválido é ignorado"
+    print("✓ Post convertido; só o item sem campos obrigatórios é descartado")
+
+    reel = {**gql_node(6, "XDTGraphClip"), "is_video": True, "product_type": "clips", "video_url": "https://instagram.com/6.mp4"}
+    photo = {**gql_node(7, "XDTGraphImage"), "is_video": False}
+    unknown = gql_node(8, "XDTGraphNovo")
+    parsed = posts_from_gql([reel, photo, unknown])
+    assert [(p.id, p.media_type) for p in parsed] == [("6", 2), ("7", 1)], [(p.id, p.media_type) for p in parsed]
+    assert parsed[0].medias[0].video_url == "https://instagram.com/6.mp4"
+    print("✓ __typename desconhecido: tipo por is_video/product_type; sem pistas o nó é descartado")
+
+    # ========== TESTE 5: Roteador com parser bruto ==========
+    print("\n[TESTE 5] Paginação v1 pelo JSON bruto")
+
+    class FakeInstagramAPI:
+        rank_token = "token"
+
+        def __init__(self):
+            self.params = []
+
+        def private_request(self, endpoint, params=None):
+            self.params.append(params["max_id"])
+            if not params["max_id"]:
+                return {"items": [v1_item(1, 1), v1_item(2, 1)], "next_max_id": "2_42"}
+            return {"items": [v1_item(3, 1)], "next_max_id": None}
+
+    api = FakeInstagramAPI()
+    router = BackendRouter(mode="v1")
+    posts, backend = router.call("medias", api, 42, 5, raw=True)
+    assert [p.id for p in posts] == ["1", "2", "3"] and backend is Backend.V1
+    assert api.params == ["", "2_42"]
+    print("✓ Páginas juntadas até acabar o feed, sem modelos do instagrapi")
+
+    print("\n✅ Todos os testes do parser de JSON bruto passaram!")
+
+
+if __name__ == "__main__":
+    test_raw_parser()
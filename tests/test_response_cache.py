@@ -0,0 +1,145 @@
+"""
+Script para testar o ResponseCache e o stale-while-revalidate do ExtractionService
+"""
+import asyncio
+import time
+
+from app.services.extraction_service import ExtractionService
+from app.services.response_cache import ResponseCache
+from tests.fakes import FakeUserIdCache
+
+
+class CountingExtractor:
+    """Extractor que conta as extrações feitas"""
+
+    def __init__(self):
+        self.calls = 0
+        self.amounts = []
+        self.incremental = 0
+        self.user_id_cache = FakeUserIdCache()
+
+    def extract_posts(self, username: str, quantity: int, user_id=None):
+        self.calls += 1
+        self.amounts.append(quantity)
+        total = 3 if username == "pequeno" else quantity
+        return [f"{username}-v{self.calls}-{i}" for i in range(min(quantity, total))]
+
+    def extract_posts_since(self, username: str, known_posts, quantity: int, user_id=None):
+        self.incremental += 1
+        return self.extract_posts(username, quantity, user_id)
+
+
+class FakeAccountManager:
+    accounts = []
+
+    def get_available_accounts(self):
+        return []
+
+    def get_earliest_unfreeze(self):
+        return None
+
+
+def test_response_cache():
+    print("="*50)
+    print("Testando ResponseCache")
+    print("="*50)
+
+    # ========== TESTE 1: TTL e janela stale ==========
+    print("\n[TESTE 1] Entrada fresca, depois stale, depois expirada")
+    cache = ResponseCache("teste", ttl=0.05, stale_ttl=0.1, max_entries=10)
+    cache.set("a", [1, 2], quantity=2)
+    entry = cache.get("a")
+    assert entry.is_fresh() and entry.value == [1, 2] and entry.meta['quantity'] == 2
+    time.sleep(0.07)
+    entry = cache.get("a")
+    assert entry is not None and not entry.is_fresh()
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    status = cache.get_status()
+    assert status['hits'] == 1 and status['stale_hits'] == 1 and status['misses'] == 1
+    print(f"✓ Status: {status}")
+
+    # ========== TESTE 2: LRU e cache desabilitado ==========
+    print("\n[TESTE 2] LRU limita entradas; TTL 0 desabilita")
+    cache = ResponseCache("teste", ttl=10, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    assert len(cache) == 2 and cache.get("a") is None
+    disabled = ResponseCache("teste", ttl=0)
+    assert disabled.set("a", 1) is None and disabled.get("a") is None
+    print("✓ LRU e desabilitação funcionando")
+
+    # ========== TESTE 3: Stale-while-revalidate no ExtractionService ==========
+    print("\n[TESTE 3] Resposta stale servida na hora e atualizada em background")
+    extractor = CountingExtractor()
+    service = ExtractionService(
+        extractor,
+        FakeAccountManager(),
+        max_workers=2,
+        posts_cache=ResponseCache("posts", ttl=0.05, stale_ttl=10)
+    )
+
+    async def scenario():
+        first = await service.extract_posts("Perfil", 2)
+        assert await service.extract_posts("perfil", 2) == first
+        assert extractor.calls == 1
+
+        await asyncio.sleep(0.07)
+        stale = await service.extract_posts("perfil", 2)
+        assert stale == first, "entrada stale deveria ser servida imediatamente"
+        while service._refreshing:
+            await asyncio.sleep(0.01)
+        assert extractor.calls == 2 and extractor.incremental == 1, "refresh deveria ser incremental"
+        assert service.admission.get_status()['active'] == 0
+        assert await service.extract_posts("perfil", 2) == ["perfil-v2-0", "perfil-v2-1"]
+
+        # ========== TESTE 4: bypass e refresh ==========
+        service.posts_cache.ttl = 10
+        cached = await service.extract_posts("perfil", 2, cache_mode="refresh")
+        assert cached == ["perfil-v3-0", "perfil-v3-1"]
+        bypassed = await service.extract_posts("perfil", 2, cache_mode="bypass")
+        assert bypassed == ["perfil-v4-0", "perfil-v4-1"]
+        assert await service.extract_posts("perfil", 2) == cached
+        assert extractor.calls == 4
+
+    asyncio.run(scenario())
+    print("✓ Stale servido, refresh em background, bypass e refresh respeitados")
+    print(f"✓ Status: {service.get_status()['posts_cache']}")
+    service.shutdown()
+
+    # ========== TESTE 5: Reaproveitamento de quantidades menores ==========
+    print("\n[TESTE 5] Extração de N posts atende pedidos de até N")
+    extractor = CountingExtractor()
+    service = ExtractionService(
+        extractor,
+        FakeAccountManager(),
+        max_workers=2,
+        posts_cache=ResponseCache("posts", ttl=10)
+    )
+
+    async def superset():
+        assert len(await service.extract_posts("perfil", 20)) == 20
+        assert extractor.amounts == [24], "extração deveria ser arredondada para a página"
+        assert len(await service.extract_posts("perfil", 10)) == 10
+        assert len(await service.extract_posts("perfil", 24)) == 24
+        assert extractor.calls == 1
+        assert len(await service.extract_posts("perfil", 30)) == 30
+        assert extractor.amounts == [24, 36]
+
+        # Perfil com menos posts do que o pedido: a lista completa atende qualquer quantidade
+        assert len(await service.extract_posts("pequeno", 5)) == 3
+        assert len(await service.extract_posts("pequeno", 50)) == 3
+        assert extractor.calls == 3
+
+    asyncio.run(superset())
+    assert ExtractionService.fetch_quantity(1) == 12 and ExtractionService.fetch_quantity(13) == 24
+    # 49-50 arredondaria para 60: uma página gql a mais (e uma pausa) para posts que a API não devolve
+    assert ExtractionService.fetch_quantity(49) == 50 and ExtractionService.fetch_quantity(50) == 50
+    print(f"✓ Extrações feitas: {extractor.amounts}")
+    service.shutdown()
+
+    print("\n✅ Todos os testes do ResponseCache passaram!")
+
+
+if __name__ == "__main__":
+    test_response_cache()
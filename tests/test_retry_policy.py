@@ -0,0 +1,179 @@
+"""
+Script para testar a política de retry (classificação de erros, backoff e rotação de contas)
+"""
+import tempfile
+
+from instagrapi.exceptions import (
+    UserNotFound,
+    PrivateAccount,
+    PrivateError,
+    ProxyAddressIsBlocked,
+    SentryBlock,
+    BadPassword,
+    UnknownError,
+    RateLimitError,
+    LoginRequired,
+    ClientConnectionError
+)
+
+from app.services.client_pool import ClientPool
+from app.services.extractor import InstagramExtractor
+from app.services.instagram_client import InstagramClient
+from app.services.retry_policy import ErrorAction, RetryPolicy, build_policies, parse_overrides
+from app.services.session_store import SessionStore
+from app.utils.exceptions import AccountLoginFailed, ConfigurationError, ExtractionError, PrivateProfileError, ProfileNotFound, RateLimitExceeded
+from tests.fakes import FakeAccountManager, FakePool, FakeUserIdCache, make_account
+
+
+def make_extractor(errors):
+    """Extractor cujo fetch lança os erros da lista (em ordem) e depois retorna 'ok'"""
+    manager = FakeAccountManager()
+    cache = FakeUserIdCache(user_id=42)
+    policies = {op: RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.01) for op in build_policies("")}
+    extractor = InstagramExtractor(manager, FakePool(), cache, retry_policies=policies)
+
+    def fetch(client, user_id):
+        if errors:
+            raise errors.pop(0)
+        return f"ok:{client.account.username}"
+
+    return extractor, manager, cache, fetch
+
+
+def test_retry_policy():
+    print("="*50)
+    print("Testando política de retry")
+    print("="*50)
+
+    # ========== TESTE 1: Classificação ==========
+    print("\n[TESTE 1] Classificação dos erros do instagrapi")
+    policy = RetryPolicy()
+    # UserNotFound e RateLimitError herdam de PrivateError no instagrapi
+    assert policy.classify(UserNotFound()).action is ErrorAction.FATAL
+    assert policy.classify(RateLimitError()).action is ErrorAction.FREEZE
+    assert policy.classify(LoginRequired()).invalidate_session
+    assert policy.classify(PrivateAccount()).final_error is PrivateProfileError
+    assert policy.classify(ProxyAddressIsBlocked()).action is ErrorAction.FREEZE
+    assert policy.classify(SentryBlock()).action is ErrorAction.FREEZE
+    assert policy.classify(BadPassword()).invalidate_session
+    try:
+        raise AccountLoginFailed("Falha no login") from ClientConnectionError("reset")
+    except AccountLoginFailed as e:
+        assert policy.classify(e).action is ErrorAction.RETRY, "vale a causa"
+    # Outras subclasses de PrivateError não indicam perfil privado
+    for error in (PrivateError(), UnknownError()):
+        rule = policy.classify(error)
+        assert rule.action is ErrorAction.ROTATE and rule.final_error is ExtractionError
+    assert policy.classify(ClientConnectionError()).action is ErrorAction.RETRY
+    assert policy.classify(KeyError("x")).action is ErrorAction.ROTATE
+    print("✓ Erros classificados corretamente")
+
+    # ========== TESTE 2: Backoff ==========
+    print("\n[TESTE 2] Backoff exponencial limitado, com jitter")
+    policy = RetryPolicy(base_delay=0.5, max_delay=3, jitter=1)
+    assert [policy.backoff(n, rand=lambda: 0) for n in (1, 2, 3, 4)] == [0.5, 1.0, 2.0, 3]
+    assert policy.backoff(2, rand=lambda: 0.5) == 0.5
+    assert RetryPolicy(jitter=0).backoff(1) == 0.5
+    print("✓ Atrasos: 0.5s, 1s, 2s, 3s (teto)")
+
+    # ========== TESTE 3: Ajustes por operação ==========
+    print("\n[TESTE 3] RETRY_OPERATION_OVERRIDES")
+    policies = build_policies("stories:max_attempts=5;page:base_delay=0.2,max_delay=1")
+    assert policies["stories"].max_attempts == 5
+    assert policies["page"].base_delay == 0.2 and policies["page"].max_delay == 1
+    assert policies["stream"].max_delay <= 4
+    for spec in ("videos:max_attempts=2", "stories:tentativas=2", "stories:max_attempts=dois"):
+        try:
+            parse_overrides(spec)
+            raise AssertionError(f"deveria rejeitar '{spec}'")
+        except ConfigurationError:
+            pass
+    print("✓ Ajustes aplicados e formatos inválidos rejeitados")
+
+    # ========== TESTE 4: Erro de rede repete na mesma conta ==========
+    print("\n[TESTE 4] Erro de rede não troca de conta")
+    extractor, manager, _, fetch = make_extractor([ClientConnectionError("reset")])
+    assert extractor._with_retries("posts", "perfil", 42, fetch) == "ok:conta_0"
+    assert manager.used == ["conta_0"] and manager.frozen == []
+    print("✓ Segunda tentativa com a mesma conta")
+
+    # ========== TESTE 5: Rate limit congela e troca de conta ==========
+    print("\n[TESTE 5] Rate limit congela a conta e usa outra")
+    extractor, manager, _, fetch = make_extractor([RateLimitError("429")])
+    assert extractor._with_retries("posts", "perfil", 42, fetch) == "ok:conta_1"
+    assert manager.frozen[0][0] == "conta_0"
+    print(f"✓ Congeladas: {manager.frozen}")
+
+    extractor, manager, _, fetch = make_extractor([RateLimitError("429") for _ in range(3)])
+    try:
+        extractor._with_retries("posts", "perfil", 42, fetch)
+        raise AssertionError("deveria esgotar as tentativas")
+    except RateLimitExceeded as e:
+        assert e.details['attempts'] == 3 and len(manager.frozen) == 3
+    print("✓ RateLimitExceeded após 3 tentativas")
+
+    # ========== TESTE 6: Perfil inexistente é fatal ==========
+    print("\n[TESTE 6] UserNotFound não é repetido")
+    extractor, manager, cache, fetch = make_extractor([UserNotFound("404")])
+    try:
+        extractor._with_retries("stories", "perfil", None, fetch)
+        raise AssertionError("deveria lançar ProfileNotFound")
+    except ProfileNotFound:
+        pass
+    assert manager.used == ["conta_0"] and cache.missing == ["perfil"]
+    print("✓ ProfileNotFound na primeira tentativa")
+
+    # ========== TESTE 7: Bloqueio de proxy não vira perfil privado ==========
+    print("\n[TESTE 7] ProxyAddressIsBlocked congela a conta")
+    extractor, manager, _, fetch = make_extractor([ProxyAddressIsBlocked("blocked") for _ in range(3)])
+    try:
+        extractor._with_retries("posts", "perfil", 42, fetch)
+        raise AssertionError("deveria esgotar as tentativas")
+    except PrivateProfileError:
+        raise AssertionError("bloqueio de proxy não é perfil privado")
+    except ExtractionError as e:
+        assert e.details['last_error'] == "ProxyAddressIsBlocked"
+    assert len(manager.frozen) == 3
+    print(f"✓ ExtractionError após congelar as 3 contas: {manager.frozen}")
+
+    # ========== TESTE 8: Falha de login real (AccountLoginFailed) ==========
+    print("\n[TESTE 8] Senha incorreta no InstagramClient.login congela e invalida a sessão")
+
+    class BadPasswordPool(ClientPool):
+        """Pool com InstagramClients reais cujo login no instagrapi falha com BadPassword"""
+
+        def __init__(self, store):
+            super().__init__(max_size=2)
+            self.store = store
+
+        def _new_client(self, account):
+            client = InstagramClient(make_account(account.username), session_store=self.store)
+
+            def login(*args, **kwargs):
+                raise BadPassword("senha incorreta")
+
+            client.client.login = login
+            return client
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = FakeAccountManager()
+        policies = {op: RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.01) for op in build_policies("")}
+        extractor = InstagramExtractor(
+            manager, BadPasswordPool(SessionStore(sessions_dir=tmp_dir)), FakeUserIdCache(user_id=42),
+            retry_policies=policies
+        )
+        try:
+            extractor._with_retries("posts", "perfil", 42, lambda client, user_id: "ok")
+            raise AssertionError("deveria esgotar as tentativas")
+        except ExtractionError as e:
+            assert e.details['last_error'] == "AccountLoginFailed"
+            assert "autenticação" in e.message
+    assert manager.frozen == [("conta_0", 120), ("conta_1", 120)], manager.frozen
+    assert manager.invalidated == ["conta_0", "conta_1"] and manager.errors == {}
+    print(f"✓ Congeladas por 120 min e sessões invalidadas: {manager.invalidated}")
+
+    print("\n✅ Todos os testes da política de retry passaram!")
+
+
+if __name__ == "__main__":
+    test_retry_policy()
@@ -0,0 +1,77 @@
+"""
+Script para testar o SessionStore
+"""
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.session_store import SessionStore
+
+
+def test_session_store():
+    print("="*50)
+    print("Testando SessionStore")
+    print("="*50)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sessions_dir = Path(tmp_dir)
+
+        # Sessão pré-existente em disco
+        (sessions_dir / "conta_antiga_session.json").write_text(json.dumps({"mid": "abc"}))
+
+        store = SessionStore(sessions_dir=sessions_dir, flush_interval=0.2)
+
+        # ========== TESTE 1: load_all ==========
+        print("\n[TESTE 1] Carregar sessões existentes")
+        assert store.load_all() == 1
+        assert store.get("conta_antiga") == {"mid": "abc"}
+        assert store.get("conta_inexistente") is None
+        print(f"✓ Sessões em memória: {store}")
+
+        # ========== TESTE 2: get retorna cópia ==========
+        print("\n[TESTE 2] get() retorna cópia independente")
+        settings = store.get("conta_antiga")
+        settings["mid"] = "alterado"
+        assert store.get("conta_antiga") == {"mid": "abc"}
+        print("✓ Alterações no retorno não afetam o store")
+
+        # ========== TESTE 3: Write-behind agrupado ==========
+        print("\n[TESTE 3] Gravações são agrupadas e feitas em background")
+        session_file = store.get_path("conta_nova")
+        for i in range(5):
+            store.put("conta_nova", {"mid": f"v{i}"})
+        assert store.get("conta_nova") == {"mid": "v4"}
+        assert not session_file.exists()  # ainda dentro da janela de agrupamento
+
+        for _ in range(50):
+            if session_file.exists():
+                break
+            time.sleep(0.05)
+        assert json.loads(session_file.read_text()) == {"mid": "v4"}
+        print(f"✓ Última versão gravada em {session_file.name}")
+
+        # ========== TESTE 4: Escrita atômica ==========
+        print("\n[TESTE 4] Nenhum arquivo temporário sobra no diretório")
+        assert not list(sessions_dir.glob("*.tmp"))
+        print("✓ Diretório limpo")
+
+        # ========== TESTE 5: close() faz flush ==========
+        print("\n[TESTE 5] close() grava sessões pendentes")
+        store.put("conta_shutdown", {"mid": "final"})
+        store.close()
+        assert json.loads(store.get_path("conta_shutdown").read_text()) == {"mid": "final"}
+        print("✓ Sessão pendente gravada no shutdown")
+
+        # ========== TESTE 6: delete ==========
+        print("\n[TESTE 6] delete() remove da memória e do disco")
+        store.delete("conta_antiga")
+        assert store.get("conta_antiga") is None
+        assert not store.get_path("conta_antiga").exists()
+        print("✓ Sessão removida")
+
+    print("\n✅ Todos os testes do SessionStore passaram!")
+
+
+if __name__ == "__main__":
+    test_session_store()
@@ -0,0 +1,119 @@
+"""
+Script para testar o SessionWarmer (sem acesso ao Instagram)
+"""
+import threading
+import time
+
+from app.services.extractor import InstagramExtractor
+from app.services.session_warmer import SessionWarmer
+from app.utils.exceptions import AccountLoginFailed
+from tests import fakes
+from tests.fakes import CountingClientPool, FakeUserIdCache, make_account
+
+
+class FakeAccountManager:
+    """Substitui o AccountManager com contas em memória"""
+
+    def __init__(self, accounts):
+        self.accounts = accounts
+        self.errors = {}
+
+    def get_available_accounts(self):
+        return [acc for acc in self.accounts if acc.is_available()]
+
+    def mark_account_error(self, username, error_message):
+        self.errors[username] = error_message
+
+
+class FakeClientPool:
+    """Registra os logins feitos pelo warmer"""
+
+    def __init__(self, failing=(), delay=0.0):
+        self.failing = set(failing)
+        self.delay = delay
+        self.warmed = []
+        self.max_concurrent = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def warm(self, account):
+        with self._lock:
+            self._running += 1
+            self.max_concurrent = max(self.max_concurrent, self._running)
+        try:
+            time.sleep(self.delay)
+            if account.username in self.failing:
+                raise AccountLoginFailed("Senha incorreta")
+            with self._lock:
+                self.warmed.append(account.username)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+
+def test_session_warmer():
+    print("="*50)
+    print("Testando SessionWarmer")
+    print("="*50)
+
+    accounts = [make_account(f"conta_{i}") for i in range(6)] + [make_account("conta_failed", status="failed")]
+    manager = FakeAccountManager(accounts)
+    pool = FakeClientPool(failing={"conta_5"}, delay=0.05)
+
+    # ========== TESTE 1: Aquecimento completo ==========
+    print("\n[TESTE 1] Aquecer todas as contas disponíveis")
+    warmer = SessionWarmer(manager, pool, max_workers=2, stagger_seconds=0)
+    warmer.start()
+    assert warmer.wait_until_ready(min_ready=100, timeout=5) is False  # termina antes de atingir 100
+    progress = warmer.get_progress()
+    print(f"✓ Progresso: {progress}")
+    assert progress['status'] == "done"
+    assert progress['total'] == 6
+    assert progress['warm'] == 5
+    assert progress['failed'] == 1
+    assert "conta_failed" not in pool.warmed
+    assert "conta_5" in manager.errors
+    assert pool.max_concurrent <= 2
+    print(f"✓ Logins simultâneos limitados a {pool.max_concurrent}")
+
+    # ========== TESTE 2: Mínimo de contas prontas ==========
+    print("\n[TESTE 2] Liberar startup ao atingir o mínimo")
+    pool = FakeClientPool(delay=0.01)
+    warmer = SessionWarmer(manager, pool, max_workers=1, stagger_seconds=0.2)
+    warmer.start()
+    assert warmer.wait_until_ready(min_ready=1, timeout=5) is True
+    progress = warmer.get_progress()
+    assert progress['status'] == "running"
+    assert progress['warm'] >= 1
+    print(f"✓ Startup liberado com {progress['warm']}/{progress['total']} contas prontas")
+
+    # ========== TESTE 3: Stop ==========
+    print("\n[TESTE 3] stop() interrompe logins pendentes")
+    warmer.stop()
+    warmer._thread.join(timeout=5)
+    progress = warmer.get_progress()
+    assert progress['status'] == "stopped"
+    assert progress['warm'] < progress['total']
+    print(f"✓ Aquecimento interrompido: {progress['warm']}/{progress['total']}")
+
+    # ========== TESTE 4: Pool aquecido é o pool do extractor ==========
+    print("\n[TESTE 4] Primeira extração usa o cliente aquecido, sem novo login")
+    pool = CountingClientPool(max_size=10)
+    manager = fakes.FakeAccountManager(["conta_0"])
+    extractor = InstagramExtractor(manager, pool, FakeUserIdCache(user_id=42))
+    warmer = SessionWarmer(manager, pool, max_workers=1, stagger_seconds=0)
+    warmer.start()
+    assert warmer.wait_until_ready(min_ready=1, timeout=5) is True
+    assert pool.logins == 1
+
+    session = extractor._with_retries("posts", "perfil", 42, lambda client, user_id: client.session)
+    assert session == "sessao-conta_0"
+    status = pool.get_status()
+    assert pool.logins == 1 and status['hits'] == 1 and status['misses'] == 0, status
+    print(f"✓ acquire do extractor foi um hit: {status}")
+
+    print("\n✅ Todos os testes do SessionWarmer passaram!")
+
+
+if __name__ == "__main__":
+    test_session_warmer()
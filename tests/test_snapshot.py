@@ -0,0 +1,105 @@
+"""
+Script para testar o snapshot de perfil (posts + stories) sem acesso ao Instagram
+"""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from app.services.extraction_service import ExtractionService
+from app.services.extractor import InstagramExtractor
+from app.services.response_cache import ResponseCache
+from app.services.stories_cache import StoriesCache
+from tests.fakes import FakeAccountManager, FakePool, FakeUserIdCache, make_media, make_story
+
+
+class SlowInstagramAPI:
+    """Cada chamada demora `delay` segundos; registra as threads usadas"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = []
+        self.threads = set()
+        self.lookups = 0
+
+    def user_medias(self, user_id, amount=0):
+        self.calls.append("medias")
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return [make_media(i) for i in range(amount)]
+
+    def user_stories(self, user_id):
+        self.calls.append("stories")
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return [make_story(1), make_story(2)]
+
+    def user_info_by_username_v1(self, username):
+        self.lookups += 1
+        return SimpleNamespace(pk=42)
+
+    # Backends v1 e gql do instagrapi respondem igual no fake
+    user_medias_v1 = user_medias_gql = user_medias
+    user_stories_v1 = user_stories_gql = user_stories
+    user_info_by_username_gql = user_info_by_username_v1
+
+
+def test_snapshot():
+    print("="*50)
+    print("Testando snapshot de perfil")
+    print("="*50)
+
+    # ========== TESTE 1: Um cliente, uma busca de user_id, chamadas em sequência ==========
+    print("\n[TESTE 1] Sem segundo cliente ocioso, posts e stories em sequência no mesmo cliente")
+    api = SlowInstagramAPI(delay=0.05)
+    pool = FakePool(api)
+    extractor = InstagramExtractor(FakeAccountManager(), pool, FakeUserIdCache())
+
+    posts, stories = extractor.extract_snapshot("perfil", 5)
+    assert len(posts) == 5 and [s.id for s in stories] == ["1", "2"]
+    assert len(pool.accounts_used) == 1 and api.lookups == 1
+    assert api.calls == ["medias", "stories"] and len(api.threads) == 1
+    print("✓ 1 cliente e 1 busca de user_id; o Client nunca é usado por duas threads")
+
+    # ========== TESTE 2: Segundo cliente da conta, chamadas em paralelo ==========
+    print("\n[TESTE 2] Com um segundo cliente ocioso, stories em paralelo nele")
+    posts_api, stories_api = SlowInstagramAPI(delay=0.2), SlowInstagramAPI(delay=0.2)
+    parallel = InstagramExtractor(FakeAccountManager(), FakePool(posts_api, idle_api=stories_api), FakeUserIdCache())
+
+    start = time.monotonic()
+    posts, stories = parallel.extract_snapshot("perfil", 5)
+    elapsed = time.monotonic() - start
+    assert len(posts) == 5 and len(stories) == 2
+    assert posts_api.calls == ["medias"] and stories_api.calls == ["stories"]
+    assert posts_api.threads.isdisjoint(stories_api.threads)
+    assert elapsed < 0.35, f"chamadas deveriam rodar em paralelo ({elapsed:.2f}s)"
+    print(f"✓ Snapshot em {elapsed:.2f}s, cada cliente em uma thread")
+
+    # ========== TESTE 3: Cache parcial ==========
+    print("\n[TESTE 3] Snapshot usa e alimenta os caches de posts e stories")
+    service = ExtractionService(
+        extractor, FakeAccountManager(), max_workers=2,
+        posts_cache=ResponseCache("posts", ttl=10), stories_cache=StoriesCache(fresh_seconds=10)
+    )
+
+    async def scenario():
+        posts, stories = await service.extract_snapshot("perfil", 5)
+        assert len(posts) == 5 and len(stories) == 2
+        calls = len(api.calls)
+        assert len(await service.extract_posts("perfil", 5)) == 5
+        assert len(await service.extract_stories("perfil")) == 2
+        assert len(api.calls) == calls, "posts e stories deveriam vir do cache"
+
+        service.stories_cache.invalidate("perfil")
+        await service.extract_snapshot("perfil", 5)
+        assert api.calls[calls:] == ["stories"], "apenas stories deveriam ser extraídos"
+
+    asyncio.run(scenario())
+    print("✓ Apenas a parte ausente do cache foi extraída")
+    service.shutdown()
+
+    print("\n✅ Todos os testes de snapshot passaram!")
+
+
+if __name__ == "__main__":
+    test_snapshot()
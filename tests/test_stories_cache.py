@@ -0,0 +1,69 @@
+"""
+Script para testar o StoriesCache
+"""
+import time
+from datetime import datetime, timedelta
+
+from app.models.requests import Story
+from app.services.stories_cache import StoriesCache
+
+
+def make_story(story_id: str, expires_in: float) -> Story:
+    now = datetime.now()
+    return Story(
+        id=story_id,
+        media_type=1,
+        media_url="https://instagram.com/story.jpg",
+        taken_at=(now - timedelta(hours=1)).isoformat(),
+        expiring_at=(now + timedelta(seconds=expires_in)).isoformat()
+    )
+
+
+def test_stories_cache():
+    print("="*50)
+    print("Testando StoriesCache")
+    print("="*50)
+
+    # ========== TESTE 1: Cache por perfil ==========
+    print("\n[TESTE 1] Stories são servidos dentro da janela de frescor")
+    cache = StoriesCache(fresh_seconds=10)
+    assert cache.get("perfil") is None
+    cache.set("Perfil", [make_story("1", 3600), make_story("2", 3600)])
+    assert [s.id for s in cache.get("perfil")] == ["1", "2"]
+    print(f"✓ Status: {cache.get_status()}")
+
+    # ========== TESTE 2: Expiração individual ==========
+    print("\n[TESTE 2] Cada story sai no seu expiring_at")
+    cache.set("perfil", [make_story("1", 3600), make_story("2", 0.05), make_story("velho", -10)])
+    assert [s.id for s in cache.get("perfil")] == ["1", "2"]
+    time.sleep(0.1)
+    assert [s.id for s in cache.get("perfil")] == ["1"]
+    assert cache.get_status()['expired_stories'] == 1
+    print("✓ Story expirado removido sem afetar os demais")
+
+    # ========== TESTE 3: Janela de frescor ==========
+    print("\n[TESTE 3] Perfil sai do cache ao fim da janela (inclusive lista vazia)")
+    cache = StoriesCache(fresh_seconds=0.05)
+    cache.set("sem_stories", [])
+    cache.set("com_stories", [make_story("1", 3600)])
+    assert cache.get("sem_stories") == []
+    time.sleep(0.1)
+    assert cache.get("sem_stories") is None and cache.get("com_stories") is None
+    assert cache.get_status()['pending_deadlines'] == 0
+    print("✓ Perfis removidos e heap de prazos vazio")
+
+    # ========== TESTE 4: Prazos de entradas substituídas ==========
+    print("\n[TESTE 4] Prazos antigos não afetam a entrada nova")
+    cache = StoriesCache(fresh_seconds=10)
+    cache.set("perfil", [make_story("1", 0.05)])
+    cache.set("perfil", [make_story("1", 3600)])
+    time.sleep(0.1)
+    assert [s.id for s in cache.get("perfil")] == ["1"]
+    assert StoriesCache(fresh_seconds=0).get("perfil") is None
+    print("✓ Prazo obsoleto descartado")
+
+    print("\n✅ Todos os testes do StoriesCache passaram!")
+
+
+if __name__ == "__main__":
+    test_stories_cache()
@@ -0,0 +1,120 @@
+"""
+Script para testar o streaming de posts (sem acesso ao Instagram)
+"""
+import asyncio
+import time
+
+from app.config import Config
+from app.services.extraction_service import ExtractionService
+from app.services.extractor import InstagramExtractor
+from app.services.response_cache import ResponseCache
+from tests.fakes import FakeAccountManager, FakePool, FakeUserIdCache, make_media
+
+
+class FlakyInstagramAPI:
+    """Feed paginado que falha uma vez após a primeira página"""
+
+    def __init__(self, total: int):
+        self.feed = [make_media(i) for i in range(total)]
+        self.failed = False
+
+    def user_medias_paginated(self, user_id, amount, end_cursor=""):
+        start = int(end_cursor or 0)
+        if start > 0 and not self.failed:
+            self.failed = True
+            raise RuntimeError("conexão perdida")
+        page = self.feed[start:start + amount]
+        return page, str(start + amount) if start + amount < len(self.feed) else ""
+
+    # Backends v1 e gql do instagrapi respondem igual no fake
+    user_medias_paginated_v1 = user_medias_paginated_gql = user_medias_paginated
+
+
+class SlowStreamingExtractor:
+    """Entrega 3 páginas de 2 posts, com intervalo entre elas"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+        self.cancelled_event = None
+        self.user_id_cache = FakeUserIdCache()
+
+    def stream_posts(self, username, quantity, on_page, user_id=None, cancelled=None):
+        self.calls += 1
+        self.cancelled_event = cancelled
+        extractor = InstagramExtractor.__new__(InstagramExtractor)
+        sent = 0
+        for page in range(3):
+            if cancelled.is_set():
+                break
+            time.sleep(self.delay)
+            medias = [make_media(page * 2 + i) for i in range(2)]
+            on_page(extractor._convert_medias_to_posts(medias, None))
+            sent += 2
+        return sent
+
+
+def test_streaming():
+    print("="*50)
+    print("Testando streaming de posts")
+    print("="*50)
+
+    # ========== TESTE 1: Extractor entrega página a página, sem repetir após retry ==========
+    print("\n[TESTE 1] Páginas entregues conforme chegam; retry não repete posts")
+    original_page_size = Config.POSTS_PAGE_SIZE
+    Config.POSTS_PAGE_SIZE = 4
+    try:
+        extractor = InstagramExtractor(FakeAccountManager(), FakePool(FlakyInstagramAPI(10)), FakeUserIdCache())
+        pages = []
+        total = extractor.stream_posts("perfil", 9, pages.append, user_id=42)
+    finally:
+        Config.POSTS_PAGE_SIZE = original_page_size
+    ids = [post.id for page in pages for post in page]
+    assert total == 9 and ids == [str(i) for i in range(9)]
+    assert [len(page) for page in pages] == [4, 4, 1]
+    print(f"✓ Páginas: {[len(page) for page in pages]}")
+
+    # ========== TESTE 2: Primeiro post chega antes do fim ==========
+    print("\n[TESTE 2] ExtractionService entrega o primeiro post antes da extração terminar")
+    extractor = SlowStreamingExtractor(delay=0.1)
+    service = ExtractionService(
+        extractor, FakeAccountManager(), max_workers=2, posts_cache=ResponseCache("posts", ttl=10)
+    )
+
+    async def scenario():
+        start = time.monotonic()
+        received = []
+        first_at = None
+        async for post in service.stream_posts("perfil", 6):
+            if first_at is None:
+                first_at = time.monotonic() - start
+            received.append(post.id)
+        total_time = time.monotonic() - start
+        assert received == [str(i) for i in range(6)]
+        assert first_at < total_time / 2, f"primeiro post em {first_at:.2f}s de {total_time:.2f}s"
+
+        # Resultado completo vai para o cache
+        cached = [post.id async for post in service.stream_posts("perfil", 4)]
+        assert cached == ["0", "1", "2", "3"] and extractor.calls == 1
+
+        # ========== TESTE 3: Cliente desconecta ==========
+        posts = service.stream_posts("outro", 6, cache_mode="bypass")
+        await posts.__anext__()
+        await posts.aclose()
+        assert extractor.cancelled_event.is_set()
+        # A vaga só volta quando a thread para, na próxima página
+        await asyncio.sleep(0.3)
+        assert service.admission.get_status()['active'] == 0
+        return first_at, total_time
+
+    first_at, total_time = asyncio.run(scenario())
+    print(f"✓ Primeiro post em {first_at:.2f}s, último em {total_time:.2f}s")
+    print("\n[TESTE 3] Interrupção do cliente cancela a paginação")
+    print("✓ Evento de cancelamento sinalizado e vaga liberada")
+    service.shutdown()
+
+    print("\n✅ Todos os testes de streaming passaram!")
+
+
+if __name__ == "__main__":
+    test_streaming()
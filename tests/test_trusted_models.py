@@ -0,0 +1,171 @@
+"""
+Script para testar a montagem dos modelos de resposta sem revalidação
+(executado direto, também mede o custo por post antes/depois)
+"""
+from datetime import datetime
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from instagrapi.extractors import extract_media_gql, extract_media_v1, extract_story_gql, extract_story_v1
+
+from app.main import _trusted_response
+from app.models.requests import MediaItem, Post, PostsResponse
+from app.services.extractor import InstagramExtractor
+from app.services.raw_parser import posts_from_gql, posts_from_v1, stories_from_gql, stories_from_v1
+from tests.test_raw_parser import gql_node, gql_story, v1_item, v1_story
+
+POSTS = 50
+ROUNDS = 20
+
+
+def carousel_item(pk: int):
+    """Item v1 de carrossel com 3 fotos e 1 vídeo"""
+    resources = []
+    for i in range(1, 5):
+        resource_pk = pk * 10 + i
+        resource = {
+            "pk": resource_pk, "id": f"{resource_pk}_42", "media_type": 2 if i == 4 else 1,
+            "image_versions2": {"candidates": [
+                {"url": f"https://instagram.com/{resource_pk}_small.jpg", "width": 150, "height": 150},
+                {"url": f"https://instagram.com/{resource_pk}.jpg", "width": 1080, "height": 1080}
+            ]}
+        }
+        if i == 4:
+            resource["video_versions"] = [{"url": f"https://instagram.com/{resource_pk}.mp4", "width": 720, "height": 1280}]
+        resources.append(resource)
+    return {
+        "pk": pk, "id": f"{pk}_42", "code": f"code{pk}", "media_type": 8,
+        "taken_at": 1700000000 - pk * 3600, "user": {"pk": "42", "username": "perfil"},
+        "caption": {"text": f"post {pk}"}, "like_count": 10 * pk, "comment_count": pk,
+        "carousel_media": resources
+    }
+
+
+def convert_validated(medias):
+    """Conversão anterior: Post/MediaItem com validação completa"""
+    posts = []
+    for media in medias:
+        media_items = [
+            MediaItem(
+                media_type=resource.media_type,
+                media_url=str(resource.thumbnail_url) if resource.thumbnail_url else None,
+                thumbnail_url=str(resource.thumbnail_url) if resource.thumbnail_url else None,
+                video_url=str(resource.video_url) if resource.media_type == 2 and resource.video_url else None
+            )
+            for resource in media.resources
+        ]
+        posts.append(Post(
+            id=str(media.pk),
+            code=media.code,
+            caption=media.caption_text if media.caption_text else "",
+            like_count=media.like_count,
+            comment_count=media.comment_count,
+            media_type=media.media_type,
+            taken_at=media.taken_at.isoformat() if media.taken_at else datetime.now().isoformat(),
+            medias=media_items
+        ))
+    return posts
+
+
+def respond_validated(posts) -> bytes:
+    """Resposta anterior: PostsResponse validado + response_model do FastAPI (dict -> revalidação -> jsonable_encoder)"""
+    response = PostsResponse(success=True, username="perfil", total_posts=len(posts), posts=posts, message="ok")
+    revalidated = PostsResponse(**response.dict())
+    return json.dumps(jsonable_encoder(revalidated)).encode()
+
+
+def respond_trusted(posts) -> bytes:
+    response = PostsResponse.construct(success=True, username="perfil", total_posts=len(posts), posts=posts, message="ok")
+    return _trusted_response(response).body
+
+
+def assert_same_as_parse_obj(models):
+    """Cada modelo montado com construct é igual, campo a campo e tipo a tipo, ao validado por parse_obj"""
+    assert models
+    for model in models:
+        validated = type(model).parse_obj(model.dict())
+        assert model.json() == validated.json(), (model.json(), validated.json())
+
+
+def per_post_us(func) -> float:
+    """Melhor tempo entre ROUNDS execuções, em microssegundos por post"""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best / POSTS * 1e6
+
+
+def test_trusted_models():
+    print("="*50)
+    print("Testando modelos de resposta sem revalidação")
+    print("="*50)
+
+    extractor = InstagramExtractor(None, client_pool=object(), user_id_cache=object())
+    items = [carousel_item(pk) for pk in range(1, POSTS + 1)]
+    medias = [extract_media_v1(item) for item in items]
+
+    # ========== TESTE 1: Mesmo conteúdo ==========
+    print(f"\n[TESTE 1] {POSTS} carrosséis: construct x validação")
+    trusted = extractor._convert_medias_to_posts(medias, None)
+    validated = convert_validated(medias)
+    assert [p.dict() for p in trusted] == [p.dict() for p in validated]
+    assert json.loads(respond_trusted(trusted)) == json.loads(respond_validated(validated))
+    assert json.loads(respond_trusted(posts_from_v1(items))) == json.loads(respond_validated(validated))
+    print("✓ Posts e JSON de resposta idênticos (instagrapi e parser bruto)")
+
+    # ========== TESTE 2: Campos nulos do instagrapi ==========
+    print("\n[TESTE 2] comment_count ausente")
+    media = extract_media_v1({**carousel_item(99), "comment_count": None})
+    assert extractor._convert_medias_to_posts([media], None)[0].comment_count == 0
+    try:
+        convert_validated([media])
+        raise AssertionError("a validação deveria rejeitar comment_count nulo")
+    except ValueError:
+        pass
+    print("✓ Contadores nulos viram 0 (a validação rejeitava o post)")
+
+    # ========== TESTE 3: construct x parse_obj ==========
+    print("\n[TESTE 3] Modelos montados com construct passam por parse_obj sem mudar")
+    v1_items = [v1_item(1, 1), v1_item(2, 2), v1_item(3, 8), {**v1_item(4, 1), "comment_count": None}]
+    gql_nodes = [gql_node(5, "GraphImage"), gql_node(6, "GraphVideo"), gql_node(7, "GraphSidecar")]
+    v1_stories, gql_stories = [v1_story(8, 1), v1_story(9, 2)], [gql_story(10, False), gql_story(11, True)]
+    assert_same_as_parse_obj(extractor._convert_medias_to_posts([extract_media_v1(item) for item in v1_items], None))
+    assert_same_as_parse_obj(extractor._convert_medias_to_posts([extract_media_gql(node) for node in gql_nodes], None))
+    assert_same_as_parse_obj(extractor._convert_stories_data(
+        [extract_story_v1(story) for story in v1_stories] + [extract_story_gql(story) for story in gql_stories]
+    ))
+    assert_same_as_parse_obj(posts_from_v1(v1_items) + posts_from_gql(gql_nodes))
+    assert_same_as_parse_obj(stories_from_v1(v1_stories) + stories_from_gql(gql_stories))
+    assert_same_as_parse_obj([PostsResponse.construct(
+        success=True, username="perfil", total_posts=len(v1_items), posts=posts_from_v1(v1_items), message="ok"
+    )])
+    print("✓ Mesmos valores e tipos (Media/Story do instagrapi e parser bruto)")
+
+    print("\n✅ Todos os testes de modelos sem revalidação passaram!")
+
+
+def benchmark_trusted_models():
+    """
+    Custo por post antes/depois (só ao rodar o script: tempo de parede não cabe na suíte)
+    """
+    extractor = InstagramExtractor(None, client_pool=object(), user_id_cache=object())
+    items = [carousel_item(pk) for pk in range(1, POSTS + 1)]
+    medias = [extract_media_v1(item) for item in items]
+
+    print(f"\n[BENCHMARK] Custo por post ({POSTS} carrosséis de 4 mídias, melhor de {ROUNDS})")
+    before_convert = per_post_us(lambda: convert_validated(medias))
+    after_convert = per_post_us(lambda: extractor._convert_medias_to_posts(medias, None))
+    before_total = per_post_us(lambda: respond_validated(convert_validated(medias)))
+    after_total = per_post_us(lambda: respond_trusted(extractor._convert_medias_to_posts(medias, None)))
+    raw_total = per_post_us(lambda: respond_trusted(posts_from_v1(items)))
+    print(f"  conversão:            {before_convert:7.1f} µs -> {after_convert:7.1f} µs")
+    print(f"  conversão + resposta: {before_total:7.1f} µs -> {after_total:7.1f} µs")
+    print(f"  parser bruto + resposta:            {raw_total:7.1f} µs")
+
+
+if __name__ == "__main__":
+    test_trusted_models()
+    benchmark_trusted_models()
@@ -0,0 +1,67 @@
+"""
+Script para testar o UserIdCache
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.user_id_cache import UserIdCache
+
+
+def test_user_id_cache():
+    print("="*50)
+    print("Testando UserIdCache")
+    print("="*50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "user_ids.sqlite3"
+
+        # ========== TESTE 1: Cache positivo ==========
+        print("\n[TESTE 1] user_id é cacheado (case-insensitive)")
+        cache = UserIdCache(db_path, max_entries=10, negative_ttl_minutes=60)
+        assert cache.get("instagram") is None
+        cache.set("Instagram", 25025320)
+        assert cache.get("instagram") == 25025320
+        assert not cache.is_known_missing("instagram")
+        print(f"✓ Status: {cache.get_status()}")
+
+        # ========== TESTE 2: Persistência entre instâncias ==========
+        print("\n[TESTE 2] Cache sobrevive a um restart")
+        cache.set_not_found("nao_existe")
+        cache.close()
+        cache = UserIdCache(db_path, max_entries=10, negative_ttl_minutes=60)
+        assert cache.get("instagram") == 25025320
+        assert cache.is_known_missing("nao_existe")
+        assert cache.get("nao_existe") is None
+        print("✓ Entradas positivas e negativas recarregadas do SQLite")
+
+        # ========== TESTE 3: Expiração do cache negativo ==========
+        print("\n[TESTE 3] Cache negativo expira")
+        cache.negative_ttl = 0.05
+        cache.set_not_found("sumiu")
+        assert cache.is_known_missing("sumiu")
+        time.sleep(0.1)
+        assert not cache.is_known_missing("sumiu")
+        print("✓ Entrada negativa expirada foi descartada")
+
+        # ========== TESTE 4: LRU em memória ==========
+        print("\n[TESTE 4] Memória limitada, disco mantém tudo")
+        cache.close()
+        cache = UserIdCache(db_path, max_entries=2, negative_ttl_minutes=60)
+        for i in range(5):
+            cache.set(f"perfil_{i}", 1000 + i)
+        assert cache.get_status()['memory_entries'] == 2
+        assert cache.get("perfil_0") == 1000
+        print("✓ Entradas removidas da memória continuam no disco")
+
+        # ========== TESTE 5: Invalidação ==========
+        print("\n[TESTE 5] invalidate remove a entrada")
+        cache.invalidate("perfil_0")
+        assert cache.get("perfil_0") is None
+        cache.close()
+
+    print("\n✅ Todos os testes do UserIdCache passaram!")
+
+
+if __name__ == "__main__":
+    test_user_id_cache()
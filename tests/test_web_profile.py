@@ -0,0 +1,141 @@
+"""
+Script para testar a extração de poucos posts via web_profile_info (uma chamada)
+"""
+from types import SimpleNamespace
+
+from instagrapi.exceptions import ClientLoginRequired, ClientNotFoundError
+
+from app.services.backend_router import BackendRouter, WEB_APP_ID
+from app.services.extractor import InstagramExtractor
+from app.utils.exceptions import ProfileNotFound
+from tests.fakes import FakeAccountManager, FakePool, FakeUserIdCache
+
+
+def make_node(pk: int):
+    return {
+        "__typename": "GraphImage",
+        "id": str(pk),
+        "shortcode": f"code{pk}",
+        "owner": {"id": "42", "username": "perfil"},
+        "display_resources": [{"src": f"https://instagram.com/{pk}.jpg", "config_width": 10, "config_height": 10}],
+        "taken_at_timestamp": 1700000000 - pk * 3600,
+        "edge_media_to_comment": {"count": 1},
+        "edge_media_preview_like": {"count": 2},
+        "edge_media_to_caption": {"edges": [{"node": {"text": f"post {pk}"}}]}
+    }
+
+
+class FakeInstagramAPI:
+    """web_profile_info configurável; chamadas registradas por endpoint"""
+
+    def __init__(self, media_count=30, edges=12, is_private=False, error=None):
+        self.calls = []
+        self.headers = []
+        self.payload = {"data": {"user": {
+            "id": "42",
+            "is_private": is_private,
+            "edge_owner_to_timeline_media": {
+                "count": media_count,
+                "edges": [{"node": make_node(i)} for i in range(1, edges + 1)]
+            }
+        }}}
+        self.error = error
+
+    def public_request(self, url, params=None, headers=None, return_json=False, retries_count=3):
+        self.calls.append("web_profile_info")
+        self.headers.append(headers)
+        if self.error:
+            raise self.error
+        return self.payload
+
+    def user_info_by_username_v1(self, username):
+        self.calls.append("user_info")
+        return SimpleNamespace(pk=42)
+
+    rank_token = "token"
+
+    def private_request(self, endpoint, params=None):
+        # feed/user/{id}/ da API privada (backend v1)
+        self.calls.append("user_medias")
+        return {"items": []}
+
+
+def make_extractor(api, cache=None):
+    return InstagramExtractor(
+        FakeAccountManager(), FakePool(api), cache or FakeUserIdCache(),
+        backend_router=BackendRouter(mode="v1")
+    )
+
+
+def test_web_profile():
+    print("="*50)
+    print("Testando extração via web_profile_info")
+    print("="*50)
+
+    # ========== TESTE 1: Perfil e posts em uma chamada ==========
+    print("\n[TESTE 1] 5 posts de um perfil novo custam uma chamada")
+    api = FakeInstagramAPI()
+    cache = FakeUserIdCache()
+    posts = make_extractor(api, cache).extract_posts("perfil", 5)
+    assert [p.id for p in posts] == ["1", "2", "3", "4", "5"]
+    assert posts[0].caption == "post 1" and posts[0].medias[0].media_url == "https://instagram.com/1.jpg"
+    assert api.calls == ["web_profile_info"]
+    assert api.headers[0] == {"x-ig-app-id": WEB_APP_ID}
+    assert cache.ids == {"perfil": 42}
+    print("✓ 1 chamada (antes: busca do user_id + medias); user_id cacheado")
+
+    # ========== TESTE 2: Caminho normal quando não compensa ==========
+    print("\n[TESTE 2] user_id conhecido ou quantidade acima da página")
+    api = FakeInstagramAPI()
+    make_extractor(api).extract_posts("perfil", 5, user_id=42)
+    make_extractor(api).extract_posts("perfil", 24)
+    assert api.calls == ["user_medias", "user_info", "user_medias"], api.calls
+
+    class CountingUserIdCache(FakeUserIdCache):
+        def __init__(self):
+            super().__init__()
+            self.lookups = 0
+
+        def get(self, username):
+            self.lookups += 1
+            return super().get(username)
+
+    api = FakeInstagramAPI()
+    cache = CountingUserIdCache()
+    cache.set("perfil", 42)
+    make_extractor(api, cache).extract_posts("perfil", 5)
+    assert api.calls == ["user_medias"] and cache.lookups == 1, (api.calls, cache.lookups)
+    print("✓ web_profile_info só para perfis sem user_id e até 12 posts; user_id em cache consultado uma vez")
+
+    # ========== TESTE 3: Fallback ==========
+    print("\n[TESTE 3] Falha ou feed incompleto seguem pelo caminho normal")
+    api = FakeInstagramAPI(error=ClientLoginRequired("login required"))
+    make_extractor(api).extract_posts("perfil", 5)
+    assert api.calls == ["web_profile_info", "user_info", "user_medias"], api.calls
+
+    api = FakeInstagramAPI(media_count=30, edges=0, is_private=True)
+    make_extractor(api).extract_posts("perfil", 5)
+    assert api.calls == ["web_profile_info", "user_medias"], "user_id do payload deve ser reaproveitado"
+
+    api = FakeInstagramAPI(media_count=3, edges=3)
+    assert len(make_extractor(api).extract_posts("perfil", 5)) == 3
+    assert api.calls == ["web_profile_info"]
+    print("✓ Login exigido e perfil privado usam a conta; perfil com 3 posts não precisa")
+
+    # ========== TESTE 4: Perfil inexistente ==========
+    print("\n[TESTE 4] 404 do web_profile_info")
+    api = FakeInstagramAPI(error=ClientNotFoundError("404"))
+    cache = FakeUserIdCache()
+    try:
+        make_extractor(api, cache).extract_posts("sumido", 5)
+        raise AssertionError("deveria lançar ProfileNotFound")
+    except ProfileNotFound:
+        pass
+    assert api.calls == ["web_profile_info"] and cache.missing == ["sumido"]
+    print("✓ ProfileNotFound sem novas tentativas")
+
+    print("\n✅ Todos os testes de web_profile_info passaram!")
+
+
+if __name__ == "__main__":
+    test_web_profile()